@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of the beam analysis.
+
+The suite times the file loading, every function in `iso.measured_quantities`,
+`iso.characterizing_parameters`, and `niso.characterizing_parameters`, the
+auxiliary graphs, and the report on synthetic Gaussian, super-Gaussian, and
+top-hat power density distributions of increasing size. The results are saved
+as JSON and, optionally, compared against a stored baseline. Any case that is
+slower than the baseline by more than the threshold is flagged as a
+regression, and the script exits with a non-zero status. A missing baseline
+is an error, since nothing could be compared.
+
+Timings depend on the machine, so the baseline is not part of the repository
+and has to be generated once on the machine that runs the comparison, before
+the change under test.
+
+Usage
+-----
+Run the suite and store the results as the new baseline, i.e.
+`make bench-baseline`:
+
+    python benchmarks/benchmark.py --output benchmarks/baseline.json
+
+Run the suite and compare the results against the baseline, i.e.
+`make bench`:
+
+    python benchmarks/benchmark.py --baseline benchmarks/baseline.json
+
+Use `--sizes` and `--only` to restrict the suite to the sizes and cases of
+interest.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+import beamprofiler  # noqa: E402
+from beamprofiler.iso import characterizing_parameters as iso_cp  # noqa: E402
+from beamprofiler.iso import measured_quantities as mq  # noqa: E402
+from beamprofiler.niso import characterizing_parameters as niso_cp  # noqa
+from beamprofiler.utils import data_processing as dp  # noqa: E402
+from beamprofiler.utils import plot, report, synthetic  # noqa: E402
+
+SIZES = [256, 512, 1024, 2048, 4096]
+SHAPES = ['gaussian', 'super_gaussian', 'top_hat']
+
+# Measurement window in millimeter, null point in ADC/px and peak power
+# density in ADC/px of the synthetic frames
+WINDOW = 35.0
+NULL_POINT = 100.0
+PEAK = 1000.0
+
+ETA = 0.8
+EPSILON = 0.1
+MIX = 1
+
+
+def frame(shape, size):
+    """
+    `frame` returns a synthetic power density distribution and its header.
+
+    Parameters
+    ----------
+    shape : str
+        `gaussian`, `super_gaussian`, or `top_hat`.
+    size : int
+        number of pixels on both axes.
+
+    Returns
+    -------
+    raw_data : dataframe
+        power density distribution, including the null point.
+    raw_header : dataframe
+        header of the power density distribution.
+
+    """
+
+    # The beam width equals half of the window
+    profile = getattr(synthetic, shape)
+    z = synthetic.add_background(profile(size, size, size / 2, peak=PEAK),
+                                 NULL_POINT)
+
+    # Integer ADC values, as measured by the detector
+    return synthetic.frame(np.round(z), WINDOW / size, nullPoint=NULL_POINT)
+
+
+def measure(func, repeat):
+    """
+    `measure` returns the best wall time of `repeat` calls of `func`.
+    """
+
+    best = float('inf')
+
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def cases(raw_data, raw_header, fullPath, tmp):
+    """
+    `cases` returns the benchmark cases of one power density distribution, as
+    a list of (name, function) pairs.
+    """
+
+    null = dp.remove_background(raw_data, raw_header)
+    null_t = null.T
+
+    beam = beamprofiler.Beam(tmp, os.path.basename(fullPath), ETA, EPSILON,
+                             MIX, raw_data=raw_data, raw_header=raw_header)
+
+    # Inputs of the functions that depend on other results
+    area_eta = beam.irradiationArea_eta
+    area_epsilon = beam.irradiationArea_epsilon
+    moments = dp.raw_moments(null_t, raw_header)
+    energy_curve = dp.pre_top_hat(raw_data)
+    radial_profile = dp.radial_profile(null, beam.xResolution,
+                                       beam.yResolution, beam.centerX,
+                                       beam.centerY)
+
+    def plotted(func):
+        def run():
+            func(tmp, beam.fileName, beam)
+            plt.close('all')
+        return run
+
+    return [
+        # Loading
+        ('load', lambda: (dp.raw_data(fullPath), dp.raw_header(fullPath))),
+        ('remove_background', lambda: dp.remove_background(raw_data,
+                                                           raw_header)),
+        ('beam', lambda: beamprofiler.Beam(tmp, beam.fileName, ETA, EPSILON,
+                                           MIX, raw_data=raw_data,
+                                           raw_header=raw_header)),
+        ('beam.iterative',
+         lambda: beamprofiler.Beam(tmp, beam.fileName, ETA, EPSILON, MIX,
+                                   raw_data=raw_data, raw_header=raw_header,
+                                   width_mode='iterative')),
+
+        # iso.measured_quantities
+        ('mq.max_power_density', lambda: mq.max_power_density(null)),
+        ('mq.total_power', lambda: mq.total_power(null)),
+        ('mq.clip_level_power_density',
+         lambda: mq.clip_level_power_density(null, ETA)),
+        ('mq.clip_level_power', lambda: mq.clip_level_power(null, ETA)),
+
+        # iso.characterizing_parameters
+        ('iso_cp.fractional_power',
+         lambda: iso_cp.fractional_power(null, ETA)),
+        ('iso_cp.beam_center',
+         lambda: iso_cp.beam_center(null_t, raw_header)),
+        ('iso_cp.beam_width',
+         lambda: iso_cp.beam_width(null_t, raw_header, beam.centerX,
+                                   beam.centerY)),
+        ('dp.raw_moments', lambda: dp.raw_moments(null_t, raw_header)),
+        ('iso_cp.iterative_moments',
+         lambda: iso_cp.iterative_moments(null)),
+        ('iso_cp.principal_widths',
+         lambda: iso_cp.principal_widths(moments, beam.xResolution,
+                                         beam.yResolution)),
+        ('iso_cp.ellipticity',
+         lambda: iso_cp.ellipticity(beam.widthMajor, beam.widthMinor)),
+        ('iso_cp.beam_aspect_ratio',
+         lambda: iso_cp.beam_aspect_ratio(beam.widthX, beam.xResolution,
+                                          beam.widthY, beam.yResolution)),
+        ('iso_cp.clip_level_irradiation_area',
+         lambda: iso_cp.clip_level_irradiation_area(null, ETA)),
+        ('iso_cp.clip_level_average_power_density',
+         lambda: iso_cp.clip_level_average_power_density(beam.power_eta,
+                                                         area_eta)),
+        ('iso_cp.flatness_factor',
+         lambda: iso_cp.flatness_factor(beam.averagePowerDensity_eta,
+                                        beam.maxPowerDensity)),
+        ('iso_cp.beam_uniformity',
+         lambda: iso_cp.beam_uniformity(null, raw_header,
+                                        beam.averagePowerDensity_eta,
+                                        area_eta, beam.powerDensity_eta)),
+        ('iso_cp.plateau_uniformity',
+         lambda: iso_cp.plateau_uniformity(null, beam.maxPowerDensity, MIX)),
+        ('iso_cp.edge_steepness',
+         lambda: iso_cp.edge_steepness(area_epsilon, area_eta)),
+
+        # niso.characterizing_parameters
+        ('niso_cp.plateau_uniformity',
+         lambda: niso_cp.plateau_uniformity(null, MIX)),
+        ('niso_cp.clip_level_beam_width',
+         lambda: niso_cp.clip_level_beam_width(null, ETA)),
+        ('niso_cp.clip_level_edge_width',
+         lambda: niso_cp.clip_level_edge_width(null, EPSILON, ETA)),
+        ('dp.pre_top_hat', lambda: dp.pre_top_hat(raw_data)),
+        ('niso_cp.top_hat_factor',
+         lambda: niso_cp.top_hat_factor(energy_curve)),
+        ('dp.radial_profile',
+         lambda: dp.radial_profile(null, beam.xResolution, beam.yResolution,
+                                   beam.centerX, beam.centerY)),
+        ('niso_cp.encircled_energy_diameter',
+         lambda: niso_cp.encircled_energy_diameter(radial_profile)),
+
+        # Auxiliary graphs and report
+        ('plot.histogram', plotted(plot.histogram)),
+        ('plot.heat_map_2d', plotted(plot.heat_map_2d)),
+        ('plot.heat_map_3d', plotted(plot.heat_map_3d)),
+        ('plot.norm_energy_curve', plotted(plot.norm_energy_curve)),
+        ('report.write', lambda: report.write(tmp, beam.fileName, beam)),
+    ]
+
+
+def run(sizes, shapes, repeat, only=None):
+    """
+    `run` runs the benchmark suite and returns the wall time of each case in
+    seconds, keyed by `shape/size/case`.
+    """
+
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            for shape in shapes:
+                raw_data, raw_header = frame(shape, size)
+                fullPath = os.path.join(tmp, '%s_%d.xls' % (shape, size))
+                synthetic.save(fullPath, raw_data, raw_header)
+
+                for name, func in cases(raw_data, raw_header, fullPath, tmp):
+                    if only and not any(o in name for o in only):
+                        continue
+
+                    key = '%s/%d/%s' % (shape, size, name)
+                    results[key] = measure(func, repeat)
+                    print('%-50s %10.4f s' % (key, results[key]))
+                    sys.stdout.flush()
+
+    return results
+
+
+def compare(results, baseline, threshold, min_time):
+    """
+    `compare` returns the cases that are slower than the baseline by more than
+    `threshold` (relative). Cases faster than `min_time` seconds in the
+    baseline are ignored, since their timings are dominated by noise.
+    """
+
+    regressions = []
+
+    for key, seconds in sorted(results.items()):
+        if key not in baseline or baseline[key] < min_time:
+            continue
+
+        ratio = seconds / baseline[key]
+        if ratio > 1 + threshold:
+            regressions.append((key, baseline[key], seconds, ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='frame sizes in pixel (default: %(default)s)')
+    parser.add_argument('--shapes', nargs='+', default=SHAPES,
+                        choices=SHAPES, help='beam shapes')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='repetitions per case, the best is kept')
+    parser.add_argument('--only', nargs='+',
+                        help='run only the cases whose name contains any of '
+                             'these strings')
+    parser.add_argument('--output', default='benchmark.json',
+                        help='JSON file where the results are saved')
+    parser.add_argument('--baseline',
+                        help='JSON file with the baseline results')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown flagged as a regression')
+    parser.add_argument('--min-time', type=float, default=1e-3,
+                        help='ignore cases faster than this (seconds)')
+    args = parser.parse_args(argv)
+
+    # Fail before running the suite rather than skipping the comparison
+    if args.baseline and not os.path.isfile(args.baseline):
+        parser.error("the baseline %s does not exist, generate it with "
+                     "`make bench-baseline`" % args.baseline)
+
+    results = run(args.sizes, args.shapes, args.repeat, args.only)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {
+                'beamprofiler': beamprofiler.__version__,
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'platform': platform.platform(),
+                'repeat': args.repeat,
+            },
+            'results': results,
+        }, f, indent=2, sort_keys=True)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+
+    regressions = compare(results, baseline, args.threshold, args.min_time)
+
+    for key, before, after, ratio in regressions:
+        print('REGRESSION %-50s %10.4f s -> %10.4f s (x%.2f)'
+              % (key, before, after, ratio))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
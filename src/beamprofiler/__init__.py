@@ -11,6 +11,9 @@ __version__ = '1.2.0'
 
 
 from beamprofiler import iso, niso, utils
-from beamprofiler.beam import Beam
+from beamprofiler.beam import Beam, analyze
+from beamprofiler.result import BeamResult
+from beamprofiler.tracker import Tracker
 
-__all__ = ['Beam', 'iso', 'niso', 'utils']
+__all__ = ['Beam', 'BeamResult', 'Tracker', 'analyze', 'iso', 'niso',
+           'utils']
@@ -6,25 +6,34 @@ to the beam analysis.
 
 import os
 
+import numpy as np
+
 from beamprofiler.iso import characterizing_parameters as iso_cp
 from beamprofiler.iso import measured_quantities as mq
 from beamprofiler.niso import characterizing_parameters as niso_cp
+from beamprofiler.result import BeamResult
+from beamprofiler.utils import background
 from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import defects
+from beamprofiler.utils import timing
+from beamprofiler.utils.pyramid import Pyramid
+from beamprofiler.utils.summed_area import SummedAreaTable
 
 
 class Beam:
     """
     Class `Beam`.
 
-    There are five categories of instance variables:
+    There are six categories of instance variables:
     1. defined by the user:
     2. defined in `utils.data_processing.py`
     3. defined in `iso.measured_quantities.py`
     4. defined in `iso.characterizing_parameters.py`
     5. defined in `niso.characterizing_parameters.py`
+    6. defined in `utils.timing.py`
     """
 
-    def __init__(self, path, fileName, eta, epsilon, mix):
+    def __init__(self, path, fileName, eta, epsilon, mix, **kwargs):
         """
         Initialize an instance of type `Beam` with all relevant data related to
         the beam analysis.
@@ -42,14 +51,133 @@ class Beam:
         mix : int
             number of normal mixtures used in the normal fit. mix=[1, 2, 3].
 
+        Other Parameters
+        ----------------
+        raw_data : dataframe
+            power density distribution. If defined, it is used instead of
+            reading the file, and `path` and `fileName` only identify the
+            source of the data. The default is None.
+        raw_header : dataframe
+            header of the power density distribution. It must be defined
+            together with `raw_data`. The default is None.
+        timer : Timer or bool
+            times each stage of the beam analysis, see `utils.timing`. If True,
+            a new `Timer` is used. The default is the timer activated by
+            `utils.timing.instrument`, if any.
+        width_mode : str
+            `moments` to calculate the beam center and widths from the moments
+            of the full power density distribution, or `iterative` to
+            calculate them inside an integration window that is iterated until
+            the beam width converges, see `iso.characterizing_parameters.
+            iterative_moments`. The default is `moments`.
+        window_factor : float
+            size of the integration window relative to the beam width in the
+            `iterative` width mode. The default is 3.
+        tolerance : float
+            relative change of the beam width below which the iteration stops
+            in the `iterative` width mode. The default is 1e-3.
+        roi : bool or tuple
+            region of interest (ROI) where the beam analysis is run. If True,
+            the ROI is found with `utils.data_processing.beam_roi`, or it can
+            be given as (i0, i1, j0, j1) pixel bounds. The power density
+            outside the ROI, e.g. the background noise, is ignored, while the
+            beam center is given in full-frame coordinates. The default is
+            False, i.e. the whole power density distribution.
+        roi_threshold : float
+            fraction of the maximum of each projection above which the beam is
+            detected, see `utils.data_processing.beam_roi`. The default is
+            0.05.
+        roi_margin : float
+            margin added on each side of the detected beam, relative to its
+            size, see `utils.data_processing.beam_roi`. The default is 0.5.
+        dark_frame : str, dataframe, or ndarray
+            background map subtracted pixel by pixel instead of the null point
+            of the header, see `utils.data_processing.remove_background`. If
+            it is a full path, the background map is loaded once and kept in
+            `dark_cache`, see `utils.background`. The default is None.
+        dark_cache : DarkFrameCache
+            cache of the background maps. The default is
+            `utils.background.cache`.
+        in_place : bool
+            if True, the background is corrected in place on a single buffer
+            of the floating-point type given by
+            `utils.data_processing.corrected_dtype`, i.e. the type of
+            floating-point data, float32 for integers of up to 16 bits, and
+            float64 otherwise, see `utils.data_processing.float_buffer`, so
+            that the uncorrected power density distribution is not kept in
+            memory: `raw_data` is None and `uncorrected` re-adds the null
+            point or the background map on request. Note that any writable
+            floating-point `raw_data` given by the user, e.g. float32 or
+            float64, is modified, while any other data, e.g. integer or
+            read-only memory-mapped data, is copied once. The default is
+            False.
+        dtype : dtype
+            storage type of the power density distribution, e.g. float32, or
+            uint16 or int32 for ADC counts, to reduce the memory footprint.
+            The null point or background map is kept as a separate offset,
+            see `background`, and the noise-corrected power density
+            distribution is held in the type given by
+            `utils.data_processing.corrected_dtype`. The reductions are
+            accumulated in float64. The default is None, i.e. the type
+            inferred when reading the file or the type of `raw_data`.
+        bad_pixels : str or ndarray
+            bad-pixel mask of the detector, True for the defective pixels,
+            which are replaced by the median of their valid neighbours, see
+            `utils.defects`. If it is a full path to a .npy file, the mask is
+            loaded once and kept in `utils.defects.cache`. The default is
+            None.
+        detect_defects : bool
+            if True, outliers from the local median are detected and corrected
+            as defective pixels, in addition to `bad_pixels`, see
+            `utils.defects.detect`. The default is False.
+        defect_threshold : float
+            minimum deviation from the local median relative to the noise of
+            a detected defective pixel. The default is 8.
+
         Returns
         -------
         None.
         """
 
+        # Check if any default value has been redefined in kwargs
+        raw_data = kwargs.pop('raw_data', None)
+        raw_header = kwargs.pop('raw_header', None)
+        timer = kwargs.pop('timer', None)
+        width_mode = kwargs.pop('width_mode', 'moments')
+        window_factor = kwargs.pop('window_factor', 3)
+        tolerance = kwargs.pop('tolerance', 1e-3)
+        roi = kwargs.pop('roi', False)
+        roi_threshold = kwargs.pop('roi_threshold', 0.05)
+        roi_margin = kwargs.pop('roi_margin', 0.5)
+        dark_frame = kwargs.pop('dark_frame', None)
+        dark_cache = kwargs.pop('dark_cache', background.cache)
+        in_place = kwargs.pop('in_place', False)
+        dtype = kwargs.pop('dtype', None)
+        bad_pixels = kwargs.pop('bad_pixels', None)
+        detect_defects = kwargs.pop('detect_defects', False)
+        defect_threshold = kwargs.pop('defect_threshold', 8)
+
+        if width_mode not in ['moments', 'iterative']:
+            raise Exception("The width mode should be 'moments' or "
+                            "'iterative'.")
+
+        # Each beam keeps its own timings, which are also forwarded to the
+        # timer given by the user
+        if timer is True:
+            timer = timing.Timer()
+        elif timer is None or timer is False:
+            timer = timing.active()
+        t = timer.child() if timer.enabled else timer
+
         # =====================================================================
         # Instance variables defined by the user
         # =====================================================================
+        self.path = (
+            path
+        )
+        self.fileName = (
+            fileName
+        )
         self.eta = (
             eta
         )
@@ -63,122 +191,426 @@ class Beam:
         # =====================================================================
         # Instance variables define in utils.data_processing.py
         # =====================================================================
-        self.raw_data = (
-            dp.raw_data(os.path.join(path, fileName))
-        )
-        self.raw_header = (
-            dp.raw_header(os.path.join(path, fileName))
-        )
-        self.raw_data_null = (
-            dp.remove_background(self.raw_data,
-                                 self.raw_header)
-        )
-        self.xResolution = (
-            dp.get_xResolution(self.raw_header)
-        )
-        self.yResolution = (
-            dp.get_yResolution(self.raw_header)
+        with t.stage('raw_data'):
+            self.raw_data = (
+                dp.raw_data(os.path.join(path, fileName), dtype)
+                if raw_data is None else
+                raw_data.astype(dtype, copy=False)
+                if dtype is not None else raw_data
+            )
+        with t.stage('raw_header'):
+            self.raw_header = (
+                dp.raw_header(os.path.join(path, fileName))
+                if raw_header is None else raw_header
+            )
+        with t.stage('dark_frame'):
+            dark_map = (
+                dark_cache.get(dark_frame)
+                if isinstance(dark_frame, str) else dark_frame
+            )
+        with t.stage('remove_background'):
+            self.raw_data_null = (
+                dp.remove_background(self.raw_data,
+                                     self.raw_header,
+                                     dark_map,
+                                     dp.float_buffer(self.raw_data)
+                                     if in_place else None)
+            )
+
+        # Null point or background map subtracted from the power density
+        # distribution. In place, the uncorrected power density distribution
+        # is only recovered by re-adding it, see `uncorrected`
+        self.background = (
+            dp.get_nullPoint(self.raw_header)
+            if dark_map is None else dark_map
         )
+        if in_place:
+            self.raw_data = None
+
+        with t.stage('defects'):
+            self.badPixels = (
+                (defects.cache.get(bad_pixels)
+                 if isinstance(bad_pixels, str) else
+                 np.asarray(bad_pixels, dtype=bool))
+                if bad_pixels is not None else None
+            )
+            if detect_defects:
+                detected = defects.detect(self.raw_data_null,
+                                          defect_threshold)
+                self.badPixels = (
+                    detected if self.badPixels is None else
+                    self.badPixels | detected
+                )
+            if self.badPixels is not None:
+                self.raw_data_null = defects.correct(self.raw_data_null,
+                                                     self.badPixels)
+
+        with t.stage('get_xResolution'):
+            self.xResolution = (
+                dp.get_xResolution(self.raw_header)
+            )
+        with t.stage('get_yResolution'):
+            self.yResolution = (
+                dp.get_yResolution(self.raw_header)
+            )
+        with t.stage('roi'):
+            self.roi = (
+                dp.beam_roi(self.raw_data_null,
+                            roi_threshold,
+                            roi_margin)
+                if roi is True else
+                tuple(roi) if roi else
+                (0, self.raw_data_null.shape[1],
+                 0, self.raw_data_null.shape[0])
+            )
+
+        # Every metric is calculated inside the ROI, and the beam center is
+        # mapped back to full-frame coordinates
+        if roi:
+            roi_data_null, roi_header = dp.crop(self.raw_data_null,
+                                                self.raw_header,
+                                                self.roi)
+        else:
+            roi_data_null, roi_header = self.raw_data_null, self.raw_header
 
         # =====================================================================
         # Instance variables defined in iso.measure_quantities.py
         # =====================================================================
-        self.maxPowerDensity = (
-            mq.max_power_density(self.raw_data_null)
-        )
-        self.totalPower = (
-            mq.total_power(self.raw_data_null)
-        )
-        self.powerDensity_eta = (
-            mq.clip_level_power_density(self.raw_data_null,
-                                        self.eta)
-        )
-        self.power_eta = (
-            mq.clip_level_power(self.raw_data_null,
-                                self.eta)
-        )
+        with t.stage('max_power_density'):
+            self.maxPowerDensity = (
+                mq.max_power_density(roi_data_null)
+            )
+        with t.stage('total_power'):
+            self.totalPower = (
+                mq.total_power(roi_data_null)
+            )
+        with t.stage('clip_level_power_density'):
+            self.powerDensity_eta = (
+                mq.clip_level_power_density(roi_data_null,
+                                            self.eta)
+            )
+        with t.stage('clip_level_power'):
+            self.power_eta = (
+                mq.clip_level_power(roi_data_null,
+                                    self.eta)
+            )
 
         # =====================================================================
         # Instance variables defined in iso.characterizing_parameters.py
         # =====================================================================
-        self.fractionalPower_eta = (
-            iso_cp.fractional_power(self.raw_data_null,
-                                    self.eta)
-        )
-        self.centerX, self.centerY = (
-            iso_cp.beam_center(self.raw_data_null.T,
-                               self.raw_header)
-        )
-        self.widthX, self.widthY = (
-            iso_cp.beam_width(self.raw_data_null.T,
-                              self.raw_header,
-                              self.centerX,
-                              self.centerY)
-        )
-        self.aspectRatio = (
-            iso_cp.beam_aspect_ratio(self.widthX,
-                                     self.xResolution,
-                                     self.widthY,
-                                     self.yResolution)
-        )
-        self.irradiationArea_eta = (
-            iso_cp.clip_level_irradiation_area(self.raw_data_null,
-                                               self.eta)
-        )
-        self.irradiationArea_epsilon = (
-            iso_cp.clip_level_irradiation_area(self.raw_data_null,
-                                               self.epsilon)
-        )
-        self.averagePowerDensity_eta = (
-            iso_cp.clip_level_average_power_density(self.power_eta,
-                                                    self.irradiationArea_eta)
-        )
-        self.flatnessFactor_eta = (
-            iso_cp.flatness_factor(self.averagePowerDensity_eta,
-                                   self.maxPowerDensity)
-        )
-        self.beamUniformity_eta = (
-            iso_cp.beam_uniformity(self.raw_data_null,
-                                   self.raw_header,
-                                   self.averagePowerDensity_eta,
-                                   self.irradiationArea_eta,
-                                   self.powerDensity_eta)
-        )
-        self.plateauUniformity_eta = (
-            iso_cp.plateau_uniformity(self.raw_data_null,
-                                      self.maxPowerDensity,
-                                      self.mix)
-        )
-        self.edgeSteepness_eta = (
-            iso_cp.edge_steepness(self.irradiationArea_epsilon,
-                                  self.irradiationArea_eta)
-        )
+        with t.stage('fractional_power'):
+            self.fractionalPower_eta = (
+                iso_cp.fractional_power(roi_data_null,
+                                        self.eta)
+            )
+        with t.stage('raw_moments'):
+            moments = (
+                dp.raw_moments(roi_data_null.T,
+                               roi_header)
+                if width_mode == 'moments' else
+                iso_cp.iterative_moments(roi_data_null,
+                                         window_factor,
+                                         tolerance)
+            )
+        with t.stage('beam_center'):
+            self.centerX, self.centerY = (
+                iso_cp.beam_center(roi_data_null.T,
+                                   roi_header,
+                                   moments=moments)
+            )
+        with t.stage('beam_width'):
+            self.widthX, self.widthY = (
+                iso_cp.beam_width(roi_data_null.T,
+                                  roi_header,
+                                  self.centerX,
+                                  self.centerY,
+                                  moments=moments)
+            )
+
+        # Map the beam center back to full-frame coordinates
+        self.centerX += self.roi[0]
+        self.centerY += self.roi[2]
+
+        with t.stage('principal_widths'):
+            self.widthMajor, self.widthMinor, self.azimuth = (
+                iso_cp.principal_widths(moments,
+                                        self.xResolution,
+                                        self.yResolution)
+            )
+        with t.stage('ellipticity'):
+            self.ellipticity = (
+                iso_cp.ellipticity(self.widthMajor,
+                                   self.widthMinor)
+            )
+        with t.stage('beam_aspect_ratio'):
+            self.aspectRatio = (
+                iso_cp.beam_aspect_ratio(self.widthX,
+                                         self.xResolution,
+                                         self.widthY,
+                                         self.yResolution)
+            )
+        with t.stage('clip_level_irradiation_area_eta'):
+            self.irradiationArea_eta = (
+                iso_cp.clip_level_irradiation_area(roi_data_null,
+                                                   self.eta)
+            )
+        with t.stage('clip_level_irradiation_area_epsilon'):
+            self.irradiationArea_epsilon = (
+                iso_cp.clip_level_irradiation_area(roi_data_null,
+                                                   self.epsilon)
+            )
+        with t.stage('clip_level_average_power_density'):
+            self.averagePowerDensity_eta = (
+                iso_cp.clip_level_average_power_density(
+                    self.power_eta,
+                    self.irradiationArea_eta)
+            )
+        with t.stage('flatness_factor'):
+            self.flatnessFactor_eta = (
+                iso_cp.flatness_factor(self.averagePowerDensity_eta,
+                                       self.maxPowerDensity)
+            )
+        with t.stage('beam_uniformity'):
+            self.beamUniformity_eta = (
+                iso_cp.beam_uniformity(roi_data_null,
+                                       roi_header,
+                                       self.averagePowerDensity_eta,
+                                       self.irradiationArea_eta,
+                                       self.powerDensity_eta)
+            )
+        with t.stage('plateau_uniformity'):
+            self.plateauUniformity_eta = (
+                iso_cp.plateau_uniformity(roi_data_null,
+                                          self.maxPowerDensity,
+                                          self.mix)
+            )
+        with t.stage('edge_steepness'):
+            self.edgeSteepness_eta = (
+                iso_cp.edge_steepness(self.irradiationArea_epsilon,
+                                      self.irradiationArea_eta)
+            )
 
         # =====================================================================
         # Instance variables defined in niso.characterizing_parameters.py
         # =====================================================================
-        self.widthX_eta = (
-            niso_cp.clip_level_beam_width(self.raw_data_null.T,
-                                          self.eta)
-        )
-        self.widthY_eta = (
-            niso_cp.clip_level_beam_width(self.raw_data_null,
-                                          self.eta)
-        )
-        self.edgeX_epsilon_eta = (
-            niso_cp.clip_level_edge_width(self.raw_data_null.T,
-                                          self.epsilon,
-                                          self.eta)
-        )
-        self.edgeY_epsilon_eta = (
-            niso_cp.clip_level_edge_width(self.raw_data_null,
-                                          self.epsilon,
-                                          self.eta)
-        )
-        self.modPlateauUniformity_eta = (
-            niso_cp.plateau_uniformity(self.raw_data_null,
-                                       self.mix)
+        with t.stage('clip_level_beam_width_x'):
+            self.widthX_eta = (
+                niso_cp.clip_level_beam_width(roi_data_null.T,
+                                              self.eta)
+            )
+        with t.stage('clip_level_beam_width_y'):
+            self.widthY_eta = (
+                niso_cp.clip_level_beam_width(roi_data_null,
+                                              self.eta)
+            )
+        with t.stage('clip_level_edge_width_x'):
+            self.edgeX_epsilon_eta = (
+                niso_cp.clip_level_edge_width(roi_data_null.T,
+                                              self.epsilon,
+                                              self.eta)
+            )
+        with t.stage('clip_level_edge_width_y'):
+            self.edgeY_epsilon_eta = (
+                niso_cp.clip_level_edge_width(roi_data_null,
+                                              self.epsilon,
+                                              self.eta)
+            )
+        with t.stage('niso_plateau_uniformity'):
+            self.modPlateauUniformity_eta = (
+                niso_cp.plateau_uniformity(roi_data_null,
+                                           self.mix)
+            )
+        with t.stage('pre_top_hat'):
+            energy_curve = (
+                self.energy_curve()
+            )
+        with t.stage('top_hat_factor'):
+            self.topHatFactor = (
+                niso_cp.top_hat_factor(energy_curve)
+            )
+        with t.stage('radial_profile'):
+            radial_profile = (
+                dp.radial_profile(roi_data_null,
+                                  self.xResolution,
+                                  self.yResolution,
+                                  self.centerX - self.roi[0],
+                                  self.centerY - self.roi[2])
+            )
+        with t.stage('encircled_energy_diameter'):
+            self.diameter86 = (
+                niso_cp.encircled_energy_diameter(radial_profile)
+            )
+
+        # =====================================================================
+        # Instance variables defined in utils.timing.py
+        # =====================================================================
+        self.timings = (
+            t.as_dict()
         )
-        self.topHatFactor = (
-            niso_cp.top_hat_factor(dp.pre_top_hat(self.raw_data))
+
+        # Built on first use, see `summedAreaTable` and `pyramid`
+        self._summedAreaTable = None
+        self._pyramid = None
+
+    def uncorrected(self):
+        """
+        `uncorrected` returns the power density distribution before the
+        background correction. In place, see `in_place`, it is rebuilt by
+        re-adding the null point or the background map to a new dataframe.
+
+        Returns
+        -------
+        dataframe
+            uncorrected power density distribution.
+
+        """
+
+        if self.raw_data is not None:
+            return self.raw_data
+
+        return self.raw_data_null + self.background
+
+    def energy_curve(self):
+        """
+        `energy_curve` returns the normalized energy curve inside the region of
+        interest (ROI), see `utils.data_processing.pre_top_hat`, i.e. the
+        curve from which `topHatFactor` is calculated. It is built on the
+        uncorrected power density distribution, or, in place or with defective
+        pixels, on the corrected one with the background added back.
+
+        Returns
+        -------
+        dataframe
+            normalized energy curve.
+
+        """
+
+        i0, i1, j0, j1 = self.roi
+
+        if self.raw_data is not None and self.badPixels is None:
+            return dp.pre_top_hat(self.raw_data.iloc[j0:j1, i0:i1])
+
+        background = (
+            self.background if np.ndim(self.background) == 0 else
+            np.asarray(self.background)[j0:j1, i0:i1]
         )
+
+        return dp.pre_top_hat(self.raw_data_null.iloc[j0:j1, i0:i1],
+                              background)
+
+    @property
+    def summedAreaTable(self):
+        """
+        `summedAreaTable` returns the summed-area table of the noise-corrected
+        power density distribution, see `utils.summed_area`. The table is built
+        on first use and kept for later queries.
+
+        Returns
+        -------
+        SummedAreaTable
+            summed-area table of the power density distribution.
+
+        """
+
+        if self._summedAreaTable is None:
+            self._summedAreaTable = SummedAreaTable(self.raw_data_null,
+                                                    self.xResolution,
+                                                    self.yResolution)
+
+        return self._summedAreaTable
+
+    @property
+    def pyramid(self):
+        """
+        `pyramid` returns the multi-resolution pyramid of the noise-corrected
+        power density distribution, see `utils.pyramid`. The pyramid is built
+        on first use and kept for later queries.
+
+        Returns
+        -------
+        Pyramid
+            multi-resolution pyramid of the power density distribution.
+
+        """
+
+        if self._pyramid is None:
+            self._pyramid = Pyramid(self.raw_data_null, self.xResolution,
+                                    self.yResolution)
+
+        return self._pyramid
+
+    def rect(self, rect):
+        """
+        `rect` returns the power, the pixel count, and the average power
+        density inside reference rectangles defined as in
+        `utils.plot.heat_map_2d`. Each element of `rect` can be an array, e.g.
+        to sweep the size of a square aperture.
+
+        Parameters
+        ----------
+        rect : tuple
+            (width, length, x_offset, y_offset) of the reference rectangles in
+            millimeter, relative to the center of the beam.
+
+        Returns
+        -------
+        float64 or ndarray
+            power inside the reference rectangles.
+        int64 or ndarray
+            number of pixels inside the reference rectangles.
+        float64 or ndarray
+            average power density inside the reference rectangles.
+
+        """
+
+        sat = self.summedAreaTable
+        bounds = sat.bounds(rect, self.centerX, self.centerY)
+
+        return (sat.power(*bounds),
+                sat.count(*bounds),
+                sat.average_power_density(*bounds))
+
+    def result(self):
+        """
+        `result` returns the results of the beam analysis without the power
+        density distribution, see `BeamResult`.
+
+        Returns
+        -------
+        BeamResult
+            results of the beam analysis.
+
+        """
+
+        return BeamResult.from_beam(self)
+
+
+def analyze(path, fileName, eta, epsilon, mix, **kwargs):
+    """
+    `analyze` runs the beam analysis and returns only its results. Unlike an
+    instance of type `Beam`, the returned `BeamResult` does not hold the power
+    density distribution, so it is cheap to send between processes.
+
+    Parameters
+    ----------
+    path : str
+        path to the power density distribution file.
+    fileName : str
+        name of the power density distribution file.
+    eta : float
+        upper clip level. 0 <= eta <= 1.
+    epsilon : float
+        lower clip level. 0 <= epsilon <= eta <= 1.
+    mix : int
+        number of normal mixtures used in the normal fit. mix=[1, 2, 3].
+    **kwargs
+        other parameters of `Beam`.
+
+    Returns
+    -------
+    BeamResult
+        results of the beam analysis.
+
+    """
+
+    return Beam(path, fileName, eta, epsilon, mix, **kwargs).result()
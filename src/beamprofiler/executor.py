@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the multiprocess beam analysis. The power density
+distributions are placed in shared memory blocks, and the worker processes
+only receive a small descriptor of each block, which they wrap as a NumPy view
+without copying the data. The worker processes return the results as
+`BeamResult`, so that no power density distribution is pickled in either
+direction.
+
+Shared memory requires Python 3.8 or later.
+"""
+
+import collections
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from beamprofiler.beam import Beam
+
+# Descriptor of a power density distribution placed in shared memory: name of
+# the shared memory block, shape and data type of the array, values of the
+# header, and the source identity
+SharedFrame = collections.namedtuple(
+    'SharedFrame', ['name', 'shape', 'dtype', 'header', 'path', 'fileName'])
+
+
+def share(raw_data, raw_header, path='', fileName=''):
+    """
+    `share` copies a power density distribution to a new shared memory block.
+    The caller owns the block and must release it with `release` once the
+    analysis is finished.
+
+    Parameters
+    ----------
+    raw_data : dataframe or ndarray
+        power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+    path : str, optional
+        path to the power density distribution file. The default is ''.
+    fileName : str, optional
+        name of the power density distribution file. The default is ''.
+
+    Returns
+    -------
+    shm : SharedMemory
+        shared memory block that holds the power density distribution.
+    frame : SharedFrame
+        descriptor of the shared memory block.
+
+    """
+
+    raw_data_np = np.asarray(raw_data)
+
+    # A shared memory block cannot be empty
+    shm = shared_memory.SharedMemory(create=True,
+                                     size=max(raw_data_np.nbytes, 1))
+    view = np.ndarray(raw_data_np.shape, dtype=raw_data_np.dtype,
+                      buffer=shm.buf)
+    view[...] = raw_data_np
+
+    frame = SharedFrame(shm.name,
+                        raw_data_np.shape,
+                        raw_data_np.dtype.str,
+                        tuple(raw_header.iloc[0].tolist()),
+                        path,
+                        fileName)
+
+    return shm, frame
+
+
+def attach(frame):
+    """
+    `attach` opens the shared memory block described by `frame` and wraps it
+    as a NumPy view. The view must be deleted before the block is closed.
+
+    Parameters
+    ----------
+    frame : SharedFrame
+        descriptor of the shared memory block.
+
+    Returns
+    -------
+    shm : SharedMemory
+        shared memory block that holds the power density distribution.
+    raw_data_np : ndarray
+        view of the power density distribution.
+
+    """
+
+    # Only the owner of the block should track it, otherwise the block may be
+    # removed when a worker process exits (Python 3.13 and later)
+    try:
+        shm = shared_memory.SharedMemory(name=frame.name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=frame.name)
+
+    raw_data_np = np.ndarray(frame.shape, dtype=np.dtype(frame.dtype),
+                             buffer=shm.buf)
+
+    return shm, raw_data_np
+
+
+def release(shm):
+    """
+    `release` closes and removes a shared memory block created by `share`.
+
+    Parameters
+    ----------
+    shm : SharedMemory
+        shared memory block.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    shm.close()
+    shm.unlink()
+
+
+def analyze(frame, eta, epsilon, mix, **kwargs):
+    """
+    `analyze` runs the beam analysis of a power density distribution placed in
+    shared memory. This function is executed by the worker processes.
+
+    Parameters
+    ----------
+    frame : SharedFrame
+        descriptor of the shared memory block.
+    eta : float
+        upper clip level. 0 <= eta <= 1.
+    epsilon : float
+        lower clip level. 0 <= epsilon <= eta <= 1.
+    mix : int
+        number of normal mixtures used in the normal fit. mix=[1, 2, 3].
+    **kwargs
+        other parameters of `Beam`.
+
+    Returns
+    -------
+    BeamResult
+        results of the beam analysis.
+
+    """
+
+    shm, raw_data_np = attach(frame)
+
+    try:
+        # The dataframe is a view of the shared memory block
+        beam = Beam(frame.path, frame.fileName, eta, epsilon, mix,
+                    raw_data=pd.DataFrame(raw_data_np, copy=False),
+                    raw_header=pd.DataFrame([list(frame.header)]),
+                    **kwargs)
+        result = beam.result()
+
+        # Drop every view of the block so that it can be closed
+        del beam, raw_data_np
+    finally:
+        shm.close()
+
+    return result
+
+
+class Executor:
+    """
+    Class `Executor`.
+
+    `Executor` runs the beam analysis of many power density distributions in a
+    pool of worker processes. Each submitted power density distribution is
+    placed in its own shared memory block, which is released as soon as its
+    analysis is finished, or at the latest when the executor is closed.
+    """
+
+    def __init__(self, eta, epsilon, mix, max_workers=None, **kwargs):
+        """
+        Initialize an instance of type `Executor`.
+
+        Parameters
+        ----------
+        eta : float
+            upper clip level. 0 <= eta <= 1.
+        epsilon : float
+            lower clip level. 0 <= epsilon <= eta <= 1.
+        mix : int
+            number of normal mixtures used in the normal fit. mix=[1, 2, 3].
+        max_workers : int, optional
+            number of worker processes. The default is the number of
+            processors.
+        **kwargs
+            other parameters of `Beam`.
+
+        Returns
+        -------
+        None.
+        """
+
+        self.eta = eta
+        self.epsilon = epsilon
+        self.mix = mix
+        self.kwargs = kwargs
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(self.max_workers)
+
+        # Shared memory blocks of the analyses that are not finished yet
+        self.blocks = {}
+
+    def submit(self, raw_data, raw_header, path='', fileName=''):
+        """
+        `submit` schedules the beam analysis of a power density distribution.
+
+        Parameters
+        ----------
+        raw_data : dataframe or ndarray
+            power density distribution.
+        raw_header : dataframe
+            header of the power density distribution.
+        path : str, optional
+            path to the power density distribution file. The default is ''.
+        fileName : str, optional
+            name of the power density distribution file. The default is ''.
+
+        Returns
+        -------
+        Future
+            future of the `BeamResult`.
+
+        """
+
+        shm, frame = share(raw_data, raw_header, path, fileName)
+
+        try:
+            future = self.pool.submit(analyze, frame, self.eta, self.epsilon,
+                                      self.mix, **self.kwargs)
+        except Exception:
+            release(shm)
+            raise
+
+        self.blocks[future] = shm
+        future.add_done_callback(self._release)
+
+        return future
+
+    def _release(self, future):
+        """`_release` releases the shared memory block of `future`."""
+
+        shm = self.blocks.pop(future, None)
+
+        if shm is not None:
+            release(shm)
+
+    def map(self, frames, window=None):
+        """
+        `map` runs the beam analysis of many power density distributions and
+        yields the results in order. At most `window` power density
+        distributions are held in shared memory at the same time.
+
+        Parameters
+        ----------
+        frames : iterable of tuple
+            (raw_data, raw_header, path, fileName) of each power density
+            distribution. `path` and `fileName` are optional.
+        window : int, optional
+            maximum number of pending analyses. The default is twice the
+            number of worker processes.
+
+        Yields
+        ------
+        BeamResult
+            results of the beam analysis.
+
+        """
+
+        if window is None:
+            window = 2 * self.max_workers
+
+        pending = collections.deque()
+
+        for frame in frames:
+            pending.append(self.submit(*frame))
+
+            if len(pending) >= window:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+    def close(self):
+        """
+        `close` waits for the pending analyses, shuts down the worker
+        processes, and releases every remaining shared memory block.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        self.pool.shutdown(wait=True)
+
+        for future in list(self.blocks):
+            self._release(future)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -2,6 +2,7 @@
 This package handles the `ISO` part of the beam analysis.
 """
 
-from beamprofiler.iso import characterizing_parameters, measured_quantities
+from beamprofiler.iso import (caustic, characterizing_parameters,
+                              measured_quantities)
 
-__all__ = ['characterizing_parameters', 'measured_quantities']
+__all__ = ['caustic', 'characterizing_parameters', 'measured_quantities']
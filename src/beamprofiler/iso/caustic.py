@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the caustic analysis according to ISO 11146, i.e. the
+beam quality M², the beam waist, and the Rayleigh length from the beam widths
+of several planes at known positions z along the beam axis, e.g. the planes of
+a caustic scan, see `utils.planes`.
+
+Only the beam widths are calculated for each plane, without the full beam
+analysis of `Beam`. The planes are reduced to their projections on the x- and
+y-axis in parallel threads, and the beam widths of all planes follow from a
+single vectorized moment pass over the stacked projections. The squared beam
+widths are then fitted with the hyperbolic model
+
+d(z)^2 = a + b * z + c * z^2,
+
+which gives the beam waist width d0, the beam waist position z0, the
+divergence angle theta (full angle), the Rayleigh length z_R = d0 / theta, and
+M² = pi / (4 * lambda) * d0 * theta. All lengths are given in millimeter and
+all angles in radian.
+"""
+
+import math
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import planes as pl
+
+# Fitted parameters of one axis and their standard uncertainties, keyed by
+# 'waistWidth', 'waistPosition', 'divergence', 'rayleighLength', and 'm2'
+Fit = namedtuple('Fit', ['values', 'errors'])
+
+# Result of the caustic analysis: plane positions, beam widths of each plane
+# on the x- and y-axis, and the fit of each axis
+Caustic = namedtuple('Caustic', ['z', 'widthX', 'widthY', 'x', 'y'])
+
+
+def projections(raw_data_np, nullPoint=0):
+    """
+    `projections` returns the projections of noise-corrected power density
+    distributions on the x- and y-axis, accumulated in float64.
+
+    Parameters
+    ----------
+    raw_data_np : ndarray
+        power density distribution, or stack of power density distributions
+        along the first axis.
+    nullPoint : float or ndarray, optional
+        null point, or null point of each power density distribution. The
+        default is 0.
+
+    Returns
+    -------
+    ndarray
+        projection on the x-axis, i.e. sum of each column.
+    ndarray
+        projection on the y-axis, i.e. sum of each row.
+
+    """
+
+    raw_data_np = np.asarray(raw_data_np)
+    nullPoint = np.asarray(nullPoint, dtype=np.float64)
+    yPixel, xPixel = raw_data_np.shape[-2:]
+
+    # The null point is subtracted from the projections rather than from
+    # every pixel
+    sum_x = raw_data_np.sum(axis=-2, dtype=np.float64)
+    sum_y = raw_data_np.sum(axis=-1, dtype=np.float64)
+    sum_x -= (nullPoint * yPixel)[..., np.newaxis]
+    sum_y -= (nullPoint * xPixel)[..., np.newaxis]
+
+    return sum_x, sum_y
+
+
+def second_moment_widths(sum_x, sum_y, xResolution, yResolution):
+    """
+    `second_moment_widths` returns the beam widths of a stack of power density
+    distributions from their projections, see `projections`, in a single
+    vectorized pass. As in `iso.characterizing_parameters.beam_width`, the
+    beam width is four times the square root of the second-order moment about
+    the beam center, but the beam center is not rounded to a pixel and every
+    pixel is included.
+
+    Parameters
+    ----------
+    sum_x : ndarray
+        projection of each power density distribution on the x-axis.
+    sum_y : ndarray
+        projection of each power density distribution on the y-axis.
+    xResolution : float or ndarray
+        pixel resolution on the x-axis in millimeter per pixel.
+    yResolution : float or ndarray
+        pixel resolution on the y-axis in millimeter per pixel.
+
+    Returns
+    -------
+    ndarray
+        beam width on the x-axis in millimeter.
+    ndarray
+        beam width on the y-axis in millimeter.
+
+    """
+
+    def width(projection, resolution):
+        x = np.arange(projection.shape[-1], dtype=np.float64)
+        m_0 = projection.sum(axis=-1)
+        center = projection @ x / m_0
+
+        # Central moment, which does not cancel out far from the origin
+        m_2 = (projection * (x - center[..., np.newaxis])**2).sum(axis=-1)
+
+        return 4 * np.sqrt(m_2 / m_0) * resolution
+
+    return (width(np.atleast_2d(sum_x), np.asarray(xResolution)),
+            width(np.atleast_2d(sum_y), np.asarray(yResolution)))
+
+
+def stack_widths(stack, xResolution, yResolution, nullPoint=0, chunk=8,
+                 max_workers=None):
+    """
+    `stack_widths` returns the beam widths of a stack of power density
+    distributions held in memory, e.g. a memory-mapped array. The stack is
+    reduced to its projections in blocks of `chunk` planes in parallel
+    threads, see `projections`, and the beam widths follow from a single
+    moment pass, see `second_moment_widths`.
+
+    Parameters
+    ----------
+    stack : ndarray
+        power density distributions along the first axis.
+    xResolution : float
+        pixel resolution on the x-axis in millimeter per pixel.
+    yResolution : float
+        pixel resolution on the y-axis in millimeter per pixel.
+    nullPoint : float or ndarray, optional
+        null point, or null point of each plane. The default is 0.
+    chunk : int, optional
+        number of planes per block. The default is 8.
+    max_workers : int, optional
+        number of threads. The default is that of `ThreadPoolExecutor`.
+
+    Returns
+    -------
+    ndarray
+        beam width of each plane on the x-axis in millimeter.
+    ndarray
+        beam width of each plane on the y-axis in millimeter.
+
+    """
+
+    nullPoint = np.broadcast_to(np.asarray(nullPoint, dtype=np.float64),
+                                len(stack))
+    blocks = [slice(k, k + chunk) for k in range(0, len(stack), chunk)]
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        results = list(pool.map(
+            lambda block: projections(stack[block], nullPoint[block]),
+            blocks))
+
+    return second_moment_widths(np.concatenate([r[0] for r in results]),
+                                np.concatenate([r[1] for r in results]),
+                                xResolution, yResolution)
+
+
+def plane_widths(planes, max_workers=None):
+    """
+    `plane_widths` returns the beam widths of the planes of a file, see
+    `utils.planes`, or of a sequence of power density distributions. Each
+    plane is loaded and reduced to its projections in parallel threads, see
+    `projections`, and only the projections are kept. The beam widths of all
+    planes then follow from a single moment pass, see `second_moment_widths`.
+    All planes should have the same number of pixels.
+
+    Parameters
+    ----------
+    planes : Planes or sequence
+        index of the planes, or (raw_data, raw_header) of each plane.
+    max_workers : int, optional
+        number of threads. The default is that of `ThreadPoolExecutor`.
+
+    Returns
+    -------
+    ndarray
+        beam width of each plane on the x-axis in millimeter.
+    ndarray
+        beam width of each plane on the y-axis in millimeter.
+
+    """
+
+    def reduce(index):
+        raw_data, raw_header = planes[index]
+        sum_x, sum_y = projections(raw_data.to_numpy(),
+                                   dp.get_nullPoint(raw_header))
+
+        return (sum_x, sum_y, dp.get_xResolution(raw_header),
+                dp.get_yResolution(raw_header))
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        results = list(pool.map(reduce, range(len(planes))))
+
+    sum_x, sum_y, xResolution, yResolution = zip(*results)
+
+    return second_moment_widths(np.stack(sum_x), np.stack(sum_y),
+                                np.array(xResolution), np.array(yResolution))
+
+
+def fit(z, widths, wavelength):
+    """
+    `fit` returns the fit of the hyperbolic model to the beam widths of one
+    axis, see the module description. The squared beam widths are fitted by
+    linear least squares, and the standard uncertainties of the parameters
+    are propagated from the covariance of the fit, with the variance of the
+    squared beam widths estimated from the residuals. At least four planes
+    are needed for the uncertainties, and ISO 11146 recommends at least ten,
+    half of them within one Rayleigh length of the beam waist.
+
+    Parameters
+    ----------
+    z : array_like
+        position of each plane along the beam axis in millimeter.
+    widths : array_like
+        beam width of each plane in millimeter.
+    wavelength : float
+        wavelength in millimeter, e.g. 1.064e-3 for 1064 nm.
+
+    Returns
+    -------
+    Fit
+        fitted parameters and their standard uncertainties.
+
+    """
+
+    z = np.asarray(z, dtype=np.float64)
+    widths = np.asarray(widths, dtype=np.float64)
+
+    if len(z) < 3 or len(z) != len(widths):
+        raise Exception("The caustic fit needs the beam width of at least "
+                        "three planes.")
+
+    # Linear least squares of d^2 = a + b * z + c * z^2
+    A = np.vander(z, 3, increasing=True)
+    (a, b, c), rss = np.linalg.lstsq(A, widths**2, rcond=None)[:2]
+
+    d0_2 = a - b**2 / (4 * c)
+    if c <= 0 or d0_2 <= 0:
+        raise Exception("The beam widths do not follow a caustic.")
+
+    # Covariance of (a, b, c), estimated from the residuals
+    dof = len(z) - 3
+    variance = rss[0] / dof if dof and len(rss) else np.nan
+    covariance = variance * np.linalg.inv(A.T @ A)
+
+    d0 = math.sqrt(d0_2)
+    z0 = -b / (2 * c)
+    theta = math.sqrt(c)
+    k = math.pi / (4 * wavelength)
+
+    # Gradient of each parameter with respect to (a, b, c)
+    grad_d0 = np.array([1, -b / (2 * c), b**2 / (4 * c**2)]) / (2 * d0)
+    grad_z0 = np.array([0, -1 / (2 * c), b / (2 * c**2)])
+    grad_theta = np.array([0, 0, 1 / (2 * theta)])
+
+    values = {
+        'waistWidth': d0,
+        'waistPosition': z0,
+        'divergence': theta,
+        'rayleighLength': d0 / theta,
+        'm2': k * d0 * theta,
+    }
+    gradients = {
+        'waistWidth': grad_d0,
+        'waistPosition': grad_z0,
+        'divergence': grad_theta,
+        'rayleighLength': grad_d0 / theta - d0 / theta**2 * grad_theta,
+        'm2': k * (theta * grad_d0 + d0 * grad_theta),
+    }
+
+    errors = {key: math.sqrt(g @ covariance @ g)
+              for key, g in gradients.items()}
+
+    return Fit(values, errors)
+
+
+def analyze(planes, wavelength, z, max_workers=None):
+    """
+    `analyze` returns the caustic analysis of a series of planes, see the
+    module description. The position of each plane along the beam axis must
+    be given, since the plane number of the headers is not necessarily a
+    position in millimeter, in which case the fitted parameters would be
+    scaled by an unknown factor.
+
+    Parameters
+    ----------
+    planes : str, Planes, or sequence
+        full path to a file with several planes, index of the planes, see
+        `utils.planes`, or (raw_data, raw_header) of each plane.
+    wavelength : float
+        wavelength in millimeter, e.g. 1.064e-3 for 1064 nm.
+    z : array_like
+        position of each plane along the beam axis in millimeter.
+    max_workers : int, optional
+        number of threads. The default is that of `ThreadPoolExecutor`.
+
+    Returns
+    -------
+    Caustic
+        beam widths of each plane and fit of each axis.
+
+    """
+
+    if isinstance(planes, str):
+        with pl.scan(planes) as index:
+            return analyze(index, wavelength, z, max_workers)
+
+    z = np.asarray(z, dtype=np.float64)
+
+    if len(z) != len(planes):
+        raise Exception("The position of each plane along the beam axis "
+                        "should be given.")
+    widthX, widthY = plane_widths(planes, max_workers)
+
+    return Caustic(z, widthX, widthY,
+                   fit(z, widthX, wavelength),
+                   fit(z, widthY, wavelength))
@@ -10,6 +10,7 @@ import numpy as np
 
 from beamprofiler.iso import measured_quantities as mq
 from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils.summed_area import MomentTable
 
 
 def fractional_power(raw_data, clip_level):
@@ -41,7 +42,7 @@ def fractional_power(raw_data, clip_level):
     )
 
 
-def beam_center(raw_data, raw_header):
+def beam_center(raw_data, raw_header, moments=None):
     """
     `beam_center` returns the center coordinate of the power density
     distribution. In order to avoid errors induced by background noise, it is
@@ -59,6 +60,10 @@ def beam_center(raw_data, raw_header):
         noise-corrected power density distribution.
     raw_header : dataframe
         header of the power density distribution.
+    moments : dict, optional
+        image moments about the origin, as returned by
+        `utils.data_processing.raw_moments`. If defined, the moments are not
+        calculated again. The default is None.
 
     Returns
     -------
@@ -69,9 +74,12 @@ def beam_center(raw_data, raw_header):
 
     """
 
-    m_0 = dp.image_moments(raw_data, raw_header, 0, 0, 0, 0)
-    m_1x = dp.image_moments(raw_data, raw_header, 1, 0, 0, 0)
-    m_1y = dp.image_moments(raw_data, raw_header, 0, 1, 0, 0)
+    if moments is None:
+        moments = dp.raw_moments(raw_data, raw_header)
+
+    m_0 = moments['m_00']
+    m_1x = moments['m_10']
+    m_1y = moments['m_01']
 
     # Since this is a discrete function the values are rounded and converted
     # to int
@@ -81,7 +89,8 @@ def beam_center(raw_data, raw_header):
     )
 
 
-def beam_width(raw_data, raw_header, beam_center_x, beam_center_y):
+def beam_width(raw_data, raw_header, beam_center_x, beam_center_y,
+               moments=None):
     """
     `beam_width` returns the beam width of the power density distribution. In
     order to avoid errors induced by background noise, it is recommended to use
@@ -111,6 +120,10 @@ def beam_width(raw_data, raw_header, beam_center_x, beam_center_y):
         center coordinate of the power density distribution on the x-axis.
     beam_center_y : int
         center coordinate of the power density distribution on the y-axis.
+    moments : dict, optional
+        image moments about the origin, as returned by
+        `utils.data_processing.raw_moments`. If defined, the moments are not
+        calculated again. The default is None.
 
     Returns
     -------
@@ -121,9 +134,15 @@ def beam_width(raw_data, raw_header, beam_center_x, beam_center_y):
 
     """
 
-    m_0 = dp.image_moments(raw_data, raw_header, 0, 0, 0, 0)
-    m_2x = dp.image_moments(raw_data, raw_header, 2, 0, beam_center_x, 0)
-    m_2y = dp.image_moments(raw_data, raw_header, 0, 2, 0, beam_center_y)
+    if moments is None:
+        moments = dp.raw_moments(raw_data, raw_header)
+
+    # Second-order moments about the beam center
+    m_0 = moments['m_00']
+    m_2x = (moments['m_20'] - 2 * beam_center_x * moments['m_10'] +
+            beam_center_x**2 * m_0)
+    m_2y = (moments['m_02'] - 2 * beam_center_y * moments['m_01'] +
+            beam_center_y**2 * m_0)
 
     try:
         return (
@@ -134,6 +153,91 @@ def beam_width(raw_data, raw_header, beam_center_x, beam_center_y):
         return -1, -1
 
 
+def iterative_moments(raw_data, window_factor=3, tolerance=1e-3,
+                      max_iter=50):
+    """
+    `iterative_moments` returns the image moments of the power density
+    distribution inside an integration window that is iterated until the
+    beam width converges, as recommended by ISO 11146. Background noise far
+    from the beam strongly inflates the second-order moments of the full
+    power density distribution, which are therefore restricted to a window
+    centered on the beam center and `window_factor` times as wide as the beam
+    width.
+
+    The moments of each window are looked up in a `MomentTable`, so that each
+    iteration costs only a few lookups instead of a scan of the power density
+    distribution. Unlike ISO 11146, the window is aligned with the x- and
+    y-axis rather than with the principal axes of the beam.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        noise-corrected power density distribution.
+    window_factor : float, optional
+        size of the integration window relative to the beam width. The
+        default is 3.
+    tolerance : float, optional
+        relative change of the beam width below which the iteration stops. The
+        default is 1e-3.
+    max_iter : int, optional
+        maximum number of iterations. The default is 50.
+
+    Returns
+    -------
+    dict
+        moments keyed by 'm_00', 'm_10', 'm_01', 'm_20', 'm_02', and 'm_11',
+        as returned by `utils.data_processing.raw_moments`, of the last
+        integration window.
+
+    """
+
+    table = MomentTable(raw_data)
+
+    def widths(moments):
+        """`widths` returns the beam center and width in pixel."""
+
+        m_0 = moments['m_00']
+        c_x = moments['m_10'] / m_0
+        c_y = moments['m_01'] / m_0
+
+        # Noise may give a negative variance for very small windows
+        d_x = 4 * math.sqrt(max(moments['m_20'] / m_0 - c_x**2, 0))
+        d_y = 4 * math.sqrt(max(moments['m_02'] / m_0 - c_y**2, 0))
+
+        return c_x, c_y, d_x, d_y
+
+    # Start with the full power density distribution
+    moments = table.moments(0, table.xPixel, 0, table.yPixel)
+
+    if moments['m_00'] <= 0:
+        return moments
+
+    c_x, c_y, d_x, d_y = widths(moments)
+
+    for i in range(max_iter):
+
+        # Half size of the integration window, at least one pixel
+        h_x = max(window_factor * d_x / 2, 1)
+        h_y = max(window_factor * d_y / 2, 1)
+
+        window = table.moments(math.floor(c_x - h_x), math.ceil(c_x + h_x) + 1,
+                               math.floor(c_y - h_y), math.ceil(c_y + h_y) + 1)
+
+        if window['m_00'] <= 0:
+            break
+
+        moments = window
+        previous = d_x, d_y
+        c_x, c_y, d_x, d_y = widths(moments)
+
+        # Check if the beam width converged on both axes
+        if (abs(d_x - previous[0]) <= tolerance * previous[0] and
+                abs(d_y - previous[1]) <= tolerance * previous[1]):
+            break
+
+    return moments
+
+
 def beam_aspect_ratio(d_x, r_x, d_y, r_y):
     """
     `beam_aspect_ratio` returns the aspect ratio (circularity or squareness) of
@@ -168,6 +272,106 @@ def beam_aspect_ratio(d_x, r_x, d_y, r_y):
     return (d_y*r_y) / (d_x*r_x)
 
 
+def principal_widths(moments, r_x, r_y):
+    """
+    `principal_widths` returns the beam widths along the principal axes of the
+    power density distribution and the azimuth angle of the principal axes,
+    according to ISO 11146. Unlike `beam_width`, the mixed second-order moment
+    M_1,1 is taken into account, so that the widths of rotated elliptical
+    beams are not underestimated. The moments are taken about the exact
+    centroid, and converted to millimeter so that different pixel resolutions
+    on the x- and y-axis are taken into account. As in `beam_width`, the beam
+    widths are -1 if the power density distribution has no power.
+
+    With the variances sxx, syy and the covariance sxy of the power density
+    distribution, the beam widths are defined as:
+    d_major = 2*sqrt(2)*sqrt(sxx + syy + sqrt((sxx - syy)^2 + 4*sxy^2))
+    d_minor = 2*sqrt(2)*sqrt(sxx + syy - sqrt((sxx - syy)^2 + 4*sxy^2))
+    and the azimuth angle is defined as:
+    phi = 1/2 * arctan2(2*sxy, sxx - syy).
+
+    Parameters
+    ----------
+    moments : dict
+        image moments about the origin, as returned by
+        `utils.data_processing.raw_moments`.
+    r_x : float64
+        pixel resolution on the x-axis in millimeter per pixel.
+    r_y : float64
+        pixel resolution on the y-axis in millimeter per pixel.
+
+    Returns
+    -------
+    float
+        beam width along the major principal axis in millimeter.
+    float
+        beam width along the minor principal axis in millimeter.
+    float
+        azimuth angle between the major principal axis and the x-axis in
+        degree. -90 < azimuth <= 90.
+
+    """
+
+    m_0 = moments['m_00']
+
+    if m_0 == 0:
+        return -1, -1, 0
+
+    # Centroid in pixel
+    c_x = moments['m_10'] / m_0
+    c_y = moments['m_01'] / m_0
+
+    # Variances and covariance about the centroid in square millimeter
+    sxx = (moments['m_20'] / m_0 - c_x**2) * r_x**2
+    syy = (moments['m_02'] / m_0 - c_y**2) * r_y**2
+    sxy = (moments['m_11'] / m_0 - c_x * c_y) * r_x * r_y
+
+    root = math.sqrt((sxx - syy)**2 + 4 * sxy**2)
+
+    # Rounding errors may give a tiny negative variance for a line-like beam
+    d_major = 2 * math.sqrt(2) * math.sqrt(max(sxx + syy + root, 0))
+    d_minor = 2 * math.sqrt(2) * math.sqrt(max(sxx + syy - root, 0))
+
+    azimuth = math.degrees(0.5 * math.atan2(2 * sxy, sxx - syy))
+
+    return (
+        round(d_major, 6),
+        round(d_minor, 6),
+        round(azimuth, 4)
+    )
+
+
+def ellipticity(d_major, d_minor):
+    """
+    `ellipticity` returns the ellipticity of the power density distribution,
+    according to ISO 11146. The ellipticity is defined as:
+    d_minor / d_major.
+
+    Unlike `beam_aspect_ratio`, the ellipticity does not depend on the
+    orientation of the beam.
+
+    Parameters
+    ----------
+    d_major : float
+        beam width along the major principal axis.
+    d_minor : float
+        beam width along the minor principal axis.
+
+    Returns
+    -------
+    float64
+        0 <= ellipticity <= 1. The ellipticity equals 1 for a circular beam,
+        and is NaN if the beam width along the major principal axis is not
+        positive, e.g. for a single-pixel beam.
+
+    """
+
+    if d_major <= 0:
+        return float('nan')
+
+    return d_minor / d_major
+
+
 def clip_level_irradiation_area(raw_data, clip_level):
     """
     `clip_level_irradiation_area` returns the area of the filtered power
@@ -287,29 +491,15 @@ def beam_uniformity(raw_data, raw_header, clip_level_average_power_density,
 
     """
 
-    # Variable to keep the sum over the cells that meet the requirement
-    aux_sum = 0
-
-    # Convert input_data to numpy array
-    raw_data_np = raw_data.to_numpy()
-
-    # Subtract the clip level average power density
-    aux = raw_data_np - clip_level_average_power_density
-
-    # Power
-    aux = aux**2
-
-    # Loop through all cells in raw_data_pn
-    for x in range(dp.get_xPixel(raw_header) - 1):
-
-        for y in range(dp.get_yPixel(raw_header)):
+    # Convert input_data to numpy array. The last row is not included in the
+    # sum, as in `utils.reference.beam_uniformity`
+    raw_data_np = raw_data.to_numpy()[:dp.get_yPixel(raw_header) - 1]
 
-            # Check if the current cell meets the threshold, which is the
-            # clip level power density
-            if raw_data_np[x][y] >= clip_level_power_density:
+    # Cells that meet the threshold, which is the clip level power density
+    mask = raw_data_np >= clip_level_power_density
 
-                # Sum
-                aux_sum = aux_sum + aux[x][y]
+    # Subtract the clip level average power density, power, and sum
+    aux_sum = np.sum((raw_data_np[mask] - clip_level_average_power_density)**2)
 
     # Divide by the clip level irradiation area
     aux = aux_sum / clip_level_irradiation_area
@@ -26,7 +26,7 @@ def max_power_density(raw_data):
     """
     # The first .max() returns the maximum value per each column, while the
     # second .max() returns the maximum value amount the maximums
-    return raw_data.max().max()
+    return np.float64(raw_data.max().max())
 
 
 def total_power(raw_data):
@@ -50,7 +50,8 @@ def total_power(raw_data):
     # Convert dataframe to numpy array
     raw_data_np = raw_data.to_numpy()
 
-    return np.nansum(raw_data_np)
+    # Single-precision data is accumulated in float64
+    return np.nansum(raw_data_np, dtype=np.float64)
 
 
 def clip_level_power_density(raw_data, clip_level):
@@ -102,6 +103,7 @@ def clip_level_power(raw_data, clip_level):
     """
     # The threshold is defined as the clip-level power density
     threshold = clip_level_power_density(raw_data, clip_level)
-    raw_data_np = raw_data[raw_data >= threshold]
+    raw_data_np = raw_data[raw_data >= threshold].to_numpy()
 
-    return np.nansum(raw_data_np)
+    # Single-precision data is accumulated in float64
+    return np.nansum(raw_data_np, dtype=np.float64)
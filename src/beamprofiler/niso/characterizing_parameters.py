@@ -5,7 +5,6 @@ accordance with non-ISO definitions.
 """
 
 import numpy as np
-from scipy import stats
 
 from beamprofiler.iso import measured_quantities as mq
 from beamprofiler.utils import data_processing as dp
@@ -94,12 +93,16 @@ def clip_level_beam_width(raw_data, clip_level):
     # Threshold power density
     threshold = mq.clip_level_power_density(raw_data, clip_level)
 
-    # Transpose raw_data to get the result along the x-axis
-    beam_width = (raw_data > threshold).apply(np.count_nonzero)
+    # Count along each column. Transpose raw_data to get the result along the
+    # x-axis
+    beam_width = np.count_nonzero(raw_data.to_numpy() > threshold, axis=0)
 
     # Remove zero values
     beam_width = beam_width[beam_width > 0]
 
+    # scipy.stats is slow to import and only needed here
+    from scipy import stats
+
     # Filter out outliers 2 times
     for i in range(2):
 
@@ -120,8 +123,8 @@ def clip_level_beam_width(raw_data, clip_level):
         # Check if edge_width is empty (in case of a perfect distribution)
         if beam_width.size == 0:
 
-            # If yes, then add one entry equals to zero
-            beam_width[0] = 0
+            # If yes, then use one entry equals to zero
+            beam_width = np.zeros(1)
 
             break
 
@@ -178,15 +181,18 @@ def clip_level_edge_width(raw_data, clip_level_1, clip_level_2):
     # Threshold power density HIGH value
     threshold_2 = mq.clip_level_power_density(raw_data, clip_level_2)
 
-    # Transpose raw_data to get the result along the x-axis
-    edge_width = (
-        ((raw_data > threshold_1) & (raw_data < threshold_2))
-        .apply(np.count_nonzero)
-    )
+    # Count along each column. Transpose raw_data to get the result along the
+    # x-axis
+    raw_data_np = raw_data.to_numpy()
+    edge_width = np.count_nonzero(
+        (raw_data_np > threshold_1) & (raw_data_np < threshold_2), axis=0)
 
     # Remove zero values
     edge_width = edge_width[edge_width > 0]
 
+    # scipy.stats is slow to import and only needed here
+    from scipy import stats
+
     # Filter out outliers 2 times
     for i in range(2):
 
@@ -207,8 +213,8 @@ def clip_level_edge_width(raw_data, clip_level_1, clip_level_2):
         # Check if edge_width is empty (in case of a perfect distribution)
         if edge_width.size == 0:
 
-            # If yes, then add one entry equals to zero
-            edge_width[0] = 0
+            # If yes, then use one entry equals to zero
+            edge_width = np.zeros(1)
 
             break
 
@@ -250,3 +256,34 @@ def top_hat_factor(df):
     thf = total_sum / (10000)
 
     return thf
+
+
+def encircled_energy_diameter(df, fraction=0.865):
+    """
+    `encircled_energy_diameter` returns the diameter of the circle about the
+    center of the radial profile that encircles a fraction of the total power.
+    The default fraction gives the D86 diameter, which equals the 1/e²
+    diameter of a Gaussian beam. The diameter is linearly interpolated between
+    the outer edges of the annuli of the radial profile.
+
+    Parameters
+    ----------
+    df : dataframe
+        radial profile, as returned by `utils.data_processing.radial_profile`.
+    fraction : float, optional
+        0 < fraction < 1. The default is 0.865.
+
+    Returns
+    -------
+    float64
+        encircled-energy diameter in millimeter.
+
+    """
+
+    # The encircled power is zero at the center. Negative power densities left
+    # by the noise correction are not allowed to decrease the encircled power
+    radius = np.concatenate([[0], df['Outer Radius'].to_numpy()])
+    encircled = np.maximum.accumulate(
+        np.concatenate([[0], df['Normalized Encircled Power'].to_numpy()]))
+
+    return 2 * np.interp(100 * fraction, encircled, radius)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines the class `BeamResult`, which holds only the results of
+the beam analysis, without the power density distribution.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# Source identity, user-defined values, pixel resolution, the parameters
+# computed in `Beam`, and the timings of the beam analysis as a tuple of
+# (stage, seconds, calls) tuples
+FIELDS = (
+    'path',
+    'fileName',
+    'eta',
+    'epsilon',
+    'mix',
+    'xResolution',
+    'yResolution',
+    'maxPowerDensity',
+    'totalPower',
+    'powerDensity_eta',
+    'power_eta',
+    'fractionalPower_eta',
+    'centerX',
+    'centerY',
+    'widthX',
+    'widthY',
+    'widthMajor',
+    'widthMinor',
+    'azimuth',
+    'ellipticity',
+    'aspectRatio',
+    'irradiationArea_eta',
+    'irradiationArea_epsilon',
+    'averagePowerDensity_eta',
+    'flatnessFactor_eta',
+    'beamUniformity_eta',
+    'plateauUniformity_eta',
+    'edgeSteepness_eta',
+    'widthX_eta',
+    'widthY_eta',
+    'edgeX_epsilon_eta',
+    'edgeY_epsilon_eta',
+    'modPlateauUniformity_eta',
+    'topHatFactor',
+    'diameter86',
+    'timings',
+)
+
+
+class BeamResult(namedtuple('BeamResult', FIELDS)):
+    """
+    Class `BeamResult`.
+
+    `BeamResult` is an immutable record of the results of the beam analysis.
+    It has the same attribute names as `Beam`, so it can be used wherever only
+    the results are needed, e.g. in `utils.report.write`, but it does not hold
+    the power density distribution nor its header. All values are plain Python
+    scalars, which keeps the record small when it is pickled and sent between
+    processes, except `timings`, which is a tuple of (stage, seconds, calls)
+    tuples rather than the dictionary of `Beam.timings`, so that the record
+    stays immutable and hashable.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_beam(cls, beam):
+        """
+        `from_beam` returns the results of an instance of type `Beam`.
+
+        Parameters
+        ----------
+        beam : Beam
+            object of type `Beam`.
+
+        Returns
+        -------
+        BeamResult
+            results of the beam analysis.
+
+        """
+
+        values = []
+
+        for field in cls._fields:
+            value = getattr(beam, field)
+
+            # Convert numpy scalars to their Python equivalent
+            if isinstance(value, np.generic):
+                value = value.item()
+
+            # Freeze the timings, see `utils.timing.Timer.as_dict`
+            if field == 'timings':
+                value = tuple((name, t['time'], t['calls'])
+                              for name, t in value.items())
+
+            values.append(value)
+
+        return cls(*values)
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the beam analysis of frame sequences, e.g. long
+acquisitions of a slowly moving beam. Instead of analysing every frame in
+full, the region of interest (ROI) of each frame is predicted from the beam
+center and widths of the previous frame, and only the ROI is analysed. The
+beam is re-acquired with a full-frame pass when the power inside the ROI drops
+below a fraction of the power found at the last full-frame pass, e.g. because
+the beam moved out of the ROI.
+"""
+
+import math
+
+import numpy as np
+
+from beamprofiler.beam import Beam
+from beamprofiler.utils import data_processing as dp
+
+
+class Tracker:
+    """
+    Class `Tracker`.
+
+    `Tracker` follows the beam across a sequence of frames. The results are
+    returned as `BeamResult` in full-frame coordinates. Note that for tracked
+    frames the power related results, e.g. `totalPower`, only take into
+    account the power inside the ROI.
+    """
+
+    def __init__(self, eta, epsilon, mix, window_factor=4, min_fraction=0.95,
+                 **kwargs):
+        """
+        Initialize an instance of type `Tracker`.
+
+        Parameters
+        ----------
+        eta : float
+            upper clip level. 0 <= eta <= 1.
+        epsilon : float
+            lower clip level. 0 <= epsilon <= eta <= 1.
+        mix : int
+            number of normal mixtures used in the normal fit. mix=[1, 2, 3].
+        window_factor : float, optional
+            size of the ROI relative to the beam width of the previous frame.
+            The default is 4.
+        min_fraction : float, optional
+            0 <= min_fraction <= 1. Fraction of the power found at the last
+            full-frame pass below which the beam is re-acquired. The default is
+            0.95.
+        **kwargs
+            other parameters of `Beam`. `roi` only applies to the full-frame
+            passes, and is True by default, see `acquire`. With `in_place`,
+            the ROI of the tracked frames is copied before the correction, so
+            that only the full-frame passes modify the frame, as documented by
+            `Beam`.
+
+        Returns
+        -------
+        None.
+        """
+
+        self.eta = eta
+        self.epsilon = epsilon
+        self.mix = mix
+        self.window_factor = window_factor
+        self.min_fraction = min_fraction
+
+        # The ROI of the tracked frames is predicted, so that the ROI given by
+        # the user only applies to the full-frame passes
+        self.roi = kwargs.pop('roi', True)
+        self.kwargs = kwargs
+
+        self.reset()
+
+    def reset(self):
+        """
+        `reset` forgets the previous frame, so that the beam is re-acquired
+        with a full-frame pass on the next frame.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        # Results of the previous frame, and total power found at the last
+        # full-frame pass
+        self.previous = None
+        self.reference = None
+
+        # Number of frames analysed and number of full-frame passes
+        self.frames = 0
+        self.acquisitions = 0
+
+    def predict(self, xPixel, yPixel):
+        """
+        `predict` returns the ROI of the next frame, centered on the beam
+        center of the previous frame and `window_factor` times as large as its
+        beam widths.
+
+        Parameters
+        ----------
+        xPixel : int
+            number of pixels on the x-axis.
+        yPixel : int
+            number of pixels on the y-axis.
+
+        Returns
+        -------
+        tuple or None
+            (i0, i1, j0, j1) bounds of the ROI, see
+            `utils.data_processing.beam_roi`, or None if there is no valid
+            previous frame.
+
+        """
+
+        p = self.previous
+
+        if p is None or not (p.widthX > 0 and p.widthY > 0):
+            return None
+
+        h_x = max(self.window_factor * p.widthX / 2, 1)
+        h_y = max(self.window_factor * p.widthY / 2, 1)
+
+        roi = (max(math.floor(p.centerX - h_x), 0),
+               min(math.ceil(p.centerX + h_x) + 1, xPixel),
+               max(math.floor(p.centerY - h_y), 0),
+               min(math.ceil(p.centerY + h_y) + 1, yPixel))
+
+        if roi[0] >= roi[1] or roi[2] >= roi[3]:
+            return None
+
+        return roi
+
+    def acquire(self, raw_data, raw_header, path, fileName):
+        """
+        `acquire` runs the beam analysis of the full frame, inside the ROI
+        found by `utils.data_processing.beam_roi`, or inside the ROI given by
+        the user.
+        """
+
+        beam = Beam(path, fileName, self.eta, self.epsilon, self.mix,
+                    raw_data=raw_data, raw_header=raw_header, roi=self.roi,
+                    **self.kwargs)
+
+        self.reference = beam.totalPower
+        self.acquisitions += 1
+
+        return beam.result()
+
+    def update(self, raw_data, raw_header, path='', fileName=''):
+        """
+        `update` runs the beam analysis of the next frame of the sequence.
+
+        Parameters
+        ----------
+        raw_data : dataframe
+            power density distribution.
+        raw_header : dataframe
+            header of the power density distribution.
+        path : str, optional
+            path to the power density distribution file. The default is ''.
+        fileName : str, optional
+            name of the power density distribution file. The default is ''.
+
+        Returns
+        -------
+        BeamResult
+            results of the beam analysis in full-frame coordinates.
+
+        """
+
+        self.frames += 1
+
+        roi = self.predict(dp.get_xPixel(raw_header),
+                           dp.get_yPixel(raw_header))
+
+        result = None
+
+        if roi is not None:
+            roi_data, roi_header = dp.crop(raw_data, raw_header, roi)
+
+            # The cropped frame is a view, which must not be corrected in
+            # place
+            if self.kwargs.get('in_place'):
+                roi_data = roi_data.copy()
+
+            # Check if the beam is still inside the ROI before analysing it.
+            # The total power of the ROI, see `mq.total_power`, is the sum of
+            # the uncorrected pixels minus the null point of each pixel, so
+            # that the background is corrected only once, in the analysis of
+            # the ROI
+            roi_data_np = roi_data.to_numpy()
+            power = (np.nansum(roi_data_np, dtype=np.float64) -
+                     dp.get_nullPoint(roi_header) * roi_data_np.size)
+
+            if power >= self.min_fraction * self.reference:
+                beam = Beam(path, fileName, self.eta, self.epsilon, self.mix,
+                            raw_data=roi_data, raw_header=roi_header,
+                            **self.kwargs)
+                result = beam.result()._replace(
+                    centerX=beam.centerX + roi[0],
+                    centerY=beam.centerY + roi[2])
+
+        # Re-acquire the beam if it was lost
+        if result is None:
+            result = self.acquire(raw_data, raw_header, path, fileName)
+
+        self.previous = result
+
+        return result
+
+    def track(self, frames):
+        """
+        `track` runs the beam analysis of a sequence of frames and yields the
+        results in order.
+
+        Parameters
+        ----------
+        frames : iterable of tuple
+            (raw_data, raw_header, path, fileName) of each frame. `path` and
+            `fileName` are optional.
+
+        Yields
+        ------
+        BeamResult
+            results of the beam analysis in full-frame coordinates.
+
+        """
+
+        for frame in frames:
+            yield self.update(*frame)
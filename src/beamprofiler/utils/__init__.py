@@ -1,7 +1,41 @@
 """
 This package handles the utilities of the beam analysis.
+
+The modules with heavy dependencies, e.g. `plot` (matplotlib), `report`
+(xlsxwriter), and `image` (Pillow), are imported on first access, so that
+`import beamprofiler` stays fast. Python 3.6 does not support the module
+`__getattr__` of PEP 562, so these modules are imported eagerly on Python 3.6.
 """
 
-from beamprofiler.utils import data_processing, plot, report
+import importlib
+import sys
+
+from beamprofiler.utils import (background, data_processing, defects,
+                                planes, summed_area, timing)
+
+# Modules imported on first access
+_LAZY = ['equivalence', 'export', 'image', 'plot', 'pyramid', 'reference',
+         'report', 'synthetic']
+
+__all__ = ['background', 'data_processing', 'defects', 'equivalence', 'export',
+           'image', 'planes', 'plot', 'pyramid', 'reference', 'report',
+           'summed_area', 'synthetic', 'timing']
+
+
+# Python 3.6 ignores the module `__getattr__`
+if sys.version_info < (3, 7):
+    for _name in _LAZY:
+        globals()[_name] = importlib.import_module('beamprofiler.utils.' +
+                                                   _name)
+    del _name
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return importlib.import_module('beamprofiler.utils.' + name)
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
 
-__all__ = ['data_processing', 'plot', 'report']
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
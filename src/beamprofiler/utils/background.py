@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the background maps (dark frames) of the detector, used by
+the background map subtraction of ISO 13694, see
+`utils.data_processing.remove_background`.
+
+A background map is loaded once and kept in a `DarkFrameCache`, keyed by the
+path and the modification time of its file. Background maps saved as .npy
+files, see `save`, can be memory-mapped instead of being read into memory.
+An averaged background map is built from a stack of dark frames by `average`,
+which accumulates the frames one at a time.
+"""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from beamprofiler.utils import data_processing as dp
+
+
+def load(fullPath, mmap=False):
+    """
+    `load` returns the background map stored in a file.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the .npy file written by `save`, or to a power density
+        distribution file recognised by `utils.data_processing.raw_data`.
+    mmap : bool, optional
+        if True, a .npy file is memory-mapped read-only instead of being read
+        into memory. The default is False.
+
+    Returns
+    -------
+    ndarray
+        background map.
+
+    """
+
+    # Check the file's extension
+    ext = os.path.splitext(fullPath)[1]
+
+    if ext == '.npy':
+        return np.load(fullPath, mmap_mode='r' if mmap else None)
+
+    return dp.raw_data(fullPath).to_numpy(dtype=np.float64)
+
+
+def save(fullPath, dark_map):
+    """
+    `save` writes a background map to a .npy file, which can later be
+    memory-mapped by `load`.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the .npy file.
+    dark_map : dataframe or ndarray
+        background map.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    np.save(fullPath, np.asarray(dark_map, dtype=np.float64))
+
+
+def average(frames, out=None):
+    """
+    `average` returns the averaged background map of a stack of dark frames.
+    The frames are accumulated one at a time, so that only one frame is held in
+    memory in addition to the accumulator, e.g. when `frames` is a generator.
+
+    Parameters
+    ----------
+    frames : iterable
+        dark frames, each a dataframe, an ndarray, or a full path accepted by
+        `load`.
+    out : ndarray, optional
+        float64 buffer of the shape of the frames that receives the averaged
+        background map. The default is None, i.e. a new array is allocated.
+
+    Returns
+    -------
+    ndarray
+        averaged background map.
+
+    """
+
+    count = 0
+
+    for frame in frames:
+        if isinstance(frame, str):
+            frame = load(frame, mmap=True)
+
+        frame = np.asarray(frame)
+
+        if count == 0:
+            if out is None:
+                out = np.empty(frame.shape, dtype=np.float64)
+            elif out.shape != frame.shape:
+                raise Exception("The buffer should have the shape of the dark "
+                                "frames.")
+
+            np.copyto(out, frame)
+        elif frame.shape != out.shape:
+            raise Exception("All dark frames should have the same shape.")
+        else:
+            np.add(out, frame, out=out)
+
+        count += 1
+
+    if count == 0:
+        raise Exception("At least one dark frame is required.")
+
+    out /= count
+
+    return out
+
+
+class DarkFrameCache:
+    """
+    Class `DarkFrameCache`.
+
+    `DarkFrameCache` keeps the background maps in memory, so that the dark
+    frame of a detector is only loaded once for a batch of power density
+    distributions. The background maps are identified by their full path and
+    the modification time of the file, so that a changed file is loaded again.
+    Once the number of cached background maps exceeds `max_entries`, the least
+    recently used ones are dropped.
+    """
+
+    def __init__(self, mmap=False, max_entries=8):
+        """
+        Initialize an instance of type `DarkFrameCache`.
+
+        Parameters
+        ----------
+        mmap : bool, optional
+            if True, .npy files are memory-mapped read-only, see `load`. The
+            default is False.
+        max_entries : int, optional
+            maximum number of background maps kept in the cache. The default
+            is 8.
+
+        Returns
+        -------
+        None.
+        """
+
+        self.mmap = mmap
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fullPath):
+        """
+        `get` returns the background map stored in a file, loading it on the
+        first request.
+
+        Parameters
+        ----------
+        fullPath : str
+            full path to the background map file, see `load`.
+
+        Returns
+        -------
+        ndarray
+            background map.
+
+        """
+
+        fullPath = os.path.abspath(fullPath)
+        key = (fullPath, os.path.getmtime(fullPath))
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        self.misses += 1
+
+        dark_map = load(fullPath, mmap=self.mmap)
+        dark_map.flags.writeable = False
+
+        self.entries[key] = dark_map
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+        return dark_map
+
+    def clear(self):
+        """
+        `clear` removes all background maps from the cache and resets the
+        counters.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        self.entries.clear()
+
+        self.hits = 0
+        self.misses = 0
+
+
+# Cache used by `Beam` unless another cache is given
+cache = DarkFrameCache()
@@ -3,15 +3,14 @@
 This module handles the data processing prior to the beam analysis.
 """
 
+import math
 import os
 
 import numpy as np
 import pandas as pd
-from scipy import stats
-from sklearn import mixture
 
 
-def raw_data(fullPath):
+def raw_data(fullPath, dtype=None):
     """
     `raw_data` returns the power density distribution.
 
@@ -19,7 +18,14 @@ def raw_data(fullPath):
     ----------
     fullPath : str
         full path to the .csv file that contains the power density
-        distribution.
+        distribution, of which only the first plane is read, see
+        `utils.planes`, to a .raw binary dump, see `raw_binary`, or to a .png,
+        .tif, or .tiff grayscale image, see `utils.image.read`.
+    dtype : dtype, optional
+        storage type of the power density distribution, e.g. float32 or uint16
+        to reduce the memory footprint, see `corrected_dtype`. The default is
+        None, i.e. the type inferred by pandas or the type of the binary dump
+        or image.
 
     Returns
     -------
@@ -31,10 +37,25 @@ def raw_data(fullPath):
     # Check the file's extension
     ext = os.path.splitext(fullPath)[1]
 
+    # Only the first plane is read from a file with several planes, see
+    # `utils.planes`
     if ext == '.xls' or ext == '.xlsx':
-        return pd.read_csv(fullPath, header=None, sep='\t', skiprows=1)
+        return pd.read_csv(fullPath, header=None, sep='\t', skiprows=1,
+                           nrows=get_yPixel(raw_header(fullPath)),
+                           dtype=dtype)
     elif ext == '.csv':
-        return pd.read_csv(fullPath, header=None, sep=',', skiprows=1)
+        return pd.read_csv(fullPath, header=None, sep=',', skiprows=1,
+                           nrows=get_yPixel(raw_header(fullPath)),
+                           dtype=dtype)
+    elif ext == '.raw':
+        raw_data = raw_binary(fullPath)
+        return raw_data if dtype is None else raw_data.astype(dtype)
+    elif ext.lower() in ['.png', '.tif', '.tiff']:
+        from beamprofiler.utils import image
+        return pd.DataFrame(image.read(fullPath, dtype), copy=False)
+
+    raise Exception("The power density distribution should be a .xls, .xlsx, "
+                    ".csv, .raw, .png, .tif, or .tiff file, not '%s'." % ext)
 
 
 def raw_header(fullPath):
@@ -47,7 +68,10 @@ def raw_header(fullPath):
     ----------
     fullPath : str
         full path to the .csv file that contains the power density
-        distribution.
+        distribution, to a .raw binary dump, in which case the header is
+        built from the sidecar header, see `read_sidecar`, or to a .png, .tif,
+        or .tiff grayscale image, in which case the pixel pitch and the null
+        point are read from the sidecar header, see `utils.image.header`.
 
     Returns
     -------
@@ -63,9 +87,203 @@ def raw_header(fullPath):
         return pd.read_csv(fullPath, header=None, sep='\t', nrows=1)
     elif ext == '.csv':
         return pd.read_csv(fullPath, header=None, sep=',', nrows=1)
+    elif ext == '.raw':
+        return sidecar_header(read_sidecar(fullPath))
+    elif ext.lower() in ['.png', '.tif', '.tiff']:
+        from beamprofiler.utils import image
+        return image.header(fullPath)
+
+    raise Exception("The power density distribution should be a .xls, .xlsx, "
+                    ".csv, .raw, .png, .tif, or .tiff file, not '%s'." % ext)
+
+
+def read_sidecar(fullPath):
+    """
+    `read_sidecar` returns the fields of the sidecar header of a file, i.e.
+    the text file with the same name and the extension .hdr, e.g.
+    `beam.hdr` for `beam.raw`. Each line of the sidecar header holds one
+    `key = value` field, and everything after a `#` is a comment. The keys
+    are case-insensitive.
+
+    The fields `Pixels X`, `Pixels Y`, `Window X`, `Window Y` (measurement
+    window size in millimeter), and `Null Point` define the header of the
+    power density distribution, see `sidecar_header`. The binary dumps
+    further accept the fields `Type` (NumPy type string, default `<u2`, i.e.
+    little-endian uint16) and `Offset` (number of bytes before the first
+    pixel, default 0), see `raw_binary`.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the file, or to its sidecar header.
+
+    Returns
+    -------
+    dict
+        fields of the sidecar header, keyed by their lower-case keys.
+
+    """
+
+    fields = {}
+
+    with open(os.path.splitext(fullPath)[0] + '.hdr', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+
+            if not line:
+                continue
+
+            key, sep, value = line.partition('=')
+
+            if not sep:
+                raise Exception("Each line of the sidecar header should be "
+                                "'key = value', not '%s'." % line)
+
+            fields[key.strip().lower()] = value.strip()
+
+    return fields
+
+
+def write_sidecar(fullPath, raw_header, **fields):
+    """
+    `write_sidecar` writes the sidecar header of a file, see `read_sidecar`.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the file, or to its sidecar header.
+    raw_header : dataframe
+        header of the power density distribution.
+    **fields
+        further fields, e.g. `Type` and `Offset` of a binary dump.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    fields = dict({
+        'Pixels X': get_xPixel(raw_header),
+        'Pixels Y': get_yPixel(raw_header),
+        'Window X': get_xWindow(raw_header),
+        'Window Y': get_yWindow(raw_header),
+        'Null Point': get_nullPoint(raw_header),
+    }, **fields)
+
+    with open(os.path.splitext(fullPath)[0] + '.hdr', 'w',
+              encoding='utf-8') as f:
+        for key, value in fields.items():
+            f.write('%s = %s\n' % (key, value))
+
+
+def sidecar_header(fields):
+    """
+    `sidecar_header` returns the header of the power density distribution
+    defined by the fields of a sidecar header, see `read_sidecar`.
+
+    Parameters
+    ----------
+    fields : dict
+        fields of the sidecar header.
+
+    Returns
+    -------
+    dataframe
+        header of the power density distribution.
+
+    """
+
+    try:
+        return build_header(int(fields['pixels x']),
+                            int(fields['pixels y']),
+                            float(fields['window x']),
+                            float(fields['window y']),
+                            float(fields.get('null point', 0)))
+    except KeyError as e:
+        raise Exception("The sidecar header is missing the field %s." % e)
+
+
+def raw_binary(fullPath):
+    """
+    `raw_binary` returns the power density distribution stored in a binary
+    dump, e.g. as written by a camera. The dump is memory-mapped read-only, so
+    that the pixels are only read from the file when they are used, and it is
+    never read as a whole up front. The geometry and the storage type are read
+    from the sidecar header, see `read_sidecar`, and the pixels are stored row
+    by row, i.e. along the x-axis first.
 
+    Parameters
+    ----------
+    fullPath : str
+        full path to the .raw file.
+
+    Returns
+    -------
+    dataframe
+        power density distribution, backed by the memory-mapped file.
 
-def remove_background(raw_data, raw_header):
+    """
+
+    fields = read_sidecar(fullPath)
+    raw_header = sidecar_header(fields)
+
+    xPixel = get_xPixel(raw_header)
+    yPixel = get_yPixel(raw_header)
+    dtype = np.dtype(fields.get('type', '<u2'))
+    offset = int(fields.get('offset', 0))
+
+    if os.path.getsize(fullPath) < offset + xPixel * yPixel * dtype.itemsize:
+        raise Exception("The binary dump is smaller than the %d x %d pixels "
+                        "given by the sidecar header." % (xPixel, yPixel))
+
+    raw_data_np = np.memmap(fullPath, dtype=dtype, mode='r', offset=offset,
+                            shape=(yPixel, xPixel))
+
+    return pd.DataFrame(raw_data_np, copy=False)
+
+
+def build_header(xPixel, yPixel, xWindow, yWindow, nullPoint):
+    """
+    `build_header` returns a header in the standard layout, i.e. the same
+    layout returned by `raw_header`, so that it can be used with `get_xPixel`,
+    `get_xWindow`, `get_nullPoint`, and so on.
+
+    Parameters
+    ----------
+    xPixel : int
+        number of pixels on the x-axis.
+    yPixel : int
+        number of pixels on the y-axis.
+    xWindow : float
+        measurement window size on the x-axis in millimeter.
+    yWindow : float
+        measurement window size on the y-axis in millimeter.
+    nullPoint : float
+        null point, that is the average background map.
+
+    Returns
+    -------
+    dataframe
+        header of the power density distribution.
+
+    """
+
+    # Labels and values are located as in the standard layout. Note that the
+    # window size on the x-axis is located under the label `Size of window Y`,
+    # see `get_xWindow`
+    header = [np.nan] * 18
+    header[0], header[1] = 'Plane ', 0
+    header[4], header[5] = 'Pixels X', int(xPixel)
+    header[7], header[8] = 'Pixels Y', int(yPixel)
+    header[10], header[11] = 'Size of window X', float(yWindow)
+    header[13], header[14] = 'Size of window Y', float(xWindow)
+    header[16], header[17] = 'Null Point', float(nullPoint)
+
+    return pd.DataFrame([header])
+
+
+def remove_background(raw_data, raw_header, dark_map=None, out=None):
     """
     `remove_background` returns the noise-corrected power density distribution.
     Background noise and digitizer baseline are known to negatively affect the
@@ -79,8 +297,9 @@ def remove_background(raw_data, raw_header):
     2) Average background map subtraction: the average background map is
     subtracted from the power density distribution.
 
-    This method implements option 2), and the average background map is
-    retrieved from the header.
+    This method implements option 1) if a background map is given, see
+    `utils.background`, and option 2) otherwise, in which case the average
+    background map is retrieved from the header.
 
     Parameters
     ----------
@@ -88,6 +307,15 @@ def remove_background(raw_data, raw_header):
         power density distribution.
     raw_header : dataframe
         header of the power density distribution.
+    dark_map : dataframe or ndarray, optional
+        background map of the shape of the power density distribution. The
+        default is None.
+    out : ndarray, optional
+        floating-point buffer of the shape of the power density distribution
+        that receives the result, e.g. reused across frames, or the buffer of
+        the power density distribution itself, see `float_buffer`, to correct
+        it in place. The default is None, i.e. a new array of the type given
+        by `corrected_dtype` is allocated.
 
     Returns
     -------
@@ -96,8 +324,219 @@ def remove_background(raw_data, raw_header):
 
     """
 
-    # get_nullPoint returns the null point, that is the average background map
-    return raw_data - get_nullPoint(raw_header)
+    storage = np.result_type(*raw_data.dtypes)
+
+    if dark_map is None:
+        # get_nullPoint returns the null point, that is the average background
+        # map
+        background = get_nullPoint(raw_header)
+
+        # Unsigned and short integers would wrap around below zero, so they
+        # are corrected into a floating-point buffer, see `corrected_dtype`
+        if out is None and (storage.kind == 'f' or
+                            storage.kind == 'i' and storage.itemsize >= 4):
+            return raw_data - background
+    else:
+        background = np.asarray(dark_map)
+
+        if raw_data.shape != background.shape:
+            raise Exception("The background map should have the shape of the "
+                            "power density distribution.")
+
+    if out is None:
+        out = np.empty(raw_data.shape, dtype=corrected_dtype(storage))
+
+    # The subtraction is written straight into the buffer, without
+    # intermediate copies
+    np.subtract(raw_data.to_numpy(), background, out=out, dtype=out.dtype)
+
+    return pd.DataFrame(out, index=raw_data.index, columns=raw_data.columns,
+                        copy=False)
+
+
+def corrected_dtype(dtype):
+    """
+    `corrected_dtype` returns the floating-point type that holds the
+    noise-corrected power density distribution of a storage type.
+    Floating-point types are kept, integer ADC counts of up to 16 bits are
+    held exactly in float32, and wider integers in float64.
+
+    Parameters
+    ----------
+    dtype : dtype
+        storage type of the power density distribution.
+
+    Returns
+    -------
+    dtype
+        floating-point type of the noise-corrected power density distribution.
+
+    """
+
+    dtype = np.dtype(dtype)
+
+    if dtype.kind == 'f':
+        return dtype
+    elif dtype.itemsize <= 2:
+        return np.dtype(np.float32)
+
+    return np.dtype(np.float64)
+
+
+def float_buffer(raw_data):
+    """
+    `float_buffer` returns the power density distribution as a writable
+    floating-point array of the type given by `corrected_dtype`, e.g. to
+    correct the background in place with `remove_background`. The array shares
+    the memory of the power density distribution if possible, in which case
+    writing to the array modifies the power density distribution. Otherwise,
+    e.g. for integer or read-only, memory-mapped data, a copy is returned.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        power density distribution.
+
+    Returns
+    -------
+    ndarray
+        writable floating-point array of the power density distribution.
+
+    """
+
+    raw_data_np = raw_data.to_numpy()
+    dtype = corrected_dtype(raw_data_np.dtype)
+
+    # Copy on write: the data is only copied if it cannot be written
+    if raw_data_np.dtype != dtype or not raw_data_np.flags.writeable:
+        raw_data_np = np.array(raw_data_np, dtype=dtype)
+
+    return raw_data_np
+
+
+def beam_roi(raw_data, threshold=0.05, margin=0.5, smooth=5, noise=5):
+    """
+    `beam_roi` returns the region of interest (ROI) of the power density
+    distribution, i.e. the bounding box of the beam padded by a margin. The
+    bounding box is found from the projections of the power density
+    distribution on the x- and y-axis, which average out the background
+    noise. Each projection is smoothed by a moving average, the floor left by
+    the background is subtracted, and the beam is the connected range around
+    the peak where the projection is greater than a fraction of the peak and
+    greater than a multiple of the noise of the projection, which is estimated
+    from the differences of neighbouring pixels. Isolated noisy columns
+    or rows away from the beam are therefore ignored. In order to avoid errors
+    induced by background noise, it is recommended to use as input a
+    noise-corrected dataframe.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        noise-corrected power density distribution.
+    threshold : float, optional
+        0 <= threshold <= 1. Fraction of the peak of each projection above
+        which the beam is detected. The default is 0.05.
+    margin : float, optional
+        margin added on each side of the bounding box, relative to the size of
+        the bounding box. The default is 0.5.
+    smooth : int, optional
+        width of the moving average in pixels. The default is 5.
+    noise : float, optional
+        minimum level above the floor relative to the noise of the projection
+        above which the beam is detected. The default is 5.
+
+    Returns
+    -------
+    tuple
+        (i0, i1, j0, j1) such that the columns i0 <= i < i1 and the rows
+        j0 <= j < j1 are inside the ROI. The whole power density distribution
+        is returned if no beam is detected.
+
+    """
+
+    # Convert input_data to numpy array
+    raw_data_np = raw_data.to_numpy()
+    yPixel, xPixel = raw_data_np.shape
+
+    bounds = []
+
+    # Projections on the x-axis (sum of each column) and on the y-axis (sum of
+    # each row)
+    for projection, size in [(np.nansum(raw_data_np, axis=0, dtype=np.float64),
+                              xPixel),
+                             (np.nansum(raw_data_np, axis=1, dtype=np.float64),
+                              yPixel)]:
+
+        # Noise of the background from the differences of neighbouring
+        # pixels, which hardly depend on a smooth beam, reduced by the moving
+        # average
+        width = max(1, min(int(smooth), size))
+        sigma = (1.4826 * np.median(np.abs(np.diff(projection))) /
+                 math.sqrt(2 * width))
+        projection = np.convolve(projection, np.ones(width) / width, 'same')
+
+        # Floor of the background from the outer tenth on both sides, unless
+        # the median is lower, e.g. if the beam reaches the edges
+        edge = max(1, size // 10)
+        projection -= min(
+            np.median(np.r_[projection[:edge], projection[-edge:]]),
+            np.median(projection))
+
+        peak = projection.argmax()
+        level = max(threshold * projection[peak], noise * sigma)
+        if projection[peak] <= level:
+            return 0, xPixel, 0, yPixel
+
+        # Connected range above the level around the peak
+        below = projection < level
+        left = np.flatnonzero(below[:peak])
+        right = np.flatnonzero(below[peak:])
+        start = left[-1] + 1 if len(left) else 0
+        stop = peak + right[0] if len(right) else size
+
+        # Pad the bounding box and clip it to the power density distribution
+        pad = int(np.ceil(margin * (stop - start)))
+        bounds += [max(start - pad, 0), min(stop + pad, size)]
+
+    return tuple(int(b) for b in bounds)
+
+
+def crop(raw_data, raw_header, roi):
+    """
+    `crop` returns the power density distribution inside the region of
+    interest (ROI), without copying it, and the matching header. The pixel
+    resolution and the null point are not changed, and the indices of the
+    returned dataframe start at zero.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+    roi : tuple
+        (i0, i1, j0, j1) such that the columns i0 <= i < i1 and the rows
+        j0 <= j < j1 are inside the ROI, see `beam_roi`.
+
+    Returns
+    -------
+    dataframe
+        power density distribution inside the ROI.
+    dataframe
+        header of the power density distribution inside the ROI.
+
+    """
+
+    i0, i1, j0, j1 = roi
+
+    cropped = pd.DataFrame(raw_data.to_numpy()[j0:j1, i0:i1], copy=False)
+    header = build_header(i1 - i0,
+                          j1 - j0,
+                          (i1 - i0) * get_xResolution(raw_header),
+                          (j1 - j0) * get_yResolution(raw_header),
+                          get_nullPoint(raw_header))
+
+    return cropped, header
 
 
 def get_nullPoint(raw_header):
@@ -286,20 +725,80 @@ def image_moments(raw_data, raw_header, p, q, x0, y0):
 
     """
 
-    aux = 0
+    # Convert input_data to numpy array. The last row and column are not
+    # included in the sum, as in `utils.reference.image_moments`
+    raw_data_np = raw_data.to_numpy()[:get_xPixel(raw_header) - 1,
+                                      :get_yPixel(raw_header) - 1]
 
-    # Convert input_data to numpy array
-    raw_data_np = raw_data.to_numpy()
+    # Weights of each row and column
+    x = (np.arange(raw_data_np.shape[0], dtype=np.float64) - x0)**p
+    y = (np.arange(raw_data_np.shape[1], dtype=np.float64) - y0)**q
+
+    # Apply formula as a single matrix product
+    return _bilinear(x, raw_data_np, y)
+
+
+def _bilinear(x, raw_data_np, y, chunk=256):
+    """
+    `_bilinear` returns x @ raw_data_np @ y accumulated in float64. Arrays of
+    less than 64 bits, e.g. float32, are converted in blocks of rows instead
+    of as a whole, so that the product does not double the memory footprint.
+    """
 
-    # Iterate through all columns and rows
-    for x in range(get_xPixel(raw_header) - 1):
+    if raw_data_np.dtype.itemsize >= 8:
+        return x @ raw_data_np @ y
 
-        for y in range(get_yPixel(raw_header) - 1):
+    return sum(x[i:i + chunk] @ raw_data_np[i:i + chunk].astype(np.float64)
+               @ y for i in range(0, len(x), chunk))
 
-            # Apply formula
-            aux = aux + (((x - x0)**p) * ((y - y0)**q) * raw_data_np[x][y])
 
-    return aux
+def raw_moments(raw_data, raw_header):
+    """
+    `raw_moments` returns the image moments of order up to two about the
+    origin, M_0,0, M_1,0, M_0,1, M_2,0, M_0,2, and M_1,1, from a single pass
+    over the power density distribution. The moments are the same as those of
+    `image_moments` with x0 = y0 = 0, and the moments about any other
+    reference point follow from them, e.g.
+    M_2,0(x0) = M_2,0 - 2 * x0 * M_1,0 + x0^2 * M_0,0.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        noise-corrected power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+
+    Returns
+    -------
+    dict
+        moments keyed by 'm_00', 'm_10', 'm_01', 'm_20', 'm_02', and 'm_11'.
+
+    """
+
+    # Convert input_data to numpy array. The last row and column are not
+    # included in the sum, as in `image_moments`. Floating-point data is not
+    # converted, but accumulated in float64
+    raw_data_np = raw_data.to_numpy()
+    if raw_data_np.dtype.kind != 'f':
+        raw_data_np = raw_data_np.astype(np.float64)
+    raw_data_np = raw_data_np[:get_xPixel(raw_header) - 1,
+                              :get_yPixel(raw_header) - 1]
+
+    x = np.arange(raw_data_np.shape[0], dtype=np.float64)
+    y = np.arange(raw_data_np.shape[1], dtype=np.float64)
+
+    # Projections on both axes
+    sum_x = raw_data_np.sum(axis=1, dtype=np.float64)
+    sum_y = raw_data_np.sum(axis=0, dtype=np.float64)
+
+    return {
+        'm_00': sum_x.sum(),
+        'm_10': x @ sum_x,
+        'm_01': y @ sum_y,
+        'm_20': (x * x) @ sum_x,
+        'm_02': (y * y) @ sum_y,
+        'm_11': _bilinear(x, raw_data_np, y),
+    }
 
 
 def normal_mixture(df, mix):
@@ -340,6 +839,10 @@ def normal_mixture(df, mix):
     # Reshape the raw data for Normal Mixture Fit
     array = array.reshape(-1, 1)
 
+    # scipy.stats and sklearn are slow to import and only needed here
+    from scipy import stats
+    from sklearn import mixture
+
     # Curve fitting
     gmm = (
         mixture.GaussianMixture(n_components=mix,
@@ -378,7 +881,7 @@ def normal_mixture(df, mix):
     return x, y
 
 
-def pre_top_hat(raw_data):
+def pre_top_hat(raw_data, background=None):
     """
     `pre_top_hat` returns a dataframe with the necessary data to calculate the
     top-hat factor and to plot the normalized energy curve.
@@ -387,6 +890,10 @@ def pre_top_hat(raw_data):
     ----------
     raw_data : dataframe
         power density distribution.
+    background : float or ndarray, optional
+        null point or background map that is added back to a noise-corrected
+        power density distribution, so that the histogram is built on the
+        original detector values. The default is None.
 
     Returns
     -------
@@ -396,18 +903,30 @@ def pre_top_hat(raw_data):
 
     """
 
-    # Stack raw_data into a single column
-    raw_data_stacked = raw_data.stack(level=-1, dropna=True)
-
-    # Get the histogram count for each bin and sort the index
-    hist = raw_data_stacked.value_counts().sort_index()
+    # Flatten raw_data into a single array and drop the missing values
+    raw_data_np = raw_data.to_numpy()
+    if background is not None:
+        # Round off the rounding errors of the subtraction, so that equal
+        # detector values fall into the same bin. The sum is taken in float64,
+        # since single precision cannot hold six decimals of large counts
+        raw_data_np = np.round(np.add(raw_data_np, background,
+                                      dtype=np.float64), 6)
+    raw_data_np = raw_data_np.ravel()
+    raw_data_np = raw_data_np[~pd.isna(raw_data_np)]
+
+    # Get the histogram count for each bin, sorted by bin
+    bins, counts = np.unique(raw_data_np, return_counts=True)
+
+    # Unsigned and short types would wrap around or round off when the bins
+    # are shifted below
+    bins = bins.astype(np.result_type(bins.dtype, np.int64))
 
     # Finds the lower_limit, which is the intensity value (bin) with the
     # highest count
-    lower_limit = hist.idxmax()
+    lower_limit = bins[np.argmax(counts)]
 
-    # Creates a new data frame using <hist>
-    df = pd.DataFrame(data={'Count': hist}, index=hist.index)
+    # Creates a new data frame using the histogram
+    df = pd.DataFrame(data={'Count': counts}, index=bins)
 
     # Add column <Energy> having the bin with highest count (<lower_limit>)
     # as zero
@@ -439,3 +958,81 @@ def pre_top_hat(raw_data):
     )
 
     return df
+
+
+def radial_profile(raw_data, xResolution, yResolution, centerX, centerY,
+                   binWidth=None):
+    """
+    `radial_profile` returns the azimuthally averaged power density and the
+    encircled power of the power density distribution about a center point.
+    The pixels are grouped in annuli of equal width by their distance to the
+    center in millimeter, so that different pixel resolutions on the x- and
+    y-axis are taken into account. In order to avoid errors induced by
+    background noise, it is recommended to use as input a noise-corrected
+    dataframe.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        noise-corrected power density distribution.
+    xResolution : float
+        pixel resolution on the x-axis in millimeter per pixel.
+    yResolution : float
+        pixel resolution on the y-axis in millimeter per pixel.
+    centerX : int/float64
+        center coordinate on the x-axis in pixel.
+    centerY : int/float64
+        center coordinate on the y-axis in pixel.
+    binWidth : float, optional
+        width of the annuli in millimeter. The default is the smallest pixel
+        resolution.
+
+    Returns
+    -------
+    df : dataframe
+        one row per annulus with the radius of its center ('Radius') and of
+        its outer edge ('Outer Radius') in millimeter, the number of pixels
+        ('Count'), the power ('Power'), the average power density ('Power
+        Density'), the power encircled by the outer edge ('Encircled Power'),
+        and the encircled power in percent of the total power ('Normalized
+        Encircled Power').
+
+    """
+
+    if binWidth is None:
+        binWidth = min(xResolution, yResolution)
+
+    # Convert input_data to numpy array. Missing values carry no power
+    raw_data_np = np.nan_to_num(raw_data.to_numpy(dtype=np.float64))
+
+    # Distance of each pixel to the center in millimeter. Rows are the y-axis
+    # and columns are the x-axis
+    x = (np.arange(raw_data_np.shape[1]) - centerX) * xResolution
+    y = (np.arange(raw_data_np.shape[0]) - centerY) * yResolution
+    r = np.hypot(x[np.newaxis, :], y[:, np.newaxis])
+
+    # Index of the annulus of each pixel
+    bins = (r / binWidth).astype(np.intp).ravel()
+
+    # Number of pixels and power of each annulus in a single pass
+    count = np.bincount(bins)
+    power = np.bincount(bins, weights=raw_data_np.ravel())
+
+    df = pd.DataFrame(data={
+        'Radius': (np.arange(len(count)) + 0.5) * binWidth,
+        'Outer Radius': (np.arange(len(count)) + 1) * binWidth,
+        'Count': count,
+        'Power': power,
+    })
+
+    # Annuli without pixels, e.g. close to the center, have no power density
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['Power Density'] = power / np.where(count > 0, count, np.nan)
+
+    # Add cumulative sum and normalized cumulative sum
+    df['Encircled Power'] = df['Power'].cumsum()
+    df['Normalized Encircled Power'] = (
+        100 * df['Encircled Power'] / df['Encircled Power'].iloc[-1]
+    )
+
+    return df
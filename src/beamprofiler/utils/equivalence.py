@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the numerical equivalence check between the reference
+backend, i.e. the original loop-based implementations preserved in
+`utils.reference`, and the optimized backend, i.e. the vectorized
+implementations used by the beam analysis. Both backends are run on the same
+power density distributions, and the maximum absolute and relative deviation
+of each parameter is reported. The check fails when a deviation exceeds the
+agreed tolerance of its parameter.
+"""
+
+import math
+import types
+
+import numpy as np
+
+from beamprofiler.iso import characterizing_parameters as iso_cp
+from beamprofiler.iso import measured_quantities as mq
+from beamprofiler.niso import characterizing_parameters as niso_cp
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import reference
+
+# Backends that implement `image_moments`, `raw_moments`, `beam_uniformity`,
+# `clip_level_beam_width`, `clip_level_edge_width`, and `pre_top_hat`
+BACKENDS = {
+    'reference': reference,
+    'optimized': types.SimpleNamespace(
+        image_moments=dp.image_moments,
+        raw_moments=dp.raw_moments,
+        beam_uniformity=iso_cp.beam_uniformity,
+        clip_level_beam_width=niso_cp.clip_level_beam_width,
+        clip_level_edge_width=niso_cp.clip_level_edge_width,
+        pre_top_hat=dp.pre_top_hat),
+}
+
+# Agreed tolerances (absolute, relative) of each parameter. A deviation is
+# accepted if it is within either tolerance. The sums are only reordered by
+# the vectorized implementations, so the moments may differ by rounding
+# errors, while the pixel counts and the centers must match exactly. The beam
+# widths are rounded to 4 decimals, so a rounding error may flip the last
+# decimal. The moments about the origin of `raw_moments` feed the beam center,
+# the beam widths, and the principal widths of `Beam`, which are rounded to 4,
+# 6, and 4 decimals.
+TOLERANCES = {
+    'm_00': (0, 1e-9),
+    'm_10': (0, 1e-9),
+    'm_01': (0, 1e-9),
+    'm_20': (0, 1e-9),
+    'm_02': (0, 1e-9),
+    'centerX': (0, 0),
+    'centerY': (0, 0),
+    'widthX': (1e-4, 0),
+    'widthY': (1e-4, 0),
+    'raw_m_00': (0, 1e-9),
+    'raw_m_10': (0, 1e-9),
+    'raw_m_01': (0, 1e-9),
+    'raw_m_20': (0, 1e-9),
+    'raw_m_02': (0, 1e-9),
+    'raw_m_11': (0, 1e-9),
+    'raw_centerX': (0, 0),
+    'raw_centerY': (0, 0),
+    'raw_widthX': (1e-4, 0),
+    'raw_widthY': (1e-4, 0),
+    'widthMajor': (1e-6, 0),
+    'widthMinor': (1e-6, 0),
+    'azimuth': (1e-4, 0),
+    'beamUniformity': (0, 1e-9),
+    'widthX_eta': (0, 0),
+    'widthY_eta': (0, 0),
+    'edgeX': (0, 0),
+    'edgeY': (0, 0),
+    'energyCurve': (0, 1e-9),
+    'topHatFactor': (0, 1e-9),
+}
+
+
+def parameters(raw_data, raw_header, eta, epsilon, backend='optimized'):
+    """
+    `parameters` returns the parameters of the power density distribution that
+    depend on the functions of `backend`.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+    eta : float
+        upper clip level. 0 <= eta <= 1.
+    epsilon : float
+        lower clip level. 0 <= epsilon <= eta <= 1.
+    backend : str, optional
+        `reference` or `optimized`. The default is `optimized`.
+
+    Returns
+    -------
+    dict
+        value of each parameter of `TOLERANCES`. The value of `energyCurve` is
+        the normalized cumulative energy curve as an array.
+
+    """
+
+    b = BACKENDS[backend]
+    values = {}
+
+    raw_data_null = dp.remove_background(raw_data, raw_header)
+    raw_data_null_t = raw_data_null.T
+
+    # Image moments, beam center, and beam width, as in `iso_cp.beam_center`
+    # and `iso_cp.beam_width`
+    for p, q in [(0, 0), (1, 0), (0, 1)]:
+        values['m_%d%d' % (p, q)] = (
+            b.image_moments(raw_data_null_t, raw_header, p, q, 0, 0))
+
+    values['centerX'] = int(round(values['m_10'] / values['m_00']))
+    values['centerY'] = int(round(values['m_01'] / values['m_00']))
+
+    values['m_20'] = b.image_moments(raw_data_null_t, raw_header, 2, 0,
+                                     values['centerX'], 0)
+    values['m_02'] = b.image_moments(raw_data_null_t, raw_header, 0, 2, 0,
+                                     values['centerY'])
+
+    values['widthX'] = round(4 * math.sqrt(values['m_20'] / values['m_00']), 4)
+    values['widthY'] = round(4 * math.sqrt(values['m_02'] / values['m_00']), 4)
+
+    # Moments about the origin from a single pass, and the beam center, beam
+    # width, and principal widths derived from them, as in `Beam`
+    moments = b.raw_moments(raw_data_null_t, raw_header)
+    for name, value in moments.items():
+        values['raw_' + name] = value
+
+    values['raw_centerX'], values['raw_centerY'] = (
+        iso_cp.beam_center(raw_data_null_t, raw_header, moments=moments))
+    values['raw_widthX'], values['raw_widthY'] = (
+        iso_cp.beam_width(raw_data_null_t, raw_header, values['raw_centerX'],
+                          values['raw_centerY'], moments=moments))
+    values['widthMajor'], values['widthMinor'], values['azimuth'] = (
+        iso_cp.principal_widths(moments, dp.get_xResolution(raw_header),
+                                dp.get_yResolution(raw_header)))
+
+    # Beam uniformity, with the inputs calculated as in `Beam`
+    powerDensity_eta = mq.clip_level_power_density(raw_data_null, eta)
+    power_eta = mq.clip_level_power(raw_data_null, eta)
+    irradiationArea_eta = (
+        iso_cp.clip_level_irradiation_area(raw_data_null, eta))
+    averagePowerDensity_eta = (
+        iso_cp.clip_level_average_power_density(power_eta,
+                                                irradiationArea_eta))
+
+    values['beamUniformity'] = b.beam_uniformity(raw_data_null, raw_header,
+                                                 averagePowerDensity_eta,
+                                                 irradiationArea_eta,
+                                                 powerDensity_eta)
+
+    # Clip-level beam and edge widths
+    values['widthX_eta'] = b.clip_level_beam_width(raw_data_null_t, eta)
+    values['widthY_eta'] = b.clip_level_beam_width(raw_data_null, eta)
+    values['edgeX'] = b.clip_level_edge_width(raw_data_null_t, epsilon, eta)
+    values['edgeY'] = b.clip_level_edge_width(raw_data_null, epsilon, eta)
+
+    # Normalized energy curve and top-hat factor
+    energy_curve = b.pre_top_hat(raw_data)
+    values['energyCurve'] = (
+        energy_curve['Normalized Cumulative Energy'].to_numpy())
+    values['topHatFactor'] = niso_cp.top_hat_factor(energy_curve)
+
+    return values
+
+
+def deviation(a, b):
+    """
+    `deviation` returns the maximum absolute and relative deviation between
+    two values or arrays. Arrays of different shapes deviate infinitely.
+
+    Parameters
+    ----------
+    a : float or ndarray
+        reference value.
+    b : float or ndarray
+        optimized value.
+
+    Returns
+    -------
+    float
+        maximum absolute deviation.
+    float
+        maximum relative deviation, relative to the reference value.
+
+    """
+
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+
+    if a.shape != b.shape:
+        return math.inf, math.inf
+
+    # Matching missing values do not deviate
+    both = np.isnan(a) & np.isnan(b)
+    a = a[~both]
+    b = b[~both]
+
+    if a.size == 0:
+        return 0.0, 0.0
+
+    absolute = np.abs(a - b)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = np.where(absolute == 0, 0, absolute / np.abs(a))
+
+    return float(np.max(absolute)), float(np.max(relative))
+
+
+def compare(frames, eta, epsilon, tolerances=None):
+    """
+    `compare` runs both backends on each power density distribution and
+    returns the maximum absolute and relative deviation of each parameter over
+    all power density distributions.
+
+    Parameters
+    ----------
+    frames : iterable of tuple
+        (raw_data, raw_header) of each power density distribution.
+    eta : float
+        upper clip level. 0 <= eta <= 1.
+    epsilon : float
+        lower clip level. 0 <= epsilon <= eta <= 1.
+    tolerances : dict, optional
+        (absolute, relative) tolerance of each parameter. The default is
+        `TOLERANCES`.
+
+    Returns
+    -------
+    dict
+        {name: {'absolute': float, 'relative': float, 'passed': bool}} for
+        each parameter.
+
+    """
+
+    if tolerances is None:
+        tolerances = TOLERANCES
+
+    report = {name: {'absolute': 0.0, 'relative': 0.0, 'passed': True}
+              for name in tolerances}
+
+    for raw_data, raw_header in frames:
+        ref = parameters(raw_data, raw_header, eta, epsilon, 'reference')
+        opt = parameters(raw_data, raw_header, eta, epsilon, 'optimized')
+
+        for name, (abs_tol, rel_tol) in tolerances.items():
+            absolute, relative = deviation(ref[name], opt[name])
+
+            entry = report[name]
+            entry['absolute'] = max(entry['absolute'], absolute)
+            entry['relative'] = max(entry['relative'], relative)
+            entry['passed'] = entry['passed'] and (absolute <= abs_tol or
+                                                   relative <= rel_tol)
+
+    return report
+
+
+def check(frames, eta, epsilon, tolerances=None):
+    """
+    `check` runs `compare` and fails when any deviation exceeds its tolerance.
+
+    Parameters
+    ----------
+    frames : iterable of tuple
+        (raw_data, raw_header) of each power density distribution.
+    eta : float
+        upper clip level. 0 <= eta <= 1.
+    epsilon : float
+        lower clip level. 0 <= epsilon <= eta <= 1.
+    tolerances : dict, optional
+        (absolute, relative) tolerance of each parameter. The default is
+        `TOLERANCES`.
+
+    Raises
+    ------
+    Exception
+        in case any deviation exceeds its tolerance.
+
+    Returns
+    -------
+    dict
+        report of `compare`.
+
+    """
+
+    report = compare(frames, eta, epsilon, tolerances)
+
+    failed = [name for name, entry in report.items() if not entry['passed']]
+
+    if failed:
+        raise Exception("The optimized backend deviates from the reference "
+                        "backend:\n" + format_report(report))
+
+    return report
+
+
+def format_report(report):
+    """
+    `format_report` returns the report of `compare` as a table.
+
+    Parameters
+    ----------
+    report : dict
+        report of `compare`.
+
+    Returns
+    -------
+    str
+        one line per parameter with its maximum absolute and relative
+        deviation.
+
+    """
+
+    lines = ['%-16s %12s %12s  %s' % ('parameter', 'absolute', 'relative',
+                                      'status')]
+
+    for name, entry in report.items():
+        lines.append('%-16s %12.3e %12.3e  %s'
+                     % (name, entry['absolute'], entry['relative'],
+                        'ok' if entry['passed'] else 'FAILED'))
+
+    return '\n'.join(lines)
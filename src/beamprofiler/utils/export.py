@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the export of the beam analysis results to columnar,
+machine-readable formats: `.csv`, `.jsonl` (JSON Lines), and `.npz` (NumPy).
+The exported parameters and their units are the same as in the summary
+workbook, see `utils.report.COLUMNS`.
+
+Only `.csv` and `.jsonl` files are streamed, i.e. written row by row. The
+`.npz` format cannot be appended to, so its columns are buffered in memory
+until the file is closed, and appending to an existing `.npz` file loads it
+back into memory first. Large batches should therefore be exported to `.csv`
+or `.jsonl`.
+"""
+
+import csv
+import json
+import os
+
+import numpy as np
+
+from beamprofiler.utils import report
+
+FORMATS = ['.csv', '.jsonl', '.npz']
+
+
+def keys():
+    """
+    `keys` returns the names of the exported columns. The unit of each column
+    is given by the suffix of its name, e.g. `_mm` for millimeter.
+
+    Returns
+    -------
+    list of str
+        names of the exported columns.
+
+    """
+
+    return [key for key, label, unit, value in report.COLUMNS]
+
+
+def row(beam):
+    """
+    `row` returns the results of `beam` as a dictionary of plain Python values,
+    with lengths in millimeter and areas in square millimeter.
+
+    Parameters
+    ----------
+    beam : Beam or BeamResult
+        object of type `Beam`, or its results of type `BeamResult`.
+
+    Returns
+    -------
+    dict
+        results of the beam analysis, one entry per exported column.
+
+    """
+
+    values = {}
+
+    for key, label, unit, value in report.COLUMNS:
+        v = value(beam)
+
+        # Convert numpy scalars to their Python equivalent
+        if isinstance(v, np.generic):
+            v = v.item()
+
+        values[key] = v
+
+    return values
+
+
+def _column(values):
+    """
+    `_column` returns the values of one column as an array that can be loaded
+    without pickling. Columns with text are stored as fixed-width strings, with
+    None as an empty string, and None in numeric columns is stored as NaN.
+    """
+
+    if any(isinstance(v, str) for v in values):
+        return np.array(['' if v is None else str(v) for v in values],
+                        dtype=str)
+
+    return np.asarray([np.nan if v is None else v for v in values])
+
+
+class Writer:
+    """
+    Class `Writer`.
+
+    `Writer` writes the beam analysis results to a `.csv`, `.jsonl`, or `.npz`
+    file, one row per beam. Rows of `.csv` and `.jsonl` files are streamed,
+    i.e. written as soon as they are added. The `.npz` format cannot be
+    appended to, so all columns of `.npz` files are buffered in memory and
+    written on `close`, and in append mode the existing archive is loaded back
+    into memory first. Use `.csv` or `.jsonl` to stream large batches. In
+    append mode, the new rows are added after the existing ones.
+    """
+
+    def __init__(self, fullPath, append=False):
+        """
+        Initialize an instance of type `Writer`. The format is defined by the
+        extension of `fullPath`.
+
+        Parameters
+        ----------
+        fullPath : str
+            full path to the output file.
+        append : bool, optional
+            append the rows to an existing file. The default is False.
+
+        Raises
+        ------
+        Exception
+            in case the file extension is not supported.
+
+        Returns
+        -------
+        None.
+        """
+
+        self.fullPath = fullPath
+        self.ext = os.path.splitext(fullPath)[1]
+        self.count = 0
+
+        if self.ext not in FORMATS:
+            raise Exception("The file format should be .csv, .jsonl, or "
+                            ".npz.")
+
+        exists = append and os.path.isfile(fullPath)
+
+        if self.ext == '.csv':
+            self.file = open(fullPath, 'a' if append else 'w', newline='',
+                             encoding='utf-8')
+            self.csv = csv.DictWriter(self.file, fieldnames=keys())
+            if not exists or os.path.getsize(fullPath) == 0:
+                self.csv.writeheader()
+        elif self.ext == '.jsonl':
+            self.file = open(fullPath, 'a' if append else 'w',
+                             encoding='utf-8')
+        else:
+            self.columns = {key: [] for key in keys()}
+            if exists:
+                with np.load(fullPath) as npz:
+                    for key in self.columns:
+                        self.columns[key].extend(npz[key].tolist())
+
+    def add(self, beam):
+        """
+        `add` writes one row with the results of `beam`.
+
+        Parameters
+        ----------
+        beam : Beam or BeamResult
+            object of type `Beam`, or its results of type `BeamResult`.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        values = row(beam)
+
+        if self.ext == '.csv':
+            self.csv.writerow(values)
+        elif self.ext == '.jsonl':
+            self.file.write(json.dumps(values) + '\n')
+        else:
+            for key, value in values.items():
+                self.columns[key].append(value)
+
+        self.count += 1
+
+    def close(self):
+        """
+        `close` flushes the remaining rows and closes the output file.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        if self.ext == '.npz':
+            np.savez(self.fullPath,
+                     **{key: _column(value)
+                        for key, value in self.columns.items()})
+        else:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write(fullPath, beams, append=False):
+    """
+    `write` exports the results of a batch of beam analyses to a `.csv`,
+    `.jsonl`, or `.npz` file. `beams` can be any iterable, including a
+    generator that analyses the beams one at a time. Only `.csv` and `.jsonl`
+    files are streamed, while `.npz` files are buffered in memory, see
+    `Writer`.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the output file.
+    beams : iterable of Beam or BeamResult
+        objects of type `Beam`, or their results of type `BeamResult`.
+    append : bool, optional
+        append the rows to an existing file. The default is False.
+
+    Returns
+    -------
+    int
+        number of beams written to the output file.
+
+    """
+
+    with Writer(fullPath, append) as writer:
+        for beam in beams:
+            writer.add(beam)
+
+    return writer.count
+
+
+def read(fullPath):
+    """
+    `read` returns the columns of a file written by `write`.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the `.csv`, `.jsonl`, or `.npz` file.
+
+    Returns
+    -------
+    dict of ndarray
+        one array per exported column.
+
+    """
+
+    ext = os.path.splitext(fullPath)[1]
+
+    if ext == '.npz':
+        with np.load(fullPath) as npz:
+            return {key: npz[key] for key in npz.files}
+
+    if ext == '.csv':
+        with open(fullPath, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(fullPath, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    columns = {}
+    for key in keys():
+        values = [r[key] for r in rows]
+        try:
+            columns[key] = np.asarray(values, dtype=np.float64)
+        except ValueError:
+            columns[key] = np.asarray(values)
+
+    return columns
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the power density distributions exported as grayscale
+images, e.g. 16-bit PNG or TIFF frames written by a camera. The images are
+decoded by Pillow straight into an ndarray, without going through pandas.
+
+Images carry no pixel pitch or null point, so these are either given as
+parameters or read from the sidecar header of the image, see
+`utils.data_processing.read_sidecar`, e.g. `beam.hdr` for `beam.png`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from beamprofiler.utils import data_processing as dp
+
+# Grayscale image modes of Pillow, and their storage types
+MODES = {
+    'L': np.uint8,
+    'I;16': np.dtype('<u2'),
+    'I;16L': np.dtype('<u2'),
+    'I;16B': np.dtype('>u2'),
+    'I': np.int32,
+    'F': np.float32,
+}
+
+
+def read(fullPath, dtype=None):
+    """
+    `read` returns the power density distribution stored in a grayscale
+    image. The pixels are decoded once into a read-only ndarray in the storage
+    type of the image, e.g. uint16 for a 16-bit PNG or TIFF, which is neither
+    copied nor converted unless `dtype` differs.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the image.
+    dtype : dtype, optional
+        storage type of the power density distribution, see
+        `utils.data_processing.corrected_dtype`. The default is None, i.e. the
+        storage type of the image.
+
+    Returns
+    -------
+    ndarray
+        power density distribution.
+
+    """
+
+    # Pillow is only needed for images
+    from PIL import Image
+
+    with Image.open(fullPath) as im:
+        if im.mode not in MODES:
+            raise Exception("The image should be grayscale, not of mode "
+                            "'%s'." % im.mode)
+
+        raw_data_np = np.asarray(im)
+
+    if dtype is not None:
+        raw_data_np = raw_data_np.astype(dtype, copy=False)
+
+    return raw_data_np
+
+
+def size(fullPath):
+    """
+    `size` returns the number of pixels of an image on the x- and y-axis,
+    without decoding the pixels.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the image.
+
+    Returns
+    -------
+    tuple
+        number of pixels on the x- and y-axis.
+
+    """
+
+    # Pillow is only needed for images
+    from PIL import Image
+
+    with Image.open(fullPath) as im:
+        return im.size
+
+
+def header(fullPath, pitch=None, nullPoint=None):
+    """
+    `header` returns the header of the power density distribution stored in
+    an image. The number of pixels is given by the image, while the pixel
+    pitch and the null point are given as parameters, or read from the
+    sidecar header of the image, see `utils.data_processing.read_sidecar`.
+    The sidecar header defines the pixel pitch in millimeter either by the
+    field `Pixel Pitch`, or by the fields `Pixel Pitch X` and `Pixel Pitch Y`,
+    or by the measurement window size in millimeter in the fields `Window X`
+    and `Window Y`.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the image.
+    pitch : float or tuple, optional
+        pixel pitch in millimeter, or pixel pitch on the x- and y-axis. The
+        default is None, i.e. read from the sidecar header.
+    nullPoint : float, optional
+        null point. The default is None, i.e. read from the sidecar header, or
+        0 if the sidecar header does not define it.
+
+    Returns
+    -------
+    dataframe
+        header of the power density distribution.
+
+    """
+
+    xPixel, yPixel = size(fullPath)
+
+    # The sidecar header is only needed if a parameter is missing
+    fields = {}
+    if pitch is None or nullPoint is None:
+        try:
+            fields = dp.read_sidecar(fullPath)
+        except FileNotFoundError:
+            if pitch is None:
+                raise Exception("The pixel pitch of the image should be given "
+                                "as a parameter or by a sidecar header.")
+
+    if pitch is None:
+        if 'window x' in fields and 'window y' in fields:
+            pitch = (float(fields['window x']) / xPixel,
+                     float(fields['window y']) / yPixel)
+        elif 'pixel pitch' in fields:
+            pitch = float(fields['pixel pitch'])
+        elif 'pixel pitch x' in fields and 'pixel pitch y' in fields:
+            pitch = (float(fields['pixel pitch x']),
+                     float(fields['pixel pitch y']))
+        else:
+            raise Exception("The sidecar header of the image should define "
+                            "the pixel pitch or the window size.")
+
+    if nullPoint is None:
+        nullPoint = float(fields.get('null point', 0))
+
+    xPitch, yPitch = np.broadcast_to(pitch, 2)
+
+    return dp.build_header(xPixel, yPixel, xPixel * xPitch, yPixel * yPitch,
+                           nullPoint)
+
+
+def load(fullPath, pitch=None, nullPoint=None, dtype=None):
+    """
+    `load` returns the power density distribution stored in an image and its
+    header, which can be passed as `raw_data` and `raw_header` to `Beam`, see
+    `read` and `header`.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the image.
+    pitch : float or tuple, optional
+        pixel pitch in millimeter, or pixel pitch on the x- and y-axis. The
+        default is None, i.e. read from the sidecar header.
+    nullPoint : float, optional
+        null point. The default is None, i.e. read from the sidecar header, or
+        0 if the sidecar header does not define it.
+    dtype : dtype, optional
+        storage type of the power density distribution. The default is None,
+        i.e. the storage type of the image.
+
+    Returns
+    -------
+    raw_data : dataframe
+        power density distribution, backed by the decoded image.
+    raw_header : dataframe
+        header of the power density distribution.
+
+    """
+
+    raw_data_np = read(fullPath, dtype)
+    raw_header = header(fullPath, pitch, nullPoint)
+
+    if raw_data_np.shape != (dp.get_yPixel(raw_header),
+                             dp.get_xPixel(raw_header)):
+        raise Exception("The image does not match its header.")
+
+    return pd.DataFrame(raw_data_np, copy=False), raw_header
+
+
+def save(fullPath, raw_data, raw_header):
+    """
+    `save` saves a power density distribution as a 16-bit grayscale image,
+    rounded and clipped to 0..65535, with its sidecar header, see
+    `utils.data_processing.write_sidecar`. The image format is given by the
+    extension, e.g. .png or .tif.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the image.
+    raw_data : dataframe or ndarray
+        power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    # Pillow is only needed for images
+    from PIL import Image
+
+    z = np.clip(np.round(np.asarray(raw_data)), 0, 65535).astype('<u2')
+
+    Image.fromarray(z).save(fullPath)
+    dp.write_sidecar(fullPath, raw_header)
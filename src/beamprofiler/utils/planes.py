@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the power density distribution files with several planes,
+e.g. the z-positions of a caustic scan. Each plane is stored in the standard
+layout, i.e. a header whose first field is `Plane` followed by the power
+density of each pixel, and the planes follow each other in the same file.
+
+The file is memory-mapped and scanned once for the header lines, recording the
+byte offsets of the header and the data of each plane. The planes are then
+parsed individually by index, so that only the planes in use are read.
+"""
+
+import io
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+from beamprofiler.utils import data_processing as dp
+
+# First field of the header of each plane
+PLANE = b'Plane'
+
+
+class Planes:
+    """
+    Class `Planes`.
+
+    Index of the planes of a power density distribution file, see `scan`.
+    """
+
+    def __init__(self, fullPath):
+        """
+        Initialize an instance of type `Planes` by scanning the file for the
+        header of each plane.
+
+        Parameters
+        ----------
+        fullPath : str
+            full path to the .xls, .xlsx, or .csv file.
+
+        Returns
+        -------
+        None.
+        """
+
+        ext = os.path.splitext(fullPath)[1]
+
+        if ext not in ['.xls', '.xlsx', '.csv']:
+            raise Exception("The planes should be stored in a .xls, .xlsx, "
+                            "or .csv file.")
+
+        self.fullPath = fullPath
+        self.sep = ',' if ext == '.csv' else '\t'
+
+        with open(fullPath, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # The header lines are found by searching the memory-mapped file,
+        # which does not parse the power densities
+        starts = [0] if self._mm[:len(PLANE)] == PLANE else []
+        pos = self._mm.find(b'\n' + PLANE)
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = self._mm.find(b'\n' + PLANE, pos + 1)
+
+        if not starts:
+            raise Exception("The file does not contain any plane.")
+
+        # Byte offsets of the header, the data, and the end of each plane. The
+        # data starts after the end of the header line
+        ends = starts[1:] + [len(self._mm)]
+        datas = [self._mm.find(b'\n', start, end) for start, end in
+                 zip(starts, ends)]
+        self.offsets = np.array(
+            [(start, end if data == -1 else data + 1, end)
+             for start, data, end in zip(starts, datas, ends)])
+
+        # Headers parsed so far, keyed by index
+        self._headers = {}
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        return self.raw_data(index), self.raw_header(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def _index(self, index):
+        """
+        `_index` returns the non-negative index of a plane, or raises an
+        IndexError.
+        """
+
+        if not -len(self) <= index < len(self):
+            raise IndexError("The file has %d planes." % len(self))
+
+        return index % len(self)
+
+    def raw_header(self, index):
+        """
+        `raw_header` returns the header of a plane, see
+        `utils.data_processing.raw_header`. The header is parsed once.
+
+        Parameters
+        ----------
+        index : int
+            index of the plane in the file.
+
+        Returns
+        -------
+        dataframe
+            header of the power density distribution.
+
+        """
+
+        index = self._index(index)
+
+        if index not in self._headers:
+            start, data, end = self.offsets[index]
+            self._headers[index] = pd.read_csv(
+                io.BytesIO(self._mm[start:data]), header=None, sep=self.sep)
+
+        return self._headers[index]
+
+    def raw_data(self, index, dtype=None):
+        """
+        `raw_data` returns the power density distribution of a plane, see
+        `utils.data_processing.raw_data`. Only the bytes of the plane are
+        read from the file.
+
+        Parameters
+        ----------
+        index : int
+            index of the plane in the file.
+        dtype : dtype, optional
+            storage type of the power density distribution. The default is
+            None, i.e. the type inferred by pandas.
+
+        Returns
+        -------
+        dataframe
+            power density distribution.
+
+        """
+
+        index = self._index(index)
+        start, data, end = self.offsets[index]
+
+        return pd.read_csv(io.BytesIO(self._mm[data:end]), header=None,
+                           sep=self.sep, dtype=dtype,
+                           nrows=dp.get_yPixel(self.raw_header(index)))
+
+    def plane(self, index):
+        """
+        `plane` returns the plane number given by the header of a plane, e.g.
+        its z-position in a caustic scan.
+
+        Parameters
+        ----------
+        index : int
+            index of the plane in the file.
+
+        Returns
+        -------
+        float64
+            plane number.
+
+        """
+
+        return self.raw_header(index).iloc[0][1]
+
+    def close(self):
+        """
+        `close` releases the memory-mapped file.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def scan(fullPath):
+    """
+    `scan` returns the index of the planes of a power density distribution
+    file, see `Planes`. It can be used as a context manager, which closes the
+    file on exit.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the .xls, .xlsx, or .csv file.
+
+    Returns
+    -------
+    Planes
+        index of the planes.
+
+    """
+
+    return Planes(fullPath)
+
+
+def save(fullPath, planes):
+    """
+    `save` saves several power density distributions to a single file in the
+    standard layout, which can be read by `scan`.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the .xls, .xlsx, or .csv file.
+    planes : iterable
+        (raw_data, raw_header, plane) of each plane, where plane is the plane
+        number written to the header, e.g. the z-position.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    sep = ',' if fullPath.endswith('.csv') else '\t'
+
+    with open(fullPath, 'w', encoding='utf-8', newline='') as f:
+        for raw_data, raw_header, plane in planes:
+            raw_header = raw_header.copy()
+            raw_header.iloc[0, 1] = plane
+
+            raw_header.to_csv(f, sep=sep, header=False, index=False)
+            raw_data.to_csv(f, sep=sep, header=False, index=False,
+                            float_format='%.10g')
@@ -3,7 +3,10 @@
 This module handles the generation of the auxiliary plots.
 """
 
+import hashlib
+import json
 import os
+import shutil
 
 import matplotlib.cm as cm
 import matplotlib.patches as mpatches
@@ -74,6 +77,207 @@ def save(path, fileName, suffix, fmt):
                 bbox_inches='tight', dpi=300)
 
 
+def frame_digest(raw_data):
+    """
+    `frame_digest` returns the content digest of a power density distribution.
+    Two distributions with the same shape, data type, and values have the same
+    digest, regardless of the object that holds them.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        power density distribution.
+
+    Returns
+    -------
+    str
+        hexadecimal SHA-1 digest of the power density distribution.
+
+    """
+
+    raw_data_np = np.ascontiguousarray(raw_data.to_numpy())
+
+    digest = hashlib.sha1()
+    digest.update(str(raw_data_np.shape).encode())
+    digest.update(raw_data_np.dtype.str.encode())
+    digest.update(raw_data_np.tobytes())
+
+    return digest.hexdigest()
+
+
+def _normalize(value):
+    """
+    `_normalize` converts a plot option to a plain, JSON-serializable value so
+    that equal options always produce the same content key.
+    """
+
+    # Numpy scalars are converted to their Python equivalent
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if isinstance(value, (tuple, list)):
+        return [_normalize(v) for v in value]
+    elif isinstance(value, float):
+        return repr(value)
+    elif value is None or isinstance(value, (bool, int, str)):
+        return value
+
+    return repr(value)
+
+
+class PlotCache:
+    """
+    Class `PlotCache`.
+
+    `PlotCache` keeps the auxiliary graphs in a cache directory, so that a
+    graph is only rendered again when the power density distribution or the
+    plot options change. The cached images are identified by a content key
+    computed from the frame digest and the normalized plot options. Once the
+    number of cached images exceeds `max_entries`, the least recently used
+    images are removed.
+    """
+
+    def __init__(self, directory, max_entries=256):
+        """
+        Initialize an instance of type `PlotCache`.
+
+        Parameters
+        ----------
+        directory : str
+            path to the cache directory. It is created if it does not exist.
+        max_entries : int, optional
+            maximum number of images kept in the cache. The default is 256.
+
+        Returns
+        -------
+        None.
+        """
+
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, kind, raw_data, **options):
+        """
+        `key` returns the content key of a graph.
+
+        Parameters
+        ----------
+        kind : str
+            name of the graph, e.g. `histogram`.
+        raw_data : dataframe
+            power density distribution that is plotted.
+        **options
+            resolved plot options, including the beam values used in the plot.
+
+        Returns
+        -------
+        str
+            content key of the graph.
+
+        """
+
+        options = {k: _normalize(v) for k, v in options.items()}
+
+        digest = hashlib.sha1()
+        digest.update(kind.encode())
+        digest.update(frame_digest(raw_data).encode())
+        digest.update(json.dumps(options, sort_keys=True).encode())
+
+        return digest.hexdigest()
+
+    def _entry(self, key, fmt):
+        """`_entry` returns the path to the cached image of `key`."""
+
+        return os.path.join(self.directory, key + fmt)
+
+    def fetch(self, key, target):
+        """
+        `fetch` copies the cached image of `key` to `target`.
+
+        Parameters
+        ----------
+        key : str
+            content key of the graph.
+        target : str
+            full path to where the graph would be saved.
+
+        Returns
+        -------
+        bool
+            True if the image was found in the cache, False otherwise.
+
+        """
+
+        entry = self._entry(key, os.path.splitext(target)[1])
+
+        if not os.path.isfile(entry):
+            self.misses += 1
+            return False
+
+        shutil.copyfile(entry, target)
+
+        # Touch the entry so that it becomes the most recently used one
+        os.utime(entry)
+        self.hits += 1
+
+        return True
+
+    def store(self, key, source):
+        """
+        `store` copies the rendered image `source` to the cache and removes the
+        least recently used images in case the cache is full.
+
+        Parameters
+        ----------
+        key : str
+            content key of the graph.
+        source : str
+            full path to the rendered graph.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        shutil.copyfile(source, self._entry(key, os.path.splitext(source)[1]))
+
+        entries = [os.path.join(self.directory, f)
+                   for f in os.listdir(self.directory)]
+        entries.sort(key=os.path.getmtime)
+
+        for entry in entries[:max(len(entries) - self.max_entries, 0)]:
+            os.remove(entry)
+
+    def clear(self):
+        """
+        `clear` removes all images from the cache and resets the counters.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        for f in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, f))
+
+        self.hits = 0
+        self.misses = 0
+
+
+def _output(path, fileName, suffix, fmt):
+    """`_output` returns the full path to where a graph is saved."""
+
+    fileName = os.path.splitext(fileName)[0]
+
+    return os.path.join(path, fileName + suffix + fmt)
+
+
 def histogram(path, fileName, beam, **kwargs):
     """
     `histogram` plots the histogram of the power density distribution and the
@@ -104,6 +308,9 @@ def histogram(path, fileName, beam, **kwargs):
         upper bound of the inset image on the x-axis. The default is 5000.
     fmt : str
         image file format.
+    cache : PlotCache
+        cache of the auxiliary graphs. If the graph is found in the cache it is
+        copied instead of rendered. The default is None.
 
     Returns
     -------
@@ -119,6 +326,15 @@ def histogram(path, fileName, beam, **kwargs):
     y1 = kwargs.pop('y1', 0)
     y2 = kwargs.pop('y2', 5000)
     fmt = kwargs.pop('fmt', '.png')
+    cache = kwargs.pop('cache', None)
+
+    # Skip the rendering if the graph is already in the cache
+    target = _output(path, fileName, ' - histogram', fmt)
+    if cache is not None:
+        key = cache.key('histogram', beam.raw_data_null, n_bins=n_bins,
+                        zoom=zoom, x1=x1, x2=x2, y1=y1, y2=y2, mix=beam.mix)
+        if cache.fetch(key, target):
+            return
 
     # Get the figure and axes objects
     fig, ax = general_plot()
@@ -156,6 +372,8 @@ def histogram(path, fileName, beam, **kwargs):
 
     # Save and show
     save(path, fileName, ' - histogram', fmt)
+    if cache is not None:
+        cache.store(key, target)
     plt.show()
 
 
@@ -193,6 +411,9 @@ def heat_map_2d(path, fileName, beam, **kwargs):
         (width, length, x_offset, y_offset). Default is (0, 0, 0, 0).
     fmt : str
         image file format. The default is `.png`.
+    cache : PlotCache
+        cache of the auxiliary graphs. If the graph is found in the cache it is
+        copied instead of rendered. The default is None.
 
     Returns
     -------
@@ -206,6 +427,11 @@ def heat_map_2d(path, fileName, beam, **kwargs):
     cross_y = kwargs.pop('cross_y', beam.centerY * beam.yResolution)
     rect = kwargs.pop('rect', (0, 0, 0, 0))
     fmt = kwargs.pop('fmt', '.png')
+    cache = kwargs.pop('cache', None)
+
+    # Power density distribution before the background correction, see
+    # `Beam.uncorrected`
+    raw_data = beam.uncorrected()
     
     # Check if the length of rect matches the required value
     req_len = 4
@@ -218,7 +444,19 @@ def heat_map_2d(path, fileName, beam, **kwargs):
                   )
               )
         rect=(0, 0, 0, 0)
-    
+
+    # Skip the rendering if the graph is already in the cache
+    target = _output(path, fileName, ' - 2d heat map', fmt)
+    if cache is not None:
+        key = cache.key('heat_map_2d', raw_data, z_lim=z_lim,
+                        cross_x=cross_x, cross_y=cross_y, rect=rect,
+                        center=(beam.centerX, beam.centerY),
+                        window=(dp.get_xWindow(beam.raw_header),
+                                dp.get_yWindow(beam.raw_header)),
+                        resolution=(beam.xResolution, beam.yResolution))
+        if cache.fetch(key, target):
+            return
+
     # Get the figure and axes objects
     fig, main_ax = general_plot()
 
@@ -240,7 +478,7 @@ def heat_map_2d(path, fileName, beam, **kwargs):
         top_ax.set_ylim(top=z_lim)
 
     # Configure and plot main graph
-    z = beam.raw_data.to_numpy()
+    z = raw_data.to_numpy()
     main_ax.imshow(z,
                    extent=(0,
                            dp.get_xWindow(beam.raw_header),
@@ -305,6 +543,8 @@ def heat_map_2d(path, fileName, beam, **kwargs):
 
     # Save and show
     save(path, fileName, ' - 2d heat map', fmt)
+    if cache is not None:
+        cache.store(key, target)
     plt.show()
 
 
@@ -340,6 +580,9 @@ def heat_map_3d(path, fileName, beam, **kwargs):
         Default is (0, 0, 0, 0, 0).
     fmt : str
         image file format.
+    cache : PlotCache
+        cache of the auxiliary graphs. If the graph is found in the cache it is
+        copied instead of rendered. The default is None.
 
     Returns
     -------
@@ -353,6 +596,11 @@ def heat_map_3d(path, fileName, beam, **kwargs):
     dist = kwargs.pop('dist', 11)
     rect = kwargs.pop('rect', (0, 0, 0, 0, 0))
     fmt = kwargs.pop('fmt', '.png')
+    cache = kwargs.pop('cache', None)
+
+    # Power density distribution before the background correction, see
+    # `Beam.uncorrected`
+    raw_data = beam.uncorrected()
     
     # Check if the length of rect matches the required value
     req_len = 5
@@ -366,6 +614,18 @@ def heat_map_3d(path, fileName, beam, **kwargs):
               )
         rect=(0, 0, 0, 0, 0)
 
+    # Skip the rendering if the graph is already in the cache
+    target = _output(path, fileName, ' - 3d heat map', fmt)
+    if cache is not None:
+        key = cache.key('heat_map_3d', raw_data, elev=elev, azim=azim,
+                        dist=dist, rect=rect,
+                        center=(beam.centerX, beam.centerY),
+                        window=(dp.get_xWindow(beam.raw_header),
+                                dp.get_yWindow(beam.raw_header)),
+                        resolution=(beam.xResolution, beam.yResolution))
+        if cache.fetch(key, target):
+            return
+
     fig, ax = general_plot(proj='3d')
 
     # Configure view
@@ -376,7 +636,7 @@ def heat_map_3d(path, fileName, beam, **kwargs):
     x = np.mgrid[0:dp.get_xWindow(beam.raw_header):beam.xResolution]
     y = np.mgrid[0:dp.get_yWindow(beam.raw_header):beam.yResolution]
     x_3d, y_3d = np.meshgrid(x, y)
-    ax.plot_surface(x_3d, y_3d, beam.raw_data, cmap=cm.gist_rainbow_r,
+    ax.plot_surface(x_3d, y_3d, raw_data, cmap=cm.gist_rainbow_r,
                     rstride=2, cstride=2, linewidth=2, antialiased=False)
     
     
@@ -407,6 +667,8 @@ def heat_map_3d(path, fileName, beam, **kwargs):
 
     # Save and show
     save(path, fileName, ' - 3d heat map', fmt)
+    if cache is not None:
+        cache.store(key, target)
     plt.show()
 
 
@@ -428,6 +690,9 @@ def norm_energy_curve(path, fileName, beam, **kwargs):
     ----------------
     fmt : str
         image file format.
+    cache : PlotCache
+        cache of the auxiliary graphs. If the graph is found in the cache it is
+        copied instead of rendered. The default is None.
 
     Returns
     -------
@@ -437,12 +702,23 @@ def norm_energy_curve(path, fileName, beam, **kwargs):
 
     # Check if any default value has been redefined in kwargs
     fmt = kwargs.pop('fmt', '.png')
+    cache = kwargs.pop('cache', None)
+
+    # Energy curve of the data from which the top-hat factor is calculated,
+    # i.e. inside the ROI, see `Beam.energy_curve`
+    df = beam.energy_curve()
+
+    # Skip the rendering if the graph is already in the cache
+    target = _output(path, fileName, ' - energy curve', fmt)
+    if cache is not None:
+        key = cache.key('norm_energy_curve', df,
+                        top_hat_factor=beam.topHatFactor)
+        if cache.fetch(key, target):
+            return
 
     # Get the figure and axes objects
     fig, ax = general_plot()
 
-    df = dp.pre_top_hat(beam.raw_data)
-
     # Plot
     x = df['Normalized Intensity']
     y = df['Normalized Cumulative Energy']
@@ -489,4 +765,6 @@ def norm_energy_curve(path, fileName, beam, **kwargs):
 
     # Save and show
     save(path, fileName, ' - energy curve', fmt)
+    if cache is not None:
+        cache.store(key, target)
     plt.show()
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the multi-resolution pyramid of a power density
+distribution and the progressive analysis built on it. Each level of the
+pyramid halves the number of pixels on both axes by summing blocks of 2x2
+pixels, so that the total power is preserved. The progressive analysis
+calculates the beam center, the beam widths, and the clip-level metrics from
+the coarsest level to the full resolution, and yields an estimate after each
+level, e.g. to show a preview while the exact results are calculated. The
+entry point is `progressive`, which works on the power density distribution
+itself, so that the first estimate is available without running the full beam
+analysis of `Beam`.
+
+All lengths are given in millimeter and all areas in square millimeter, since
+the pixel size changes from level to level. As in the 2D heat map of
+`utils.plot`, the pixel with column index i and row index j of the full
+resolution is located at (i * xResolution, j * yResolution).
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from beamprofiler.iso import characterizing_parameters as iso_cp
+from beamprofiler.niso import characterizing_parameters as niso_cp
+from beamprofiler.utils import data_processing as dp
+
+# Result of one level of the progressive analysis: level of the pyramid (0 is
+# the full resolution), pixel resolution of the level, and the value and
+# estimated absolute error of each parameter
+Estimate = namedtuple('Estimate', ['level', 'xResolution', 'yResolution',
+                                   'values', 'errors'])
+
+
+def downsample(raw_data_np):
+    """
+    `downsample` returns the power density distribution with half the number
+    of pixels on both axes. Each pixel is the sum of a block of 2x2 pixels, so
+    that the total power is preserved. An odd last row or column is padded
+    with zeros.
+
+    Parameters
+    ----------
+    raw_data_np : ndarray
+        power density distribution.
+
+    Returns
+    -------
+    ndarray
+        downsampled power density distribution.
+
+    """
+
+    yPixel, xPixel = raw_data_np.shape
+
+    if yPixel % 2 or xPixel % 2:
+        raw_data_np = np.pad(raw_data_np, ((0, yPixel % 2), (0, xPixel % 2)))
+
+    return raw_data_np.reshape(raw_data_np.shape[0] // 2, 2,
+                               raw_data_np.shape[1] // 2, 2).sum(axis=(1, 3))
+
+
+class Pyramid:
+    """
+    Class `Pyramid`.
+
+    `Pyramid` holds the levels of the multi-resolution pyramid of a
+    noise-corrected power density distribution, from the full resolution
+    (level 0) to the coarsest level. The levels together take about one third
+    more memory than the full resolution.
+    """
+
+    def __init__(self, raw_data, xResolution, yResolution, min_size=16):
+        """
+        Initialize an instance of type `Pyramid`.
+
+        Parameters
+        ----------
+        raw_data : dataframe or ndarray
+            noise-corrected power density distribution. Missing values are
+            counted as zero power.
+        xResolution : float
+            pixel resolution on the x-axis in millimeter per pixel.
+        yResolution : float
+            pixel resolution on the y-axis in millimeter per pixel.
+        min_size : int, optional
+            the coarsest level has at least this number of pixels on both
+            axes, unless the full resolution is smaller. The default is 16.
+
+        Returns
+        -------
+        None.
+        """
+
+        self.xResolution = xResolution
+        self.yResolution = yResolution
+        self.levels = [
+            np.nan_to_num(np.asarray(raw_data, dtype=np.float64))
+        ]
+
+        while min(self.levels[-1].shape) >= 2 * min_size:
+            self.levels.append(downsample(self.levels[-1]))
+
+    def resolution(self, level):
+        """
+        `resolution` returns the pixel resolution of a level.
+
+        Parameters
+        ----------
+        level : int
+            level of the pyramid.
+
+        Returns
+        -------
+        float
+            pixel resolution on the x-axis in millimeter per pixel.
+        float
+            pixel resolution on the y-axis in millimeter per pixel.
+
+        """
+
+        return self.xResolution * 2**level, self.yResolution * 2**level
+
+    def analyze(self, level, eta):
+        """
+        `analyze` returns the parameters of the power density distribution at
+        one level of the pyramid.
+
+        Parameters
+        ----------
+        level : int
+            level of the pyramid.
+        eta : float
+            upper clip level. 0 <= eta <= 1.
+
+        Returns
+        -------
+        dict
+            `centerX`, `centerY`, `widthX`, `widthY`, `widthX_eta`, and
+            `widthY_eta` in millimeter, and `irradiationArea_eta` in square
+            millimeter.
+
+        """
+
+        z = self.levels[level]
+        r_x, r_y = self.resolution(level)
+
+        # Each pixel of the level is located at the center of the block of
+        # full-resolution pixels it sums up
+        offset_x = (2**level - 1) / 2 * self.xResolution
+        offset_y = (2**level - 1) / 2 * self.yResolution
+
+        x = np.arange(z.shape[1], dtype=np.float64)
+        y = np.arange(z.shape[0], dtype=np.float64)
+        sum_x = z.sum(axis=0)
+        sum_y = z.sum(axis=1)
+        m_0 = sum_x.sum()
+
+        c_x = (x @ sum_x) / m_0
+        c_y = (y @ sum_y) / m_0
+
+        # Variances in square millimeter. The variance of the block positions
+        # within a pixel of the level is removed (Sheppard's correction)
+        var_x = ((x - c_x)**2 @ sum_x / m_0 * r_x**2 -
+                 (r_x**2 - self.xResolution**2) / 12)
+        var_y = ((y - c_y)**2 @ sum_y / m_0 * r_y**2 -
+                 (r_y**2 - self.yResolution**2) / 12)
+
+        df = pd.DataFrame(z, copy=False)
+
+        return {
+            'centerX': c_x * r_x + offset_x,
+            'centerY': c_y * r_y + offset_y,
+            'widthX': 4 * math.sqrt(max(var_x, 0)),
+            'widthY': 4 * math.sqrt(max(var_y, 0)),
+            'widthX_eta': niso_cp.clip_level_beam_width(df.T, eta) * r_x,
+            'widthY_eta': niso_cp.clip_level_beam_width(df, eta) * r_y,
+            'irradiationArea_eta': (
+                iso_cp.clip_level_irradiation_area(df, eta) * r_x * r_y),
+        }
+
+    def progressive(self, eta):
+        """
+        `progressive` calculates the parameters of the power density
+        distribution level by level, from the coarsest level to the full
+        resolution, and yields an estimate after each level.
+
+        The error of each estimate is the change from the previous level, but
+        at least the pixel size of the level (the pixel area for the
+        irradiation area), below which the clip-level metrics are quantized.
+
+        Parameters
+        ----------
+        eta : float
+            upper clip level. 0 <= eta <= 1.
+
+        Yields
+        ------
+        Estimate
+            parameters and estimated errors of each level, see `analyze`.
+
+        """
+
+        previous = None
+
+        for level in reversed(range(len(self.levels))):
+            r_x, r_y = self.resolution(level)
+            values = self.analyze(level, eta)
+
+            # Quantization error of the level
+            errors = {key: r_x if key.endswith('X') or 'X_' in key else r_y
+                      for key in values}
+            errors['irradiationArea_eta'] = r_x * r_y
+
+            if previous is not None:
+                errors = {key: max(errors[key], abs(values[key] -
+                                                    previous[key]))
+                          for key in values}
+
+            previous = values
+
+            yield Estimate(level, r_x, r_y, values, errors)
+
+
+def progressive(raw_data, raw_header, eta, min_size=16):
+    """
+    `progressive` runs the progressive analysis of a power density
+    distribution, see `Pyramid.progressive`. Only the background correction
+    and the pyramid are calculated before the estimate of the coarsest level
+    is yielded, i.e. none of the full-resolution metrics of `Beam`.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+    eta : float
+        upper clip level. 0 <= eta <= 1.
+    min_size : int, optional
+        minimum number of pixels of the coarsest level on both axes. The
+        default is 16.
+
+    Yields
+    ------
+    Estimate
+        parameters and estimated errors of each level.
+
+    """
+
+    pyramid = Pyramid(dp.remove_background(raw_data, raw_header),
+                      dp.get_xResolution(raw_header),
+                      dp.get_yResolution(raw_header),
+                      min_size)
+
+    yield from pyramid.progressive(eta)
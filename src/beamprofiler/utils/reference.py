@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+"""
+This module preserves the original, loop-based implementations of the hot
+paths of the beam analysis as a reference backend. The functions have the same
+signatures and return the same values as their vectorized counterparts in
+`utils.data_processing`, `iso.characterizing_parameters`, and
+`niso.characterizing_parameters`, and are used by `utils.equivalence` to check
+that the vectorized implementations do not change the results.
+
+These implementations are slow and should not be used for the beam analysis.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from beamprofiler.iso import measured_quantities as mq
+from beamprofiler.utils import data_processing as dp
+
+
+def image_moments(raw_data, raw_header, p, q, x0, y0):
+    """
+    `image_moments` returns the nth-order of the power density distribution.
+    According to Wikipedia, "In image processing, computer vision and related
+    fields, an image moment is a certain particular weighted sum (moment) of
+    the image pixels' intensities, or a function of such moments, usually
+    chosen to have some attractive property or interpretation."
+
+    The zeroth-order moment is the unweighted sum of the power density
+    distribution. The first-order moment is the sum of each pixel weighted by
+    its corresponding column index (if the moment is calculated about the
+    x-axis) and by its corresponding row index (if the moment is calculated
+    about the y-axis).
+
+    M_p,q = sum_x[sum_y[(x-x0)^p * (y-y0)^q * f(x, y)]] is the image moment of
+    order p and reference point x0 on the x-axis and of order q and reference
+    point y0 on the y-axis.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        noise-corrected power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+    p : int
+        moment order on the x-axis.
+    q : int
+        moment order on the y-axis.
+    x0 : int/float64
+        reference point on the x-axis.
+    y0 : int/float64
+        reference point on the y-axis.
+
+    Returns
+    -------
+    aux : float64
+        moment of order p and reference point x0 on the x-axis and of order q
+        and reference point y0 on the y-axis.
+
+    """
+
+    aux = 0
+
+    # Convert input_data to numpy array
+    raw_data_np = raw_data.to_numpy()
+
+    # Iterate through all columns and rows
+    for x in range(dp.get_xPixel(raw_header) - 1):
+
+        for y in range(dp.get_yPixel(raw_header) - 1):
+
+            # Apply formula
+            aux = aux + (((x - x0)**p) * ((y - y0)**q) * raw_data_np[x][y])
+
+    return aux
+
+
+def raw_moments(raw_data, raw_header):
+    """
+    `raw_moments` returns the image moments of order up to two about the
+    origin, M_0,0, M_1,0, M_0,1, M_2,0, M_0,2, and M_1,1, accumulated pixel by
+    pixel as in `image_moments`.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        noise-corrected power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+
+    Returns
+    -------
+    dict
+        moments keyed by 'm_00', 'm_10', 'm_01', 'm_20', 'm_02', and 'm_11'.
+
+    """
+
+    moments = dict.fromkeys(['m_00', 'm_10', 'm_01', 'm_20', 'm_02', 'm_11'],
+                            0)
+
+    # Convert input_data to numpy array
+    raw_data_np = raw_data.to_numpy()
+
+    # Iterate through all columns and rows
+    for x in range(dp.get_xPixel(raw_header) - 1):
+
+        for y in range(dp.get_yPixel(raw_header) - 1):
+
+            f = raw_data_np[x][y]
+
+            # Apply formula
+            moments['m_00'] += f
+            moments['m_10'] += x * f
+            moments['m_01'] += y * f
+            moments['m_20'] += x * x * f
+            moments['m_02'] += y * y * f
+            moments['m_11'] += x * y * f
+
+    return moments
+
+
+def beam_uniformity(raw_data, raw_header, clip_level_average_power_density,
+                    clip_level_irradiation_area, clip_level_power_density):
+    """
+    `beam_uniformity` returns the beam uniformity of the power density
+    distribution. In order to avoid errors induced by background noise, it is
+    recommended to use as input a noise-corrected dataframe.
+
+    The beam uniformity is defined as the normalized root mean square deviation
+    of the power density distribution from its clip-level average power
+    density.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        noise-corrected power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+    clip_level_average_power_density : flaot64
+        average power density of the filtered power density distribution.
+    clip_level_irradiation_area : int64
+        irradiation area considering only power densities that are greater than
+        a threshold.
+    clip_level_power_density : float64
+        fraction of the maximum power density.
+
+    Returns
+    -------
+    aux : float64
+        0 >= beam_uniformity. The beam uniformity equals zero for a perfectly
+        flat-top power density distribution.
+
+    """
+
+    # Variable to keep the sum over the cells that meet the requirement
+    aux_sum = 0
+
+    # Convert input_data to numpy array
+    raw_data_np = raw_data.to_numpy()
+
+    # Subtract the clip level average power density
+    aux = raw_data_np - clip_level_average_power_density
+
+    # Power
+    aux = aux**2
+
+    # Loop through all cells in raw_data_pn
+    for x in range(dp.get_xPixel(raw_header) - 1):
+
+        for y in range(dp.get_yPixel(raw_header)):
+
+            # Check if the current cell meets the threshold, which is the
+            # clip level power density
+            if raw_data_np[x][y] >= clip_level_power_density:
+
+                # Sum
+                aux_sum = aux_sum + aux[x][y]
+
+    # Divide by the clip level irradiation area
+    aux = aux_sum / clip_level_irradiation_area
+
+    # Square root
+    aux = np.sqrt(aux)
+
+    # Divide by the clip level power density
+    aux = aux / clip_level_average_power_density
+
+    # Return
+    return aux
+
+
+def clip_level_beam_width(raw_data, clip_level):
+    """
+    `clip_level_beam_width` returns the clip-level beam width of the filtered
+    power density distribution in pixel. Only power densities that are greater
+    than the clip-level power density are considered in the calculation. In
+    order to avoid errors induced by background noise, it is recommended to use
+    as input a noise-corrected dataframe.
+
+    The clip-level beam width is defined as the count of pixels that have a
+    power density greater than the clip-level power density. The clip-level
+    beam width about the x axis is computed by iterating along the row indices
+    and the clip-level beam width about the y axis is computed by iterating
+    along the column indices. The results for each axis are then averaged out
+    disregarding the zeros and any eventual outliers.
+
+    The use of a high-pixel resolution is recommended in order to avoid
+    quantization errors that may arise from counting pixels. Transpose raw_data
+    to get the result along the x-axis.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        noise-corrected power density distribution.
+    clip_level : float
+        0 <= clip_level <= 1. The clip-level defines the clip-level power
+        density, and only power densities greater than this threshold value
+        are considered in the calculation.
+
+    Returns
+    -------
+    float64
+        clip-level beam width of the filtered power density distribution in
+        pixel.
+
+    """
+
+    # Threshold power density
+    threshold = mq.clip_level_power_density(raw_data, clip_level)
+
+    # Transpose raw_data to get the result along the x-axis
+    beam_width = (raw_data > threshold).apply(np.count_nonzero)
+
+    # Remove zero values
+    beam_width = beam_width[beam_width > 0]
+
+    # Filter out outliers 2 times
+    for i in range(2):
+
+        # Identify the outliers by calculating the z-score
+        zScore = np.abs(stats.zscore(beam_width))
+
+        # Check if zScore is filled with NaN (in case beam_width is filled
+        # with the same values)
+        # A RunTimeWarning is thrown when this condition is met
+        if np.isnan(zScore).any():
+
+            # If yes, then fill zScore with the value 1
+            np.nan_to_num(zScore, copy=False, nan=1)
+
+        # Get only values that have a z-score of less than or equal to 2
+        beam_width = beam_width[zScore <= 1]
+
+        # Check if edge_width is empty (in case of a perfect distribution)
+        if beam_width.size == 0:
+
+            # If yes, then add one entry equals to zero
+            beam_width[0] = 0
+
+            break
+
+    # Return the average clip-level beam width
+    return np.average(beam_width)
+
+
+def clip_level_edge_width(raw_data, clip_level_1, clip_level_2):
+    """
+    `clip_level_edge_width` returns the clip-level edge width of the filtered
+    power density distribution in pixel. Only power densities that are greater
+    than the clip-level power density are considered in the calculation. In
+    order to avoid errors induced by background noise, it is recommended to use
+    as input a noise-corrected dataframe.
+
+    The clip-level edge width is defined as the count of pixels that have a
+    power density greater than the clip-level power density 1 (defined by the
+    clip-level 1) AND lower than the clip-level power density 2 (defined by the
+    clip-level 2). The clip-level edge width about the x-axis is computed by
+    iterating along the row indices and the clip-level beam width about the
+    y-axis is computed by iterating along the column indices. The results for
+    each axis are then averaged out disregarding the zeros and any eventual
+    outliers.
+
+    The use of a high-pixel resolution is recommended in order to avoid
+    quantization errors that may arise from counting pixels. Note that
+    clip_level_1 < clip_level 2. Transpose raw_data to get the result along the
+    x-axis.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        noise-corrected power density distribution.
+    clip_level_1 : int64
+        0 <= clip_level_1 <= 1. The clip-level defines the clip-level power
+        density, and only power densities greater than this threshold value
+        are considered in the calculation.
+    clip_level_2 : TYPE
+        0 <= clip_level_2 <= 1. The clip-level defines the clip-level power
+        density, and only power densities less than this threshold value
+        are considered in the calculation.
+
+    Returns
+    -------
+    float64
+        clip-level edge width of the filtered power density distribution in
+        pixel.
+
+    """
+
+    # Threshold power density LOW value
+    threshold_1 = mq.clip_level_power_density(raw_data, clip_level_1)
+
+    # Threshold power density HIGH value
+    threshold_2 = mq.clip_level_power_density(raw_data, clip_level_2)
+
+    # Transpose raw_data to get the result along the x-axis
+    edge_width = (
+        ((raw_data > threshold_1) & (raw_data < threshold_2))
+        .apply(np.count_nonzero)
+    )
+
+    # Remove zero values
+    edge_width = edge_width[edge_width > 0]
+
+    # Filter out outliers 2 times
+    for i in range(2):
+
+        # Identify the outliers by calculating the z-score
+        zScore = np.abs(stats.zscore(edge_width))
+
+        # Check if zScore is filled with NaN (in case beam_width is filled
+        # with the same values)
+        # A RunTimeWarning is thrown when this condition is met
+        if np.isnan(zScore).any():
+
+            # If yes, then fill zScore with the value 1
+            np.nan_to_num(zScore, copy=False, nan=1)
+
+        # Get only values that have a z-score of less than or equal to 2
+        edge_width = edge_width[zScore <= 1]
+
+        # Check if edge_width is empty (in case of a perfect distribution)
+        if edge_width.size == 0:
+
+            # If yes, then add one entry equals to zero
+            edge_width[0] = 0
+
+            break
+
+    # Return the average clip-level beam width
+    return np.average(edge_width) / 2
+
+
+def pre_top_hat(raw_data):
+    """
+    `pre_top_hat` returns a dataframe with the necessary data to calculate the
+    top-hat factor and to plot the normalized energy curve.
+
+    Parameters
+    ----------
+    raw_data : dataframe
+        power density distribution.
+
+    Returns
+    -------
+    df : dataframe
+        necessary data to calculate the top-hat factor and to plot the
+        normalized energy curve.
+
+    """
+
+    # Stack raw_data into a single column
+    raw_data_stacked = raw_data.stack(level=-1, dropna=True)
+
+    # Get the histogram count for each bin and sort the index
+    hist = raw_data_stacked.value_counts().sort_index()
+
+    # Finds the lower_limit, which is the intensity value (bin) with the
+    # highest count
+    lower_limit = hist.idxmax()
+
+    # Creates a new data frame using <hist>
+    df = pd.DataFrame(data={'Count': hist}, index=hist.index)
+
+    # Add column <Energy> having the bin with highest count (<lower_limit>)
+    # as zero
+    df['Energy'] = df['Count'] * (df.index - lower_limit)
+
+    # Because the bin with the highest count is set to zero, some energy values
+    # are negative, therefore should be removed
+    df = df[(df >= 0).all(axis=1)]
+
+    # Since not all bins have a count, fill missing values with zeros
+    df = (
+        df.reindex(np.arange(min(df.index), max(df.index)+1), fill_value=0)
+    )
+
+    # Add reverse cumulative sum
+    df['Cumulative Energy'] = (
+        df.loc[::-1, 'Energy'].cumsum()[::-1]
+    )
+
+    # Add normalized cumulative sum
+    df['Normalized Cumulative Energy'] = (
+        100*df['Cumulative Energy'].to_numpy() /
+        df.max(axis=0)['Cumulative Energy']
+    )
+
+    # Add normalized intensity
+    df['Normalized Intensity'] = (
+        100*(df.index - min(df.index))/(max(df.index) - min(df.index))
+    )
+
+    return df
@@ -5,7 +5,79 @@ This module handles the report generation of the beam analysis.
 
 import os
 
-import xlsxwriter
+# Columns of the summary workbook: key, label, unit, and a function that
+# returns the value from an object of type `Beam`. The key is the
+# machine-readable name of the column. Lengths are converted from pixel to
+# millimeter and areas from pixel to square millimeter
+COLUMNS = [
+    ('file_name', 'File', '',
+     lambda b: b.fileName),
+    ('eta', 'Upper clip-level', 'N/A',
+     lambda b: b.eta),
+    ('epsilon', 'Lower clip-level', 'N/A',
+     lambda b: b.epsilon),
+    ('mix', 'Normal mixtures', 'N/A',
+     lambda b: b.mix),
+    ('total_power_adc', 'Total power', 'ADC',
+     lambda b: b.totalPower),
+    ('clip_level_power_adc', 'Clip-level power', 'ADC',
+     lambda b: b.power_eta),
+    ('max_power_density_adc', 'Maximum power density', 'ADC',
+     lambda b: b.maxPowerDensity),
+    ('clip_level_power_density_adc', 'Clip-level power density', 'ADC',
+     lambda b: b.powerDensity_eta),
+    ('clip_level_average_power_density_adc',
+     'Clip-level average power density', 'ADC',
+     lambda b: b.averagePowerDensity_eta),
+    ('centroid_x_mm', 'Beam centroid x-axis', 'mm',
+     lambda b: b.centerX * b.xResolution),
+    ('centroid_y_mm', 'Beam centroid y-axis', 'mm',
+     lambda b: b.centerY * b.yResolution),
+    ('width_x_mm', 'Beam width x-axis', 'mm',
+     lambda b: b.widthX * b.xResolution),
+    ('width_y_mm', 'Beam width y-axis', 'mm',
+     lambda b: b.widthY * b.yResolution),
+    ('width_major_mm', 'Beam width major axis', 'mm',
+     lambda b: b.widthMajor),
+    ('width_minor_mm', 'Beam width minor axis', 'mm',
+     lambda b: b.widthMinor),
+    ('azimuth_deg', 'Beam azimuth', 'deg',
+     lambda b: b.azimuth),
+    ('irradiation_area_epsilon_mm2', 'Clip-level irradiation area (lower)',
+     'mm²',
+     lambda b: b.irradiationArea_epsilon * b.xResolution * b.yResolution),
+    ('irradiation_area_eta_mm2', 'Clip-level irradiation area (upper)',
+     'mm²',
+     lambda b: b.irradiationArea_eta * b.xResolution * b.yResolution),
+    ('aspect_ratio', 'Beam aspect ratio', 'N/A',
+     lambda b: b.aspectRatio),
+    ('ellipticity', 'Beam ellipticity', 'N/A',
+     lambda b: b.ellipticity),
+    ('fractional_power', 'Fractional power', 'N/A',
+     lambda b: b.fractionalPower_eta),
+    ('flatness_factor', 'Flatness factor', 'N/A',
+     lambda b: b.flatnessFactor_eta),
+    ('beam_uniformity', 'Beam uniformity', 'N/A',
+     lambda b: b.beamUniformity_eta),
+    ('plateau_uniformity', 'Plateau uniformity', 'N/A',
+     lambda b: b.plateauUniformity_eta),
+    ('edge_steepness', 'Edge steepness', 'N/A',
+     lambda b: b.edgeSteepness_eta),
+    ('clip_level_width_x_mm', 'Clip-level beam width x-axis', 'mm',
+     lambda b: b.widthX_eta * b.xResolution),
+    ('clip_level_width_y_mm', 'Clip-level beam width y-axis', 'mm',
+     lambda b: b.widthY_eta * b.yResolution),
+    ('clip_level_edge_width_x_mm', 'Clip-level edge width x-axis', 'mm',
+     lambda b: b.edgeX_epsilon_eta * b.xResolution),
+    ('clip_level_edge_width_y_mm', 'Clip-level edge width y-axis', 'mm',
+     lambda b: b.edgeY_epsilon_eta * b.yResolution),
+    ('modified_plateau_uniformity', 'Modified plateau uniformity', 'N/A',
+     lambda b: b.modPlateauUniformity_eta),
+    ('top_hat_factor', 'Top-hat factor', 'N/A',
+     lambda b: b.topHatFactor),
+    ('d86_mm', 'D86 diameter', 'mm',
+     lambda b: b.diameter86),
+]
 
 
 def write(path, fileName, beam):
@@ -18,8 +90,8 @@ def write(path, fileName, beam):
         directory where the input file is saved.
     fileName : str
         name of the input file.
-    beam : Beam
-        object of type `Beam`.
+    beam : Beam or BeamResult
+        object of type `Beam`, or its results of type `BeamResult`.
 
     Returns
     -------
@@ -31,6 +103,9 @@ def write(path, fileName, beam):
     fileName = os.path.splitext(fileName)[0]
     outFile = 'Beam Analysis - ' + fileName + '.xlsx'
 
+    # xlsxwriter is slow to import and only needed to write workbooks
+    import xlsxwriter
+
     # Create a new Excel file
     wb = xlsxwriter.Workbook(os.path.join(path, outFile))
 
@@ -74,7 +149,10 @@ def write(path, fileName, beam):
     # Define a method to insert an image
     def image(sheet, cell, path):
 
-        sheet.insert_image(cell, path)
+        # The auxiliary graphs are optional, e.g. when the report is written
+        # from a `BeamResult` and no graph has been plotted
+        if os.path.isfile(path):
+            sheet.insert_image(cell, path)
 
     def column_width(sheet):
 
@@ -176,6 +254,26 @@ def write(path, fileName, beam):
                    'N/A',
                    'Clip-level: ' + str(beam.eta*100) + '%. Equals 0 for a '
                    'perfect vertical edge'])
+    empty_line(ws, 28)
+
+    sub_header(ws, 29, 'Principal axes')
+    entry(ws, 30, ['Beam width major axis',
+                   beam.widthMajor,
+                   'mm',
+                   'Independent of the clip-level'])
+    entry(ws, 31, ['Beam width minor axis',
+                   beam.widthMinor,
+                   'mm',
+                   'Independent of the clip-level'])
+    entry(ws, 32, ['Beam azimuth',
+                   beam.azimuth,
+                   'deg',
+                   'Angle between the major axis and the x-axis'])
+    entry(ws, 33, ['Beam ellipticity',
+                   beam.ellipticity,
+                   'N/A',
+                   'Independent of the clip-level. Equals 1 for a circular '
+                   'beam'])
 
     try:
         image(ws, 'E1', os.path.join(path, fileName + ' - histogram.png'))
@@ -226,6 +324,11 @@ def write(path, fileName, beam):
                    'N/A',
                    'Independent of the clip-level. Equals 1 for a perfect '
                    'square'])
+    entry(ws, 11, ['D86 diameter',
+                   beam.diameter86,
+                   'mm',
+                   'Diameter encircling 86.5% of the power about the beam '
+                   'center'])
 
     image(ws, 'E1', os.path.join(path, fileName + ' - energy curve.png'))
 
@@ -234,3 +337,135 @@ def write(path, fileName, beam):
     except xlsxwriter.exceptions.FileCreateError:
         print("The file is currently open and won't be saved. Please, close "
               "the file and run the analysis again.")
+
+
+class Summary:
+    """
+    Class `Summary`.
+
+    `Summary` writes the results of a batch of beam analyses to a single
+    `.xlsx` workbook, one row per beam and one column per parameter. The
+    workbook is written in the `constant_memory` mode of `xlsxwriter`, i.e.
+    each row is flushed to disk as soon as the next one starts, so that the
+    memory usage does not depend on the number of beams. Rows are added
+    incrementally with `add` as the results arrive.
+    """
+
+    def __init__(self, path, outFile='Beam Analysis - Summary.xlsx'):
+        """
+        Initialize an instance of type `Summary` and write the header rows,
+        that is the parameter names and their units.
+
+        Parameters
+        ----------
+        path : str
+            directory where the summary workbook is saved.
+        outFile : str, optional
+            name of the summary workbook. The default is
+            `Beam Analysis - Summary.xlsx`.
+
+        Returns
+        -------
+        None.
+        """
+
+        import xlsxwriter
+
+        self.wb = xlsxwriter.Workbook(os.path.join(path, outFile),
+                                      {'constant_memory': True})
+        self.ws = self.wb.add_worksheet('Summary')
+
+        bold = self.wb.add_format({
+            'bold': True
+        })
+        italic = self.wb.add_format({
+            'italic': True
+        })
+        self.number = self.wb.add_format({
+            'num_format': '#,##0.00'
+        })
+
+        self.ws.set_column(0, 0, 30)
+        self.ws.set_column(1, len(COLUMNS) - 1, 15)
+
+        # In constant memory mode the rows must be written in order
+        for col, (key, label, unit, value) in enumerate(COLUMNS):
+            self.ws.write(0, col, label, bold)
+        for col, (key, label, unit, value) in enumerate(COLUMNS):
+            self.ws.write(1, col, unit, italic)
+
+        self.row = 2
+
+    def add(self, beam):
+        """
+        `add` writes one row with the results of `beam`.
+
+        Parameters
+        ----------
+        beam : Beam or BeamResult
+            object of type `Beam`, or its results of type `BeamResult`.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        for col, (key, label, unit, value) in enumerate(COLUMNS):
+            self.ws.write(self.row, col, value(beam), self.number)
+
+        self.row += 1
+
+    def close(self):
+        """
+        `close` writes the remaining rows and closes the summary workbook.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        from xlsxwriter.exceptions import FileCreateError
+
+        try:
+            self.wb.close()
+        except FileCreateError:
+            print("The file is currently open and won't be saved. Please, "
+                  "close the file and run the analysis again.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_summary(path, beams, outFile='Beam Analysis - Summary.xlsx'):
+    """
+    `write_summary` writes the results of a batch of beam analyses to a single
+    `.xlsx` workbook. `beams` can be any iterable, including a generator that
+    analyses the beams one at a time, so that only one beam is kept in memory.
+
+    Parameters
+    ----------
+    path : str
+        directory where the summary workbook is saved.
+    beams : iterable of Beam or BeamResult
+        objects of type `Beam`, or their results of type `BeamResult`.
+    outFile : str, optional
+        name of the summary workbook. The default is
+        `Beam Analysis - Summary.xlsx`.
+
+    Returns
+    -------
+    int
+        number of beams written to the summary workbook.
+
+    """
+
+    with Summary(path, outFile) as summary:
+        for beam in beams:
+            summary.add(beam)
+
+    return summary.row - 2
@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the generation of synthetic power density distributions
+with known parameters, e.g. for testing and benchmarking the beam analysis at
+any resolution.
+
+The profiles are defined in pixel coordinates. The first axis of the returned
+arrays is the y-axis and the second axis is the x-axis, as in the dataframes
+returned by `utils.data_processing.raw_data`. All widths are full widths in
+pixel: for the Gaussian profile the width is the 1/e² diameter, which equals
+the second-moment width (four times the standard deviation).
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+from numpy.polynomial import hermite
+
+from beamprofiler.utils import data_processing as dp
+
+
+def _coordinates(xPixel, yPixel, centerX, centerY, angle):
+    """
+    `_coordinates` returns the pixel coordinates relative to the center,
+    rotated by `angle` degrees counterclockwise, so that the profiles can be
+    defined along their principal axes.
+    """
+
+    if centerX is None:
+        centerX = xPixel / 2
+    if centerY is None:
+        centerY = yPixel / 2
+
+    x = np.arange(xPixel, dtype=np.float64)[np.newaxis, :] - centerX
+    y = np.arange(yPixel, dtype=np.float64)[:, np.newaxis] - centerY
+
+    if angle == 0:
+        return x, y
+
+    cos = math.cos(math.radians(angle))
+    sin = math.sin(math.radians(angle))
+
+    return x * cos + y * sin, -x * sin + y * cos
+
+
+def gaussian(xPixel, yPixel, widthX, widthY=None, centerX=None, centerY=None,
+             angle=0, peak=1000):
+    """
+    `gaussian` returns an elliptical, optionally rotated, Gaussian profile.
+
+    Parameters
+    ----------
+    xPixel : int
+        number of pixels on the x-axis.
+    yPixel : int
+        number of pixels on the y-axis.
+    widthX : float
+        1/e² diameter along the first principal axis in pixel.
+    widthY : float, optional
+        1/e² diameter along the second principal axis in pixel. The default is
+        `widthX`.
+    centerX : float, optional
+        center coordinate on the x-axis in pixel. The default is the center of
+        the frame.
+    centerY : float, optional
+        center coordinate on the y-axis in pixel. The default is the center of
+        the frame.
+    angle : float, optional
+        angle between the first principal axis and the x-axis in degree. The
+        default is 0.
+    peak : float, optional
+        maximum power density. The default is 1000.
+
+    Returns
+    -------
+    ndarray
+        power density distribution.
+
+    """
+
+    if widthY is None:
+        widthY = widthX
+
+    u, v = _coordinates(xPixel, yPixel, centerX, centerY, angle)
+
+    # The 1/e² radius is half the 1/e² diameter
+    return peak * np.exp(-2 * ((2 * u / widthX)**2 + (2 * v / widthY)**2))
+
+
+def super_gaussian(xPixel, yPixel, widthX, widthY=None, order=10,
+                   centerX=None, centerY=None, angle=0, peak=1000):
+    """
+    `super_gaussian` returns an elliptical super-Gaussian (flat-top) profile,
+    i.e. peak * exp(-2 * r^order), where r is the radius normalized by the 1/e²
+    radius. `order=2` gives the Gaussian profile, and the profile tends to a
+    top-hat as `order` increases.
+
+    Parameters
+    ----------
+    xPixel : int
+        number of pixels on the x-axis.
+    yPixel : int
+        number of pixels on the y-axis.
+    widthX : float
+        1/e² diameter along the first principal axis in pixel.
+    widthY : float, optional
+        1/e² diameter along the second principal axis in pixel. The default is
+        `widthX`.
+    order : float, optional
+        order of the super-Gaussian. The default is 10.
+    centerX : float, optional
+        center coordinate on the x-axis in pixel. The default is the center of
+        the frame.
+    centerY : float, optional
+        center coordinate on the y-axis in pixel. The default is the center of
+        the frame.
+    angle : float, optional
+        angle between the first principal axis and the x-axis in degree. The
+        default is 0.
+    peak : float, optional
+        maximum power density. The default is 1000.
+
+    Returns
+    -------
+    ndarray
+        power density distribution.
+
+    """
+
+    if widthY is None:
+        widthY = widthX
+
+    u, v = _coordinates(xPixel, yPixel, centerX, centerY, angle)
+    r2 = (2 * u / widthX)**2 + (2 * v / widthY)**2
+
+    return peak * np.exp(-2 * r2**(order / 2))
+
+
+def top_hat(xPixel, yPixel, widthX, widthY=None, centerX=None, centerY=None,
+            angle=0, peak=1000, square=False):
+    """
+    `top_hat` returns a perfectly flat-top profile with vertical edges, either
+    elliptical or rectangular.
+
+    Parameters
+    ----------
+    xPixel : int
+        number of pixels on the x-axis.
+    yPixel : int
+        number of pixels on the y-axis.
+    widthX : float
+        full width along the first principal axis in pixel.
+    widthY : float, optional
+        full width along the second principal axis in pixel. The default is
+        `widthX`.
+    centerX : float, optional
+        center coordinate on the x-axis in pixel. The default is the center of
+        the frame.
+    centerY : float, optional
+        center coordinate on the y-axis in pixel. The default is the center of
+        the frame.
+    angle : float, optional
+        angle between the first principal axis and the x-axis in degree. The
+        default is 0.
+    peak : float, optional
+        power density of the plateau. The default is 1000.
+    square : bool, optional
+        rectangular instead of elliptical profile. The default is False.
+
+    Returns
+    -------
+    ndarray
+        power density distribution.
+
+    """
+
+    if widthY is None:
+        widthY = widthX
+
+    u, v = _coordinates(xPixel, yPixel, centerX, centerY, angle)
+
+    if square:
+        inside = (np.abs(u) <= widthX / 2) & (np.abs(v) <= widthY / 2)
+    else:
+        inside = (2 * u / widthX)**2 + (2 * v / widthY)**2 <= 1
+
+    return peak * inside.astype(np.float64)
+
+
+def multi_mode(xPixel, yPixel, width, modes, centerX=None, centerY=None,
+               angle=0, peak=1000):
+    """
+    `multi_mode` returns the incoherent superposition of Hermite-Gaussian
+    modes TEM_mn. The second-moment width of the mode TEM_mn is
+    `width * sqrt(2m + 1)` on the x-axis and `width * sqrt(2n + 1)` on the
+    y-axis, where `width` is the width of the fundamental mode TEM_00.
+
+    Parameters
+    ----------
+    xPixel : int
+        number of pixels on the x-axis.
+    yPixel : int
+        number of pixels on the y-axis.
+    width : float
+        1/e² diameter of the fundamental mode in pixel.
+    modes : list of tuple
+        (m, n, weight) of each mode. The weight is the fraction of the power
+        carried by the mode.
+    centerX : float, optional
+        center coordinate on the x-axis in pixel. The default is the center of
+        the frame.
+    centerY : float, optional
+        center coordinate on the y-axis in pixel. The default is the center of
+        the frame.
+    angle : float, optional
+        angle between the mode axes and the x-axis in degree. The default is
+        0.
+    peak : float, optional
+        maximum power density of the superposition. The default is 1000.
+
+    Returns
+    -------
+    ndarray
+        power density distribution.
+
+    """
+
+    u, v = _coordinates(xPixel, yPixel, centerX, centerY, angle)
+
+    # Normalized coordinates, such that the fundamental mode is exp(-2 r²),
+    # where r is the radius normalized by the 1/e² radius
+    u = math.sqrt(2) * 2 * u / width
+    v = math.sqrt(2) * 2 * v / width
+    gauss = np.exp(-(u**2 + v**2))
+
+    z = np.zeros(np.broadcast(u, v).shape)
+
+    for m, n, weight in modes:
+        hm = hermite.hermval(u, [0] * m + [1])
+        hn = hermite.hermval(v, [0] * n + [1])
+
+        # Each mode carries the same power before weighting
+        norm = 2.0**(m + n) * math.factorial(m) * math.factorial(n)
+
+        z += weight * (hm * hn)**2 * gauss / norm
+
+    return peak * z / z.max()
+
+
+def add_background(z, offset):
+    """
+    `add_background` returns the profile with a constant background offset.
+
+    Parameters
+    ----------
+    z : ndarray
+        power density distribution.
+    offset : float
+        background offset.
+
+    Returns
+    -------
+    ndarray
+        power density distribution with background.
+
+    """
+
+    return z + offset
+
+
+def add_noise(z, sigma, seed=None):
+    """
+    `add_noise` returns the profile with additive Gaussian noise.
+
+    Parameters
+    ----------
+    z : ndarray
+        power density distribution.
+    sigma : float
+        standard deviation of the noise.
+    seed : int, optional
+        seed of the random number generator. The default is None.
+
+    Returns
+    -------
+    ndarray
+        power density distribution with noise.
+
+    """
+
+    rng = np.random.default_rng(seed)
+
+    return z + rng.normal(0, sigma, z.shape)
+
+
+def add_hot_pixels(z, count, value=None, seed=None):
+    """
+    `add_hot_pixels` returns the profile with `count` hot pixels at random
+    positions.
+
+    Parameters
+    ----------
+    z : ndarray
+        power density distribution.
+    count : int
+        number of hot pixels.
+    value : float, optional
+        power density of the hot pixels. The default is twice the maximum
+        power density of the profile.
+    seed : int, optional
+        seed of the random number generator. The default is None.
+
+    Returns
+    -------
+    z : ndarray
+        power density distribution with hot pixels.
+    positions : tuple of ndarray
+        row and column indices of the hot pixels.
+
+    """
+
+    rng = np.random.default_rng(seed)
+
+    if value is None:
+        value = 2 * z.max()
+
+    flat = rng.choice(z.size, size=count, replace=False)
+    positions = np.unravel_index(flat, z.shape)
+
+    z = z.copy()
+    z[positions] = value
+
+    return z, positions
+
+
+def frame(z, xResolution, yResolution=None, nullPoint=0, dtype=None):
+    """
+    `frame` returns the power density distribution and its header in the
+    standard layout, as returned by `utils.data_processing.raw_data` and
+    `utils.data_processing.raw_header`.
+
+    Parameters
+    ----------
+    z : ndarray
+        power density distribution, including any background.
+    xResolution : float
+        pixel resolution on the x-axis in millimeter per pixel.
+    yResolution : float, optional
+        pixel resolution on the y-axis in millimeter per pixel. The default is
+        `xResolution`.
+    nullPoint : float, optional
+        null point written to the header. The default is 0.
+    dtype : data-type, optional
+        data type of the power density distribution, e.g. `np.uint16` for ADC
+        counts. Values are rounded for integer types. The default is the data
+        type of `z`.
+
+    Returns
+    -------
+    raw_data : dataframe
+        power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+
+    """
+
+    if yResolution is None:
+        yResolution = xResolution
+
+    if dtype is not None:
+        if np.issubdtype(dtype, np.integer):
+            info = np.iinfo(dtype)
+            z = np.clip(np.round(z), info.min, info.max)
+        z = z.astype(dtype)
+
+    yPixel, xPixel = z.shape
+
+    raw_data = pd.DataFrame(z)
+    raw_header = dp.build_header(xPixel, yPixel,
+                                 xPixel * xResolution,
+                                 yPixel * yResolution,
+                                 nullPoint)
+
+    return raw_data, raw_header
+
+
+def save(fullPath, raw_data, raw_header):
+    """
+    `save` saves a power density distribution in the standard layout, which
+    can be read by `utils.data_processing.raw_data` and
+    `utils.data_processing.raw_header`: tab-separated for `.xls` and `.xlsx`
+    and comma-separated for `.csv`, with the header in the first row, as a
+    little-endian uint16 binary dump with a sidecar header for `.raw`, or as a
+    16-bit grayscale image with a sidecar header for `.png`, `.tif`, and
+    `.tiff`, see `utils.image.save`.
+
+    Parameters
+    ----------
+    fullPath : str
+        full path to the `.xls`, `.xlsx`, `.csv`, `.raw`, `.png`, `.tif`, or
+        `.tiff` file.
+    raw_data : dataframe
+        power density distribution.
+    raw_header : dataframe
+        header of the power density distribution.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    if fullPath.endswith('.raw'):
+        z = np.clip(np.round(raw_data.to_numpy()), 0, 65535).astype('<u2')
+        z.tofile(fullPath)
+        dp.write_sidecar(fullPath, raw_header, Type='<u2')
+        return
+
+    if fullPath.lower().endswith(('.png', '.tif', '.tiff')):
+        from beamprofiler.utils import image
+        image.save(fullPath, raw_data, raw_header)
+        return
+
+    sep = ',' if fullPath.endswith('.csv') else '\t'
+
+    with open(fullPath, 'w', encoding='utf-8', newline='') as f:
+        raw_header.to_csv(f, sep=sep, header=False, index=False)
+        raw_data.to_csv(f, sep=sep, header=False, index=False,
+                        float_format='%.10g')
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+This module handles the opt-in timing instrumentation of the beam analysis.
+Each stage of the analysis, e.g. reading the file or calculating the beam
+width, is timed when a `Timer` is active. When no timer is active, the stages
+are entered through a shared no-op context, so that the overhead is negligible.
+"""
+
+import contextlib
+import time
+
+
+class _Stage:
+    """`_Stage` times one stage of the beam analysis for a `Timer`."""
+
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timer.record(self.name, time.perf_counter() - self.start)
+
+
+class _NullStage:
+    """`_NullStage` is the no-op stage used when no timer is active."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+class _NullTimer:
+    """`_NullTimer` is the timer used when the instrumentation is disabled."""
+
+    __slots__ = ()
+
+    enabled = False
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+    def child(self):
+        return self
+
+    def as_dict(self):
+        return {}
+
+
+_NULL_STAGE = _NullStage()
+NULL = _NullTimer()
+
+
+class Timer:
+    """
+    Class `Timer`.
+
+    `Timer` records the wall time and the number of calls of each stage of the
+    beam analysis. Optionally, a callback is called with the name and the wall
+    time of every stage as soon as it finishes, e.g. to feed the timings to an
+    external telemetry system.
+    """
+
+    enabled = True
+
+    def __init__(self, callback=None, parent=None):
+        """
+        Initialize an instance of type `Timer`.
+
+        Parameters
+        ----------
+        callback : callable, optional
+            function called as `callback(name, seconds)` at the end of each
+            stage. The default is None.
+        parent : Timer, optional
+            timer to which every record is forwarded. The default is None.
+
+        Returns
+        -------
+        None.
+        """
+
+        self.callback = callback
+        self.parent = parent
+        self.timings = {}
+
+    def stage(self, name):
+        """
+        `stage` returns a context manager that times the stage `name`.
+
+        Parameters
+        ----------
+        name : str
+            name of the stage.
+
+        Returns
+        -------
+        context manager
+            times the enclosed block.
+
+        """
+
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        """
+        `record` adds one call of the stage `name` that took `seconds`.
+
+        Parameters
+        ----------
+        name : str
+            name of the stage.
+        seconds : float
+            wall time of the stage in seconds.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        total, calls = self.timings.get(name, (0.0, 0))
+        self.timings[name] = (total + seconds, calls + 1)
+
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+        if self.parent is not None:
+            self.parent.record(name, seconds)
+
+    def child(self):
+        """
+        `child` returns a new timer that forwards its records to this one, so
+        that each beam keeps its own timings while this timer accumulates the
+        timings of all beams.
+
+        Returns
+        -------
+        Timer
+            child timer.
+
+        """
+
+        return Timer(parent=self)
+
+    def as_dict(self):
+        """
+        `as_dict` returns the recorded timings.
+
+        Returns
+        -------
+        dict
+            {name: {'time': seconds, 'calls': count}} for each stage.
+
+        """
+
+        return {name: {'time': total, 'calls': calls}
+                for name, (total, calls) in self.timings.items()}
+
+
+# Timer activated by `instrument`
+_active = NULL
+
+
+def active():
+    """
+    `active` returns the timer activated by `instrument`, or a no-op timer if
+    the instrumentation is disabled.
+
+    Returns
+    -------
+    Timer
+        active timer.
+
+    """
+
+    return _active
+
+
+@contextlib.contextmanager
+def instrument(callback=None):
+    """
+    `instrument` activates the timing instrumentation of every beam analysis
+    run inside the `with` block.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        function called as `callback(name, seconds)` at the end of each stage.
+        The default is None.
+
+    Yields
+    ------
+    Timer
+        timer that accumulates the timings of all beam analyses.
+
+    """
+
+    global _active
+
+    previous = _active
+    _active = Timer(callback)
+
+    try:
+        yield _active
+    finally:
+        _active = previous
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the background map subtraction.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.utils import background
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import synthetic
+
+
+class TestBackground(unittest.TestCase):
+    """Tests for the background map subtraction."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        # Fixed-pattern background: a gradient across the frame
+        y, x = np.mgrid[0:96, 0:128]
+        self.dark_map = 100 + 0.5 * x + 0.25 * y
+
+        z = synthetic.gaussian(128, 96, 30, 20, centerX=60, centerY=50)
+        self.z = z
+        self.raw_data, self.raw_header = synthetic.frame(z + self.dark_map,
+                                                         0.1, nullPoint=100)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_remove_background(self):
+        """`test_remove_background` tests the background map subtraction into
+        a preallocated buffer."""
+
+        out = np.empty((96, 128))
+        raw_data_null = dp.remove_background(self.raw_data, self.raw_header,
+                                             self.dark_map, out=out)
+
+        self.assertTrue(np.shares_memory(raw_data_null.to_numpy(), out))
+        self.assertTrue(np.allclose(raw_data_null, self.z))
+
+        # Without a background map, the null point is subtracted
+        self.assertTrue(np.allclose(
+            dp.remove_background(self.raw_data, self.raw_header),
+            self.z + self.dark_map - 100))
+
+        with self.assertRaises(Exception):
+            dp.remove_background(self.raw_data, self.raw_header,
+                                 self.dark_map[:-1])
+
+    def test_average(self):
+        """`test_average` tests the streaming average of dark frames."""
+
+        rng = np.random.default_rng(0)
+        frames = [self.dark_map + rng.normal(0, 1, self.dark_map.shape)
+                  for _ in range(8)]
+
+        fullPath = os.path.join(self.directory, 'dark_0.npy')
+        background.save(fullPath, frames[0])
+
+        dark_map = background.average(iter([fullPath] + frames[1:]))
+
+        self.assertTrue(np.allclose(dark_map, np.mean(frames, axis=0)))
+
+        with self.assertRaises(Exception):
+            background.average([])
+
+    def test_cache(self):
+        """`test_cache` tests that a background map file is loaded once."""
+
+        fullPath = os.path.join(self.directory, 'dark.npy')
+        background.save(fullPath, self.dark_map)
+
+        cache = background.DarkFrameCache(mmap=True)
+
+        first = cache.get(fullPath)
+        second = cache.get(fullPath)
+
+        self.assertIs(first, second)
+        self.assertIsInstance(first, np.memmap)
+        self.assertFalse(first.flags.writeable)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        cache.clear()
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_beam(self):
+        """`test_beam` tests the beam analysis with a background map."""
+
+        fullPath = os.path.join(self.directory, 'dark.npy')
+        background.save(fullPath, self.dark_map)
+
+        cache = background.DarkFrameCache()
+        beams = [beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                   raw_data=self.raw_data,
+                                   raw_header=self.raw_header,
+                                   dark_frame=fullPath, dark_cache=cache)
+                 for _ in range(2)]
+
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual((beams[0].centerX, beams[0].centerY), (60, 50))
+        self.assertAlmostEqual(beams[0].widthX, 30, delta=0.5)
+        self.assertAlmostEqual(beams[0].widthY, 20, delta=0.5)
+        self.assertAlmostEqual(beams[0].totalPower, self.z.sum(), places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
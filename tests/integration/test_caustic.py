@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the caustic analysis.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.iso import caustic
+from beamprofiler.utils import planes
+from beamprofiler.utils import synthetic
+
+# Caustic of the synthetic beam in millimeter: wavelength, beam waist width on
+# the x- and y-axis, beam waist position, and Rayleigh length
+WAVELENGTH = 1.064e-3
+D0X, D0Y = 0.5, 0.4
+Z0 = 20
+ZR = 140
+
+
+class TestCaustic(unittest.TestCase):
+    """Tests for the caustic analysis."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.fullPath = os.path.join(self.directory, 'caustic.xls')
+
+        # Planes within two Rayleigh lengths of the beam waist, with a null
+        # point and some noise
+        self.z = np.linspace(Z0 - 2 * ZR, Z0 + 2 * ZR, 15)
+        scale = np.sqrt(1 + ((self.z - Z0) / ZR)**2)
+
+        self.planes = []
+        for k, z in enumerate(self.z):
+            profile = synthetic.gaussian(200, 160, D0X * scale[k] / 0.01,
+                                         D0Y * scale[k] / 0.01, peak=4000)
+            profile = synthetic.add_noise(
+                synthetic.add_background(profile, 50), 2, seed=k)
+            self.planes.append(synthetic.frame(profile, 0.01, nullPoint=50)
+                               + (z,))
+
+        planes.save(self.fullPath, self.planes)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fit(self):
+        """`test_fit` tests the fit of an exact caustic."""
+
+        widths = D0X * np.sqrt(1 + ((self.z - Z0) / ZR)**2)
+        result = caustic.fit(self.z, widths, WAVELENGTH)
+
+        theta = D0X / ZR
+        expected = {'waistWidth': D0X, 'waistPosition': Z0,
+                    'divergence': theta, 'rayleighLength': ZR,
+                    'm2': math.pi / (4 * WAVELENGTH) * D0X * theta}
+
+        for key, value in expected.items():
+            self.assertAlmostEqual(result.values[key], value, delta=1e-9 * ZR)
+            self.assertLess(result.errors[key], 1e-9 * ZR)
+
+        with self.assertRaises(Exception):
+            caustic.fit(self.z[:2], widths[:2], WAVELENGTH)
+        with self.assertRaises(Exception):
+            caustic.fit(self.z, -self.z**2, WAVELENGTH)
+
+    def test_widths(self):
+        """`test_widths` tests the beam widths of the planes against the beam
+        analysis."""
+
+        widthX, widthY = caustic.plane_widths(
+            [(raw_data, raw_header) for raw_data, raw_header, z in
+             self.planes])
+
+        stack = np.stack([raw_data.to_numpy() for raw_data, raw_header, z in
+                          self.planes])
+        stackX, stackY = caustic.stack_widths(stack, 0.01, 0.01, 50, chunk=4,
+                                              max_workers=2)
+
+        self.assertTrue(np.allclose(widthX, stackX))
+        self.assertTrue(np.allclose(widthY, stackY))
+
+        raw_data, raw_header, z = self.planes[7]
+        beam = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=raw_data, raw_header=raw_header)
+
+        self.assertAlmostEqual(widthX[7], beam.widthX * beam.xResolution,
+                               delta=0.01 * D0X)
+        self.assertAlmostEqual(widthY[7], beam.widthY * beam.yResolution,
+                               delta=0.01 * D0Y)
+
+    def test_analyze(self):
+        """`test_analyze` tests the caustic analysis of a file with several
+        planes."""
+
+        result = caustic.analyze(self.fullPath, WAVELENGTH, self.z,
+                                 max_workers=4)
+
+        self.assertTrue(np.array_equal(result.z, self.z))
+
+        # The positions of all planes are needed
+        with self.assertRaises(Exception):
+            caustic.analyze(self.fullPath, WAVELENGTH, self.z[:-1])
+
+        for fit, d0 in [(result.x, D0X), (result.y, D0Y)]:
+            theta = d0 / ZR
+            m2 = math.pi / (4 * WAVELENGTH) * d0 * theta
+            errors = fit.errors
+
+            self.assertAlmostEqual(fit.values['waistWidth'], d0,
+                                   delta=0.01 * d0 + 3 * errors['waistWidth'])
+            self.assertAlmostEqual(fit.values['waistPosition'], Z0,
+                                   delta=0.02 * ZR +
+                                   3 * errors['waistPosition'])
+            self.assertAlmostEqual(fit.values['rayleighLength'], ZR,
+                                   delta=0.02 * ZR +
+                                   3 * errors['rayleighLength'])
+            self.assertAlmostEqual(fit.values['m2'], m2,
+                                   delta=0.02 * m2 + 3 * errors['m2'])
+            self.assertGreater(errors['m2'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the defective pixels.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.utils import defects
+from beamprofiler.utils import synthetic
+
+
+class TestDefects(unittest.TestCase):
+    """Tests for the defective pixels."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        z = synthetic.gaussian(128, 96, 30, 20, centerX=60, centerY=50)
+        self.clean = synthetic.add_noise(z, 2, seed=0)
+
+        # Hot pixels, and a dead pixel in the beam
+        self.z = synthetic.add_hot_pixels(self.clean, 10, seed=1)[0]
+        self.z[52, 58] = 0
+        self.defects = self.z != self.clean
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def analyze(self, z, **kwargs):
+        """`analyze` returns the beam analysis of a synthetic profile."""
+
+        raw_data, raw_header = synthetic.frame(z.copy(), 0.1)
+
+        return beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=raw_data, raw_header=raw_header,
+                                 **kwargs)
+
+    def test_local_median(self):
+        """`test_local_median` tests that the local median ignores isolated
+        defective pixels."""
+
+        z = np.ones((5, 6))
+        z[2, 3] = 1000
+        z[0, 0] = -1000
+
+        self.assertTrue(np.array_equal(defects.local_median(z),
+                                       np.ones(z.shape)))
+
+    def test_detect(self):
+        """`test_detect` tests that every defective pixel, and only those, is
+        detected."""
+
+        self.assertTrue(np.array_equal(defects.detect(self.z), self.defects))
+
+        # The peak of a noiseless, narrow beam is not a defective pixel
+        narrow = synthetic.gaussian(32, 32, 6)
+        self.assertFalse(defects.detect(narrow).any())
+
+    def test_correct(self):
+        """`test_correct` tests the correction of the defective pixels."""
+
+        raw_data, _ = synthetic.frame(self.z.copy(), 0.1)
+        corrected = defects.correct(raw_data, self.defects)
+
+        self.assertTrue(np.allclose(corrected.to_numpy()[~self.defects],
+                                    self.clean[~self.defects]))
+        self.assertLess(corrected.to_numpy().max(), 1.05 * self.clean.max())
+        self.assertAlmostEqual(corrected.iloc[52, 58], self.clean[52, 58],
+                               delta=0.05 * self.clean.max())
+
+        with self.assertRaises(Exception):
+            defects.correct(raw_data, self.defects[:-1])
+
+    def test_beam(self):
+        """`test_beam` tests the beam analysis with a persistent bad-pixel
+        mask and with detected defective pixels."""
+
+        fullPath = os.path.join(self.directory, 'mask.npy')
+        defects.save(fullPath, self.defects)
+
+        reference = self.analyze(self.clean)
+        raw = self.analyze(self.z)
+        masked = self.analyze(self.z, bad_pixels=fullPath)
+        detected = self.analyze(self.z, detect_defects=True)
+
+        self.assertGreater(raw.maxPowerDensity,
+                           1.5 * reference.maxPowerDensity)
+
+        for beam in [masked, detected]:
+            self.assertTrue(np.array_equal(beam.badPixels, self.defects))
+            self.assertAlmostEqual(beam.maxPowerDensity,
+                                   reference.maxPowerDensity,
+                                   delta=0.05 * reference.maxPowerDensity)
+            self.assertAlmostEqual(beam.widthX, reference.widthX, delta=0.5)
+            self.assertAlmostEqual(beam.widthY, reference.widthY, delta=0.5)
+
+        self.assertIsNone(reference.badPixels)
+
+
+if __name__ == '__main__':
+    unittest.main()
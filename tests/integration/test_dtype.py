@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the storage type of the power density distribution.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import unittest
+
+import numpy as np
+import pkg_resources
+
+import beamprofiler
+from beamprofiler.iso import measured_quantities as mq
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import synthetic
+
+# Results compared between the storage types
+FIELDS = ['maxPowerDensity', 'totalPower', 'power_eta', 'centerX', 'centerY',
+          'widthX', 'widthY', 'widthMajor', 'widthMinor',
+          'irradiationArea_eta', 'topHatFactor', 'diameter86']
+
+
+class TestDtype(unittest.TestCase):
+    """Tests for the storage type of the power density distribution."""
+
+    def setUp(self):
+        self.path = pkg_resources.resource_filename(__name__, "fixtures")
+        self.fileName = 'gaussian_beam.xls'
+        self.reference = beamprofiler.Beam(self.path, self.fileName, 0.8, 0.1,
+                                           1)
+
+    def test_corrected_dtype(self):
+        """`test_corrected_dtype` tests the type of the noise-corrected
+        power density distribution."""
+
+        for storage, corrected in [(np.float64, np.float64),
+                                   (np.float32, np.float32),
+                                   (np.uint16, np.float32),
+                                   (np.int16, np.float32),
+                                   (np.int32, np.float64),
+                                   (np.int64, np.float64)]:
+            self.assertEqual(dp.corrected_dtype(storage), corrected)
+
+    def test_remove_background(self):
+        """`test_remove_background` tests that unsigned counts below the
+        null point do not wrap around."""
+
+        raw_data, raw_header = synthetic.frame(
+            np.array([[90, 100], [110, 65535]]), 0.1, nullPoint=100,
+            dtype=np.uint16)
+
+        raw_data_null = dp.remove_background(raw_data, raw_header)
+
+        self.assertEqual(raw_data_null.dtypes.unique().tolist(), [np.float32])
+        self.assertEqual(raw_data_null.to_numpy().tolist(),
+                         [[-10, 0], [10, 65435]])
+
+    def test_reductions(self):
+        """`test_reductions` tests that single-precision data is accumulated
+        in float64."""
+
+        z = np.full((1024, 1024), 0.1, dtype=np.float32)
+        raw_data, raw_header = synthetic.frame(z, 0.1)
+
+        expected = 1024 * 1024 * np.float64(np.float32(0.1))
+        self.assertEqual(mq.total_power(raw_data), expected)
+        self.assertAlmostEqual(dp.raw_moments(raw_data, raw_header)['m_11'],
+                               np.float64(np.float32(0.1)) *
+                               (1022 * 1023 / 2)**2, delta=1e-3)
+
+    def test_beam(self):
+        """`test_beam` tests the beam analysis for every storage type."""
+
+        for dtype, corrected in [('float32', np.float32),
+                                 ('uint16', np.float32),
+                                 ('int32', np.int32)]:
+            beam = beamprofiler.Beam(self.path, self.fileName, 0.8, 0.1, 1,
+                                     dtype=dtype)
+
+            self.assertEqual(beam.raw_data.dtypes.unique().tolist(),
+                             [np.dtype(dtype)])
+            self.assertEqual(beam.raw_data_null.dtypes.unique().tolist(),
+                             [corrected])
+
+            for field in FIELDS:
+                self.assertTrue(np.isclose(getattr(beam, field),
+                                           getattr(self.reference, field),
+                                           rtol=1e-6),
+                                msg=(dtype, field))
+
+    def test_in_place(self):
+        """`test_in_place` tests the in-place correction of 16-bit counts."""
+
+        fullPath = os.path.join(self.path, self.fileName)
+        beam = beamprofiler.Beam(self.path, self.fileName, 0.8, 0.1, 1,
+                                 raw_data=dp.raw_data(fullPath, np.uint16),
+                                 raw_header=dp.raw_header(fullPath),
+                                 in_place=True)
+
+        self.assertEqual(beam.raw_data_null.dtypes.unique().tolist(),
+                         [np.float32])
+        self.assertEqual(beam.totalPower, self.reference.totalPower)
+        self.assertEqual(beam.topHatFactor, self.reference.topHatFactor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the numerical equivalence of the reference and the optimized
+backends.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+import pkg_resources
+
+import beamprofiler
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import equivalence, synthetic
+
+
+class TestEquivalence(unittest.TestCase):
+    """Tests for the numerical equivalence of the backends."""
+
+    def test_fixtures(self):
+        """`test_fixtures` tests both backends on the fixtures."""
+
+        path = pkg_resources.resource_filename(__name__, "fixtures")
+        frames = []
+
+        for fileName in ['gaussian_beam', 'square_beam', 'lab_beam']:
+            fullPath = os.path.join(path, fileName + '.xls')
+            frames.append((dp.raw_data(fullPath), dp.raw_header(fullPath)))
+
+        report = equivalence.check(frames, 0.8, 0.1)
+
+        self.assertEqual(set(report), set(equivalence.TOLERANCES))
+
+    def test_random(self):
+        """`test_random` tests both backends on randomized synthetic
+        frames."""
+
+        rng = np.random.default_rng(34)
+        shapes = [synthetic.gaussian, synthetic.super_gaussian,
+                  synthetic.top_hat]
+        frames = []
+
+        for i in range(6):
+            size = int(rng.integers(48, 96))
+            profile = shapes[i % len(shapes)]
+            z = profile(size, size,
+                        rng.uniform(0.2, 0.6) * size,
+                        rng.uniform(0.2, 0.6) * size,
+                        centerX=rng.uniform(0.4, 0.6) * size,
+                        centerY=rng.uniform(0.4, 0.6) * size,
+                        angle=rng.uniform(0, 90))
+            z = synthetic.add_noise(synthetic.add_background(z, 100), 5,
+                                    seed=i)
+
+            # Integer ADC values on odd frames, floating point on even frames
+            if i % 2:
+                z = np.round(z)
+
+            frames.append(synthetic.frame(z, 0.1, nullPoint=100))
+
+        report = equivalence.check(frames, 0.8, 0.1)
+
+        self.assertTrue(all(entry['passed'] for entry in report.values()))
+
+    def test_failure(self):
+        """`test_failure` tests that deviations beyond the tolerances fail."""
+
+        raw_data, raw_header = synthetic.frame(
+            synthetic.gaussian(32, 32, 12), 0.1)
+
+        tolerances = dict(equivalence.TOLERANCES, m_00=(-1, -1))
+
+        with self.assertRaises(Exception):
+            equivalence.check([(raw_data, raw_header)], 0.8, 0.1, tolerances)
+
+        # The moments used by `Beam` are checked, down to the mixed moment
+        def raw_moments(raw_data, raw_header):
+            moments = dp.raw_moments(raw_data, raw_header)
+            moments['m_11'] *= 1 + 1e-6
+            return moments
+
+        with mock.patch.object(equivalence.BACKENDS['optimized'],
+                               'raw_moments', raw_moments):
+            report = equivalence.compare([(raw_data, raw_header)], 0.8, 0.1)
+
+        self.assertFalse(report['raw_m_11']['passed'])
+        self.assertTrue(report['raw_m_00']['passed'])
+
+    def test_non_square(self):
+        """`test_non_square` tests the beam analysis of a non-square frame,
+        which is not supported by the reference backend."""
+
+        z = synthetic.gaussian(96, 64, 30, 20, centerX=50, centerY=30)
+        raw_data, raw_header = synthetic.frame(z, 0.1)
+
+        beam = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=raw_data, raw_header=raw_header)
+
+        self.assertEqual((beam.centerX, beam.centerY), (50, 30))
+        self.assertAlmostEqual(beam.widthX, 30, places=3)
+        self.assertAlmostEqual(beam.widthY, 20, places=3)
+        self.assertTrue(np.isfinite(beam.beamUniformity_eta))
+
+
+if __name__ == '__main__':
+    unittest.main()
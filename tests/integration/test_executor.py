@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the multiprocess beam analysis.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import unittest
+
+import pkg_resources
+
+import beamprofiler
+from beamprofiler import executor
+from beamprofiler.utils import data_processing as dp
+
+
+class TestExecutor(unittest.TestCase):
+    """Tests for the shared memory executor."""
+
+    def setUp(self):
+        """`setUp` sets up the test fixtures."""
+
+        self.path = pkg_resources.resource_filename(__name__, "fixtures")
+        self.fileNames = ['gaussian_beam.xls', 'lab_beam.xls']
+        self.frames = [
+            (dp.raw_data(os.path.join(self.path, fileName)),
+             dp.raw_header(os.path.join(self.path, fileName)),
+             self.path,
+             fileName)
+            for fileName in self.fileNames
+        ]
+
+    def test_map(self):
+        """`test_map` tests that the results match the serial analysis and
+        that every shared memory block is released."""
+
+        with executor.Executor(0.8, 0.1, 1, max_workers=2) as ex:
+            results = list(ex.map(self.frames))
+
+        self.assertEqual(ex.max_workers, 2)
+        self.assertEqual(ex.blocks, {})
+
+        for result, fileName in zip(results, self.fileNames):
+            expected = beamprofiler.analyze(self.path, fileName, 0.8, 0.1, 1)
+
+            self.assertEqual(result.fileName, fileName)
+            self.assertAlmostEqual(result.totalPower, expected.totalPower)
+            self.assertAlmostEqual(result.widthX, expected.widthX)
+            self.assertAlmostEqual(result.topHatFactor, expected.topHatFactor)
+
+    def test_share(self):
+        """`test_share` tests that the workers see the shared data."""
+
+        raw_data, raw_header, path, fileName = self.frames[1]
+        shm, frame = executor.share(raw_data, raw_header, path, fileName)
+
+        try:
+            view_shm, view = executor.attach(frame)
+            self.assertTrue((view == raw_data.to_numpy()).all())
+            self.assertEqual(frame.header[17], dp.get_nullPoint(raw_header))
+            del view
+            view_shm.close()
+        finally:
+            executor.release(shm)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the power density distributions stored in images.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+import beamprofiler
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import image
+from beamprofiler.utils import synthetic
+
+
+class TestImage(unittest.TestCase):
+    """Tests for the power density distributions stored in images."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        z = synthetic.gaussian(160, 120, 40, 30, centerX=70, centerY=60,
+                               peak=40000)
+        z = np.rint(synthetic.add_background(z, 64))
+        self.raw_data, self.raw_header = synthetic.frame(z, 0.0055,
+                                                         nullPoint=64)
+
+        for fileName in ['beam.xls', 'beam.png', 'beam.tif']:
+            synthetic.save(os.path.join(self.directory, fileName),
+                           self.raw_data, self.raw_header)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read(self):
+        """`test_read` tests the decoding of 16-bit images."""
+
+        for fileName in ['beam.png', 'beam.tif']:
+            fullPath = os.path.join(self.directory, fileName)
+            raw_data_np = image.read(fullPath)
+
+            self.assertEqual(raw_data_np.dtype, np.uint16)
+            self.assertTrue(np.array_equal(raw_data_np, self.raw_data))
+            self.assertEqual(image.read(fullPath, np.float32).dtype,
+                             np.float32)
+
+        # Colour images are not power density distributions
+        fullPath = os.path.join(self.directory, 'colour.png')
+        Image.new('RGB', (4, 2)).save(fullPath)
+        with self.assertRaises(Exception):
+            image.read(fullPath)
+
+    def test_header(self):
+        """`test_header` tests the pixel pitch and null point given as
+        parameters or by the sidecar header."""
+
+        fullPath = os.path.join(self.directory, 'beam.png')
+
+        # Sidecar header written with the image
+        raw_header = dp.raw_header(fullPath)
+        self.assertEqual((dp.get_xPixel(raw_header),
+                          dp.get_yPixel(raw_header)), (160, 120))
+        self.assertAlmostEqual(dp.get_xResolution(raw_header), 0.0055)
+        self.assertEqual(dp.get_nullPoint(raw_header), 64)
+
+        # Parameters take precedence over the sidecar header
+        raw_header = image.header(fullPath, (0.01, 0.02), 10)
+        self.assertAlmostEqual(dp.get_xResolution(raw_header), 0.01)
+        self.assertAlmostEqual(dp.get_yResolution(raw_header), 0.02)
+        self.assertEqual(dp.get_nullPoint(raw_header), 10)
+
+        # Pixel pitch in the sidecar header
+        with open(os.path.join(self.directory, 'beam.hdr'), 'w') as f:
+            f.write("Pixel Pitch = 0.004\n")
+        raw_header = image.header(fullPath)
+        self.assertAlmostEqual(dp.get_yResolution(raw_header), 0.004)
+        self.assertEqual(dp.get_nullPoint(raw_header), 0)
+
+        # Without the sidecar header, the pixel pitch is required
+        os.remove(os.path.join(self.directory, 'beam.hdr'))
+        self.assertAlmostEqual(
+            dp.get_xWindow(image.header(fullPath, 0.01)), 1.6)
+        with self.assertRaises(Exception):
+            image.header(fullPath)
+
+        with self.assertRaises(Exception):
+            dp.raw_data(os.path.join(self.directory, 'beam.bmp'))
+
+    def test_beam(self):
+        """`test_beam` tests that the beam analysis of the images equals that
+        of the text file."""
+
+        text = beamprofiler.Beam(self.directory, 'beam.xls', 0.8, 0.1, 1)
+        png = beamprofiler.Beam(self.directory, 'beam.png', 0.8, 0.1, 1)
+
+        raw_data, raw_header = image.load(
+            os.path.join(self.directory, 'beam.tif'), 0.0055, 64)
+        tif = beamprofiler.Beam(self.directory, 'beam.tif', 0.8, 0.1, 1,
+                                raw_data=raw_data, raw_header=raw_header,
+                                in_place=True)
+
+        for beam in [png, tif]:
+            self.assertEqual((beam.centerX, beam.centerY), (70, 60))
+            self.assertEqual(beam.totalPower, text.totalPower)
+            self.assertAlmostEqual(beam.widthX, text.widthX, places=6)
+            self.assertAlmostEqual(beam.xResolution, text.xResolution)
+            self.assertEqual(beam.topHatFactor, text.topHatFactor)
+
+
+if __name__ == '__main__':
+    unittest.main()
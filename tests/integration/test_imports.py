@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the import time of the package.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import subprocess
+import sys
+import unittest
+
+import beamprofiler
+
+# Modules that must not be imported by `import beamprofiler`, which is the
+# regression guard of the lazy imports, see `test_lazy`
+HEAVY = ['matplotlib', 'scipy', 'sklearn', 'xlsxwriter', 'PIL']
+
+# Loose budget of the import time of the package in seconds, excluding numpy
+# and pandas, as a secondary check only: it depends on the machine, and may
+# not catch an eager import of the heavy dependencies on a fast one
+BUDGET = 0.6
+
+
+def run(code):
+    """`run` runs `code` in a fresh interpreter and returns the result."""
+
+    # Make sure the fresh interpreter imports the same package
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(beamprofiler.__file__))] +
+        [p for p in [env.get('PYTHONPATH')] if p])
+
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          env=env, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, universal_newlines=True,
+                          check=True)
+
+
+def cumulative(stderr, module):
+    """`cumulative` returns the cumulative import time of `module` in seconds
+    from the output of `-X importtime`."""
+
+    for line in stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+
+    return 0.0
+
+
+class TestImports(unittest.TestCase):
+    """Tests for the import time of the package."""
+
+    def test_lazy(self):
+        """`test_lazy` tests that none of the heavy dependencies is in
+        `sys.modules` after `import beamprofiler` in a fresh interpreter, and
+        that they are imported on first use."""
+
+        code = ("import sys, beamprofiler; "
+                "print(' '.join(m for m in %r if m in sys.modules)); "
+                "beamprofiler.utils.plot, beamprofiler.utils.report; "
+                "print('matplotlib' in sys.modules)" % HEAVY)
+        lines = run(code).stdout.splitlines()
+
+        self.assertEqual(lines[0].split(), [])
+        self.assertEqual(lines[1], 'True')
+
+    def test_python36(self):
+        """`test_python36` tests that the modules are imported eagerly on
+        Python 3.6, which does not support the module `__getattr__`."""
+
+        code = ("import sys, numpy, pandas; sys.version_info = (3, 6, 15); "
+                "import beamprofiler; "
+                "print(sorted(set(beamprofiler.utils._LAZY) - "
+                "set(vars(beamprofiler.utils))))")
+
+        self.assertEqual(run(code).stdout.strip(), '[]')
+
+    def test_import_time(self):
+        """`test_import_time` tests the import time of the package against
+        the loose budget, in addition to `test_lazy`."""
+
+        # Best of three, to reduce the noise of a busy machine
+        best = min(
+            cumulative(stderr, 'beamprofiler') -
+            cumulative(stderr, 'pandas') -
+            cumulative(stderr, 'numpy')
+            for stderr in (run('import beamprofiler').stderr
+                           for i in range(3)))
+
+        self.assertLess(best, BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the in-place background correction.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+import pkg_resources
+
+import beamprofiler
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import synthetic
+
+# Results compared between the default and the in-place correction
+FIELDS = ['maxPowerDensity', 'totalPower', 'centerX', 'centerY', 'widthX',
+          'widthY', 'irradiationArea_eta', 'topHatFactor', 'diameter86']
+
+
+class TestInPlace(unittest.TestCase):
+    """Tests for the in-place background correction."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertSameResults(self, beam, reference):
+        """`assertSameResults` compares the results of two beams."""
+
+        for field in FIELDS:
+            self.assertEqual(getattr(beam, field), getattr(reference, field),
+                             msg=field)
+
+    def test_fixture(self):
+        """`test_fixture` tests that the in-place correction gives the same
+        results and shares the buffer of the power density distribution."""
+
+        path = pkg_resources.resource_filename(__name__, "fixtures")
+        fullPath = os.path.join(path, 'gaussian_beam.xls')
+
+        reference = beamprofiler.Beam(path, 'gaussian_beam.xls', 0.8, 0.1, 1)
+
+        raw_data = dp.raw_data(fullPath).astype(np.float64)
+        buffer = raw_data.to_numpy()
+        beam = beamprofiler.Beam(path, 'gaussian_beam.xls', 0.8, 0.1, 1,
+                                 raw_data=raw_data,
+                                 raw_header=dp.raw_header(fullPath),
+                                 in_place=True)
+
+        self.assertSameResults(beam, reference)
+        self.assertIsNone(beam.raw_data)
+        self.assertTrue(np.shares_memory(beam.raw_data_null.to_numpy(),
+                                         buffer))
+        self.assertTrue(np.array_equal(beam.uncorrected(),
+                                       reference.raw_data))
+
+    def test_memmap(self):
+        """`test_memmap` tests that read-only memory-mapped data is copied
+        on write and left unchanged."""
+
+        z = synthetic.gaussian(64, 48, 20, 16, peak=4000)
+        z = np.rint(synthetic.add_background(z, 100))
+        raw_data, raw_header = synthetic.frame(z, 0.1, nullPoint=100)
+
+        fullPath = os.path.join(self.directory, 'frame.npy')
+        np.save(fullPath, z)
+        z_map = np.load(fullPath, mmap_mode='r')
+
+        beam = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=pd.DataFrame(z_map, copy=False),
+                                 raw_header=raw_header, in_place=True)
+        reference = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                      raw_data=raw_data,
+                                      raw_header=raw_header)
+
+        self.assertSameResults(beam, reference)
+        self.assertTrue(np.array_equal(z_map, z))
+
+    def test_dark_map(self):
+        """`test_dark_map` tests the in-place correction with a background
+        map and a ROI."""
+
+        y, x = np.mgrid[0:48, 0:64]
+        dark_map = 100 + 0.3 * x + 0.7 * y
+
+        z = np.rint(synthetic.gaussian(64, 48, 20, 16, peak=4000) + dark_map)
+        raw_data, raw_header = synthetic.frame(z, 0.1, nullPoint=100)
+
+        kwargs = {'raw_header': raw_header, 'dark_frame': dark_map,
+                  'roi': (8, 56, 4, 44)}
+        reference = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                      raw_data=raw_data.copy(), **kwargs)
+        beam = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=raw_data, in_place=True, **kwargs)
+
+        # The power density distribution given by the user was corrected
+        self.assertSameResults(beam, reference)
+        self.assertTrue(np.shares_memory(beam.raw_data_null.to_numpy(), z))
+        self.assertTrue(np.allclose(beam.uncorrected(), reference.raw_data))
+
+    def test_dtype(self):
+        """`test_dtype` tests the type of the in-place buffer, which is that
+        of `corrected_dtype`: writable float32 data is corrected in place,
+        and 16-bit ADC counts are copied once into float32."""
+
+        z = synthetic.gaussian(64, 48, 20, 16, peak=4000)
+        z = np.rint(synthetic.add_background(z, 100))
+        raw_data, raw_header = synthetic.frame(z, 0.1, nullPoint=100)
+
+        for dtype, shared in [(np.float32, True), (np.uint16, False)]:
+            z_typed = z.astype(dtype)
+            beam = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                     raw_data=pd.DataFrame(z_typed,
+                                                           copy=False),
+                                     raw_header=raw_header, in_place=True)
+
+            buffer = beam.raw_data_null.to_numpy()
+            self.assertEqual(buffer.dtype, np.float32)
+            self.assertEqual(np.shares_memory(buffer, z_typed), shared)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the iterative beam width.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import unittest
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.iso import characterizing_parameters as iso_cp
+from beamprofiler.utils import synthetic
+from beamprofiler.utils.summed_area import MomentTable
+
+
+class TestIterativeWidth(unittest.TestCase):
+    """Tests for the iterative beam width."""
+
+    def analyze(self, raw_data, raw_header, **kwargs):
+        """`analyze` returns the beam analysis of a synthetic profile."""
+
+        return beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=raw_data, raw_header=raw_header,
+                                 **kwargs)
+
+    def test_moment_table(self):
+        """`test_moment_table` tests the windowed moments against a full
+        scan of the window."""
+
+        z = synthetic.add_noise(synthetic.gaussian(60, 40, 20), 5, seed=0)
+        table = MomentTable(z)
+
+        moments = table.moments(7, 19, 4, 19)
+
+        y, x = np.mgrid[4:19, 7:19]
+        window = z[4:19, 7:19]
+
+        for key, weight in [('m_00', 1), ('m_10', x), ('m_01', y),
+                            ('m_20', x * x), ('m_02', y * y),
+                            ('m_11', x * y)]:
+            self.assertAlmostEqual(moments[key], np.sum(window * weight),
+                                   places=6)
+
+        # The window is clipped to the frame
+        self.assertAlmostEqual(table.moments(-5, 100, -5, 100)['m_00'],
+                               z.sum())
+
+    def test_noise(self):
+        """`test_noise` tests the beam width of a noisy Gaussian profile, for
+        which the moments of the full frame are inflated by the noise."""
+
+        z = synthetic.gaussian(256, 256, 40, 30, centerX=100, centerY=140)
+        z = synthetic.add_noise(synthetic.add_background(z, 100), 20, seed=0)
+        raw_data, raw_header = synthetic.frame(z, 0.1, nullPoint=100)
+
+        full = self.analyze(raw_data, raw_header)
+        beam = self.analyze(raw_data, raw_header, width_mode='iterative')
+
+        self.assertEqual((beam.centerX, beam.centerY), (100, 140))
+        self.assertAlmostEqual(beam.widthX, 40, delta=2)
+        self.assertAlmostEqual(beam.widthY, 30, delta=2)
+        self.assertGreater(abs(full.widthY - 30), 10)
+
+    def test_noiseless(self):
+        """`test_noiseless` tests that the iteration does not change the
+        beam width of a noiseless Gaussian profile."""
+
+        z = synthetic.gaussian(256, 256, 40, 30, centerX=100, centerY=140)
+        raw_data, raw_header = synthetic.frame(z, 0.1)
+
+        moments = iso_cp.iterative_moments(raw_data, window_factor=4)
+        beam = self.analyze(raw_data, raw_header, width_mode='iterative',
+                            window_factor=4, tolerance=1e-6)
+
+        self.assertAlmostEqual(beam.widthX, 40, places=2)
+        self.assertAlmostEqual(beam.widthY, 30, places=2)
+        self.assertLess(moments['m_00'], np.sum(z))
+
+    def test_width_mode(self):
+        """`test_width_mode` tests that an unknown width mode fails."""
+
+        raw_data, raw_header = synthetic.frame(
+            synthetic.gaussian(32, 32, 12), 0.1)
+
+        with self.assertRaises(Exception):
+            self.analyze(raw_data, raw_header, width_mode='unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the power density distribution files with several planes.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import planes
+from beamprofiler.utils import synthetic
+
+
+class TestPlanes(unittest.TestCase):
+    """Tests for the power density distribution files with several planes."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.fullPath = os.path.join(self.directory, 'caustic.xls')
+
+        # Beams of growing width along the z-axis
+        self.planes = []
+        for k, width in enumerate([20, 24, 28, 32]):
+            z = np.rint(synthetic.gaussian(96, 80, width, peak=1000))
+            raw_data, raw_header = synthetic.frame(z, 0.01)
+            self.planes.append((raw_data, raw_header, 10 * k))
+
+        planes.save(self.fullPath, self.planes)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_scan(self):
+        """`test_scan` tests the index of the planes."""
+
+        with planes.scan(self.fullPath) as index:
+            self.assertEqual(len(index), 4)
+
+            for k, (raw_data, raw_header, plane) in enumerate(self.planes):
+                self.assertTrue(np.array_equal(index.raw_data(k), raw_data))
+                self.assertEqual(dp.get_xPixel(index.raw_header(k)), 96)
+                self.assertEqual(index.plane(k), plane)
+
+            self.assertTrue(np.array_equal(index[-1][0],
+                                           self.planes[-1][0]))
+            with self.assertRaises(IndexError):
+                index.raw_data(4)
+
+        # The plain reader returns the first plane
+        self.assertTrue(np.array_equal(dp.raw_data(self.fullPath),
+                                       self.planes[0][0]))
+
+        with open(os.path.join(self.directory, 'empty.csv'), 'w') as f:
+            f.write("1,2\n3,4\n")
+        with self.assertRaises(Exception):
+            planes.scan(os.path.join(self.directory, 'empty.csv'))
+
+    def test_lazy(self):
+        """`test_lazy` tests that scanning the file does not parse the
+        planes."""
+
+        fullPath = os.path.join(self.directory, 'large.xls')
+        planes.save(fullPath, self.planes * 16)
+
+        start = time.perf_counter()
+        index = planes.scan(fullPath)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(index), 64)
+        self.assertEqual(index._headers, {})
+        self.assertLess(elapsed, 0.05)
+        index.close()
+
+    def test_beam(self):
+        """`test_beam` tests the beam analysis of a single plane."""
+
+        with planes.scan(self.fullPath) as index:
+            raw_data, raw_header = index[2]
+
+        beam = beamprofiler.Beam(self.directory, 'caustic.xls', 0.8, 0.1, 1,
+                                 raw_data=raw_data, raw_header=raw_header)
+
+        self.assertAlmostEqual(beam.widthX, 28, delta=0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
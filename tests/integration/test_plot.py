@@ -6,6 +6,7 @@ import os
 # =============================================================================
 # Imports
 # =============================================================================
+import tempfile
 import unittest
 
 import pkg_resources
@@ -38,44 +39,109 @@ class TestPlot(TestFile):
             beamprofiler.beam.Beam(self.path, self.fileName, self.eta,
                                    self.epsilon, self.mix)
         )
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """`tearDown` removes the temporary directory."""
+
+        self.tmp.cleanup()
         
     def test_histogram(self):
         """`test_histogram` tests the histogram plot generation."""
 
-        beamprofiler.utils.plot.histogram(self.path, self.fileName, self.beam)
+        beamprofiler.utils.plot.histogram(self.tmp.name, self.fileName,
+                                          self.beam)
         self.assertIsFile(
-            os.path.join(self.path,
+            os.path.join(self.tmp.name,
                          os.path.splitext(self.fileName)[0] +
                          " - histogram.png"))
         
     def test_heatmap2D(self):
         """`test_heatmap2D` tests the 2D heatmap plot generation."""
 
-        beamprofiler.utils.plot.heat_map_2d(self.path, self.fileName, self.beam)
+        beamprofiler.utils.plot.heat_map_2d(self.tmp.name, self.fileName,
+                                            self.beam)
         self.assertIsFile(
-            os.path.join(self.path,
+            os.path.join(self.tmp.name,
                          os.path.splitext(self.fileName)[0] +
                          " - 2d heat map.png"))
         
     def test_heatmap3D(self):
         """`test_heatmap2D` tests the 2D heatmap plot generation."""
 
-        beamprofiler.utils.plot.heat_map_3d(self.path, self.fileName, self.beam)
+        beamprofiler.utils.plot.heat_map_3d(self.tmp.name, self.fileName,
+                                            self.beam)
         self.assertIsFile(
-            os.path.join(self.path,
+            os.path.join(self.tmp.name,
                          os.path.splitext(self.fileName)[0] +
                          " - 3d heat map.png"))
 
     def test_normEnergyCurve(self):
         """`test_heatmap2D` tests the 2D heatmap plot generation."""
 
-        beamprofiler.utils.plot.norm_energy_curve(self.path, self.fileName,
-                                                  self.beam)
+        beamprofiler.utils.plot.norm_energy_curve(self.tmp.name,
+                                                  self.fileName, self.beam)
         self.assertIsFile(
-            os.path.join(self.path,
+            os.path.join(self.tmp.name,
                          os.path.splitext(self.fileName)[0] +
-                         " - 3d heat map.png"))        
-        
+                         " - energy curve.png"))        
+
+
+class TestPlotCache(TestFile):
+    """Tests for the plot cache."""
+
+    def setUp(self):
+        """`setUp` sets up the test fixtures."""
+
+        self.path = pkg_resources.resource_filename(__name__, "fixtures")
+        self.fileName = 'lab_beam.xls'
+        self.beam = (
+            beamprofiler.beam.Beam(self.path, self.fileName, 0.8, 0.1, 1)
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = beamprofiler.utils.plot.PlotCache(
+            os.path.join(self.tmp.name, 'cache'), max_entries=1)
+
+    def tearDown(self):
+        """`tearDown` removes the temporary directory."""
+
+        self.tmp.cleanup()
+
+    def test_hit(self):
+        """`test_hit` tests that an unchanged graph is taken from the cache."""
+
+        for i in range(2):
+            beamprofiler.utils.plot.heat_map_2d(self.tmp.name, self.fileName,
+                                                self.beam, cache=self.cache)
+
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertIsFile(os.path.join(self.tmp.name,
+                                       "lab_beam - 2d heat map.png"))
+
+    def test_options(self):
+        """`test_options` tests that changed options miss the cache."""
+
+        beamprofiler.utils.plot.heat_map_2d(self.tmp.name, self.fileName,
+                                            self.beam, cache=self.cache)
+        beamprofiler.utils.plot.heat_map_2d(self.tmp.name, self.fileName,
+                                            self.beam, cache=self.cache,
+                                            z_lim=2500)
+
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_lru(self):
+        """`test_lru` tests that the cache does not exceed its size."""
+
+        beamprofiler.utils.plot.heat_map_2d(self.tmp.name, self.fileName,
+                                            self.beam, cache=self.cache)
+        beamprofiler.utils.plot.norm_energy_curve(self.tmp.name,
+                                                  self.fileName, self.beam,
+                                                  cache=self.cache)
+
+        self.assertEqual(len(os.listdir(self.cache.directory)), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
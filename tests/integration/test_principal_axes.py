@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the principal-axis beam widths.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import unittest
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.iso import characterizing_parameters as iso_cp
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import synthetic
+
+
+class TestPrincipalAxes(unittest.TestCase):
+    """Tests for the principal-axis beam widths."""
+
+    def analyze(self, z, xResolution, yResolution):
+        """`analyze` returns the beam analysis of a synthetic profile."""
+
+        raw_data, raw_header = synthetic.frame(z, xResolution, yResolution)
+
+        return beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=raw_data, raw_header=raw_header)
+
+    def test_raw_moments(self):
+        """`test_raw_moments` tests the single-pass moments against
+        `image_moments`."""
+
+        z = synthetic.add_noise(synthetic.gaussian(50, 40, 20, 10, angle=20),
+                                5, seed=0)
+        raw_data, raw_header = synthetic.frame(z, 0.1)
+
+        moments = dp.raw_moments(raw_data.T, raw_header)
+
+        for p, q in [(0, 0), (1, 0), (0, 1), (2, 0), (0, 2), (1, 1)]:
+            self.assertAlmostEqual(
+                moments['m_%d%d' % (p, q)],
+                dp.image_moments(raw_data.T, raw_header, p, q, 0, 0),
+                delta=1e-9 * abs(moments['m_%d%d' % (p, q)]))
+
+    def test_rotated(self):
+        """`test_rotated` tests a rotated elliptical Gaussian profile."""
+
+        for angle in [-60, 0, 30, 90]:
+            beam = self.analyze(
+                synthetic.gaussian(256, 256, 80, 40, angle=angle), 0.1, 0.1)
+
+            self.assertAlmostEqual(beam.widthMajor, 8.0, places=3)
+            self.assertAlmostEqual(beam.widthMinor, 4.0, places=3)
+            self.assertAlmostEqual(beam.azimuth, angle, places=2)
+            self.assertAlmostEqual(beam.ellipticity, 0.5, places=3)
+
+    def test_resolution(self):
+        """`test_resolution` tests a circular beam sampled with different
+        pixel resolutions on the x- and y-axis."""
+
+        # 5 mm 1/e² diameter: 50 pixels on the x-axis and 25 on the y-axis
+        beam = self.analyze(synthetic.gaussian(256, 128, 50, 25), 0.1, 0.2)
+
+        self.assertAlmostEqual(beam.widthMajor, 5.0, places=3)
+        self.assertAlmostEqual(beam.widthMinor, 5.0, places=3)
+        self.assertAlmostEqual(beam.ellipticity, 1.0, places=3)
+        self.assertEqual(beam.result().ellipticity, beam.ellipticity)
+        self.assertFalse(np.isnan(beam.azimuth))
+
+    def test_degenerate(self):
+        """`test_degenerate` tests the principal-axis widths and the
+        ellipticity of a single-pixel beam and of a power density
+        distribution without power."""
+
+        z = np.zeros((40, 50))
+        z[20, 25] = 1000
+
+        for factor, widths in [(1, (0, 0, 0)), (0, (-1, -1, 0))]:
+            raw_data, raw_header = synthetic.frame(z * factor, 0.1)
+            moments = dp.raw_moments(raw_data.T, raw_header)
+            d_major, d_minor, azimuth = iso_cp.principal_widths(moments, 0.1,
+                                                                0.1)
+
+            self.assertEqual((d_major, d_minor, azimuth), widths)
+            self.assertTrue(np.isnan(iso_cp.ellipticity(d_major, d_minor)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the multi-resolution pyramid and the progressive analysis.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.iso import characterizing_parameters as iso_cp
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import pyramid
+from beamprofiler.utils import synthetic
+
+
+class TestPyramid(unittest.TestCase):
+    """Tests for the multi-resolution pyramid and the progressive analysis."""
+
+    def setUp(self):
+        z = synthetic.gaussian(300, 257, 60, 40, centerX=140, centerY=120)
+        self.raw_data, self.raw_header = synthetic.frame(z, 0.05)
+        self.beam = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                      raw_data=self.raw_data,
+                                      raw_header=self.raw_header)
+
+    def test_downsample(self):
+        """`test_downsample` tests that the block sums preserve the power,
+        including an odd last row and column."""
+
+        z = np.arange(35, dtype=np.float64).reshape(5, 7)
+        down = pyramid.downsample(z)
+
+        self.assertEqual(down.shape, (3, 4))
+        self.assertEqual(down[0, 0], 0 + 1 + 7 + 8)
+        self.assertEqual(down[2, 3], 34)
+        self.assertEqual(down.sum(), z.sum())
+
+    def test_levels(self):
+        """`test_levels` tests the levels of the pyramid of a beam."""
+
+        levels = self.beam.pyramid.levels
+
+        self.assertIs(self.beam.pyramid, self.beam.pyramid)
+        self.assertEqual([level.shape for level in levels],
+                         [(257, 300), (129, 150), (65, 75), (33, 38),
+                          (17, 19)])
+
+        for level in levels:
+            self.assertAlmostEqual(level.sum(), levels[0].sum(), places=6)
+
+    def test_progressive(self):
+        """`test_progressive` tests that the progressive analysis converges
+        to the full-resolution results of the beam."""
+
+        estimates = list(pyramid.progressive(self.raw_data, self.raw_header,
+                                             0.8))
+
+        self.assertEqual([e.level for e in estimates], [4, 3, 2, 1, 0])
+        self.assertEqual(estimates[0].xResolution, 0.8)
+
+        full = estimates[-1].values
+        r = 0.05
+
+        self.assertAlmostEqual(full['centerX'], self.beam.centerX * r,
+                               delta=r)
+        self.assertAlmostEqual(full['centerY'], self.beam.centerY * r,
+                               delta=r)
+        self.assertAlmostEqual(full['widthX'], self.beam.widthX * r,
+                               delta=r)
+        self.assertAlmostEqual(full['widthY'], self.beam.widthY * r,
+                               delta=r)
+        self.assertAlmostEqual(full['widthX_eta'], self.beam.widthX_eta * r)
+        self.assertAlmostEqual(full['irradiationArea_eta'],
+                               self.beam.irradiationArea_eta * r * r)
+
+        # Every estimate is within twice its estimated error of the
+        # full-resolution result
+        for estimate in estimates:
+            for key, value in estimate.values.items():
+                self.assertLessEqual(abs(value - full[key]),
+                                     2 * estimate.errors[key],
+                                     msg=(estimate.level, key))
+
+        # The preview of the centroid and widths is already accurate
+        coarse = estimates[0].values
+        self.assertAlmostEqual(coarse['centerX'], 140 * r, delta=r)
+        self.assertAlmostEqual(coarse['widthX'], 60 * r, delta=r)
+        self.assertAlmostEqual(coarse['widthY'], 40 * r, delta=r)
+
+    def test_function(self):
+        """`test_function` tests the progressive analysis of a frame."""
+
+        estimates = list(pyramid.progressive(self.raw_data, self.raw_header,
+                                             0.8, min_size=64))
+
+        self.assertEqual([e.level for e in estimates], [2, 1, 0])
+        self.assertEqual(estimates[-1].values,
+                         list(self.beam.pyramid.progressive(0.8))[-1].values)
+
+    def test_preview(self):
+        """`test_preview` tests that the coarse estimate is yielded without
+        the full beam analysis and before the finer levels are analysed."""
+
+        analyzed = []
+        analyze = pyramid.Pyramid.analyze
+
+        def record(self, level, eta):
+            analyzed.append(level)
+            return analyze(self, level, eta)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("The full beam analysis was run.")
+
+        with mock.patch.object(pyramid.Pyramid, 'analyze', record), \
+                mock.patch.object(beamprofiler.Beam, '__init__', fail), \
+                mock.patch.object(iso_cp, 'beam_uniformity', fail), \
+                mock.patch.object(dp, 'pre_top_hat', fail):
+            estimates = pyramid.progressive(self.raw_data, self.raw_header,
+                                            0.8)
+            coarse = next(estimates)
+
+        self.assertEqual(coarse.level, 4)
+        self.assertEqual(analyzed, [4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the radial profile and the encircled-energy diameter.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import unittest
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.niso import characterizing_parameters as niso_cp
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import synthetic
+
+
+class TestRadialProfile(unittest.TestCase):
+    """Tests for the radial profile and the encircled-energy diameter."""
+
+    def test_gaussian(self):
+        """`test_gaussian` tests that the D86 diameter of a Gaussian beam
+        equals its 1/e² diameter."""
+
+        z = synthetic.gaussian(256, 256, 60, centerX=128, centerY=128)
+        raw_data, raw_header = synthetic.frame(z, 0.1)
+        beam = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=raw_data, raw_header=raw_header)
+
+        self.assertAlmostEqual(beam.diameter86, 6.0, delta=0.05)
+        self.assertEqual(beam.result().diameter86, beam.diameter86)
+
+    def test_resolution(self):
+        """`test_resolution` tests a circular beam sampled with different
+        pixel resolutions on the x- and y-axis."""
+
+        # 6 mm 1/e² diameter: 60 pixels on the x-axis and 30 on the y-axis
+        z = synthetic.gaussian(200, 100, 60, 30, centerX=100, centerY=50)
+        raw_data = synthetic.frame(z, 0.1, 0.2)[0]
+
+        df = dp.radial_profile(raw_data, 0.1, 0.2, 100, 50)
+
+        self.assertAlmostEqual(df['Encircled Power'].iloc[-1], z.sum())
+        self.assertEqual(df['Count'].sum(), z.size)
+        self.assertAlmostEqual(df['Power Density'].iloc[0], 1000)
+        self.assertTrue(np.all(np.diff(df['Power Density'].dropna()) <= 0))
+        self.assertAlmostEqual(niso_cp.encircled_energy_diameter(df), 6.0,
+                               delta=0.05)
+        self.assertAlmostEqual(
+            niso_cp.encircled_energy_diameter(df, 1 - np.exp(-0.5)), 3.0,
+            delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the binary dumps with a sidecar header.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import synthetic
+
+
+class TestRawBinary(unittest.TestCase):
+    """Tests for the binary dumps with a sidecar header."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        z = synthetic.gaussian(160, 120, 40, 30, centerX=70, centerY=60,
+                               peak=4000)
+        z = np.rint(synthetic.add_background(z, 64))
+        self.raw_data, self.raw_header = synthetic.frame(z, 0.0055,
+                                                         nullPoint=64)
+
+        synthetic.save(os.path.join(self.directory, 'beam.raw'),
+                       self.raw_data, self.raw_header)
+        synthetic.save(os.path.join(self.directory, 'beam.xls'),
+                       self.raw_data, self.raw_header)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_sidecar(self):
+        """`test_sidecar` tests the sidecar header."""
+
+        fullPath = os.path.join(self.directory, 'camera.raw')
+        with open(os.path.join(self.directory, 'camera.hdr'), 'w') as f:
+            f.write("# Camera dump\n"
+                    "PIXELS X = 4   # columns\n"
+                    "pixels y=2\n"
+                    "\n"
+                    "Window X = 0.4\n"
+                    "Window Y = 0.2\n"
+                    "Type = >i4\n"
+                    "Offset = 8\n")
+        with open(fullPath, 'wb') as f:
+            f.write(b'\x00' * 8)
+            f.write(np.arange(8, dtype='>i4').tobytes())
+
+        raw_header = dp.raw_header(fullPath)
+        raw_data = dp.raw_data(fullPath)
+
+        self.assertEqual((dp.get_xPixel(raw_header),
+                          dp.get_yPixel(raw_header)), (4, 2))
+        self.assertAlmostEqual(dp.get_xResolution(raw_header), 0.1)
+        self.assertEqual(dp.get_nullPoint(raw_header), 0)
+        self.assertEqual(raw_data.to_numpy().tolist(),
+                         [[0, 1, 2, 3], [4, 5, 6, 7]])
+
+        # The dump is smaller than the geometry
+        with open(fullPath, 'wb') as f:
+            f.write(b'\x00' * 16)
+        with self.assertRaises(Exception):
+            dp.raw_data(fullPath)
+
+        # The geometry is missing
+        with open(os.path.join(self.directory, 'camera.hdr'), 'w') as f:
+            f.write("Pixels X = 4\n")
+        with self.assertRaises(Exception):
+            dp.raw_header(fullPath)
+
+    def test_memmap(self):
+        """`test_memmap` tests that the binary dump is memory-mapped."""
+
+        raw_data = dp.raw_data(os.path.join(self.directory, 'beam.raw'))
+        raw_data_np = raw_data.to_numpy()
+
+        self.assertEqual(raw_data_np.dtype, np.uint16)
+        self.assertFalse(raw_data_np.flags.writeable)
+        self.assertTrue(np.array_equal(raw_data_np, self.raw_data))
+
+        self.assertEqual(dp.raw_data(os.path.join(self.directory, 'beam.raw'),
+                                     np.float32).dtypes.unique().tolist(),
+                         [np.float32])
+
+    def test_beam(self):
+        """`test_beam` tests that the beam analysis of the binary dump equals
+        that of the text file."""
+
+        text = beamprofiler.Beam(self.directory, 'beam.xls', 0.8, 0.1, 1)
+        binary = beamprofiler.Beam(self.directory, 'beam.raw', 0.8, 0.1, 1)
+        in_place = beamprofiler.Beam(self.directory, 'beam.raw', 0.8, 0.1, 1,
+                                     in_place=True)
+
+        for beam in [binary, in_place]:
+            self.assertEqual((beam.centerX, beam.centerY), (70, 60))
+            self.assertEqual(beam.totalPower, text.totalPower)
+            self.assertAlmostEqual(beam.widthX, text.widthX, places=6)
+            self.assertAlmostEqual(beam.xResolution, text.xResolution)
+            self.assertEqual(beam.irradiationArea_eta,
+                             text.irradiationArea_eta)
+            self.assertEqual(beam.topHatFactor, text.topHatFactor)
+
+        # The in-place correction leaves the file unchanged
+        self.assertTrue(np.array_equal(
+            dp.raw_data(os.path.join(self.directory, 'beam.raw')),
+            self.raw_data))
+
+
+if __name__ == '__main__':
+    unittest.main()
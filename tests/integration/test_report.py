@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the report generation.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import tempfile
+import unittest
+import zipfile
+
+import pkg_resources
+
+import beamprofiler
+
+
+class TestSummary(unittest.TestCase):
+    """Tests for the summary workbook."""
+
+    def setUp(self):
+        """`setUp` sets up the test fixtures."""
+
+        self.path = pkg_resources.resource_filename(__name__, "fixtures")
+        self.fileNames = ['gaussian_beam.xls', 'square_beam.xls']
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """`tearDown` removes the temporary directory."""
+
+        self.tmp.cleanup()
+
+    def test_write_summary(self):
+        """`test_write_summary` tests that one row is written per beam."""
+
+        beams = (
+            beamprofiler.Beam(self.path, fileName, 0.8, 0.1, 1)
+            for fileName in self.fileNames
+        )
+        count = beamprofiler.utils.report.write_summary(self.tmp.name, beams)
+
+        self.assertEqual(count, 2)
+
+        # Two header rows plus one row per beam
+        outFile = os.path.join(self.tmp.name, 'Beam Analysis - Summary.xlsx')
+        with zipfile.ZipFile(outFile) as xlsx:
+            sheet = xlsx.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row '), 4)
+
+
+class TestExport(unittest.TestCase):
+    """Tests for the columnar export."""
+
+    @classmethod
+    def setUpClass(cls):
+        """`setUpClass` sets up the test fixtures."""
+
+        path = pkg_resources.resource_filename(__name__, "fixtures")
+        cls.beam = beamprofiler.Beam(path, 'lab_beam.xls', 0.8, 0.1, 1)
+
+    def setUp(self):
+        """`setUp` creates a temporary directory."""
+
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """`tearDown` removes the temporary directory."""
+
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """`test_round_trip` tests that the exported values are read back
+        unchanged, and that append mode adds rows to an existing file."""
+
+        expected = beamprofiler.utils.export.row(self.beam)
+
+        for ext in beamprofiler.utils.export.FORMATS:
+            fullPath = os.path.join(self.tmp.name, 'results' + ext)
+
+            beamprofiler.utils.export.write(fullPath, [self.beam])
+            beamprofiler.utils.export.write(fullPath, [self.beam],
+                                            append=True)
+            columns = beamprofiler.utils.export.read(fullPath)
+
+            self.assertEqual(len(columns['width_x_mm']), 2)
+            self.assertEqual(columns['file_name'][1], 'lab_beam.xls')
+            self.assertAlmostEqual(columns['width_x_mm'][1],
+                                   expected['width_x_mm'])
+            self.assertAlmostEqual(columns['top_hat_factor'][0],
+                                   expected['top_hat_factor'])
+
+    def test_missing(self):
+        """`test_missing` tests that a column mixing text and None, e.g. the
+        file name of a beam analyzed from memory, is read back from every
+        format."""
+
+        result = beamprofiler.BeamResult.from_beam(self.beam)
+        beams = [result, result._replace(fileName=None)]
+
+        for ext in beamprofiler.utils.export.FORMATS:
+            fullPath = os.path.join(self.tmp.name, 'missing' + ext)
+
+            beamprofiler.utils.export.write(fullPath, beams)
+            columns = beamprofiler.utils.export.read(fullPath)
+
+            self.assertEqual(columns['file_name'][0], 'lab_beam.xls')
+            self.assertIn(columns['file_name'][1], ['', None])
+
+        # Text is stored as strings, not as pickled objects
+        self.assertEqual(columns['file_name'].dtype.kind, 'U')
+
+    def test_units(self):
+        """`test_units` tests the conversion from pixel to millimeter."""
+
+        values = beamprofiler.utils.export.row(self.beam)
+
+        self.assertAlmostEqual(values['width_x_mm'],
+                               self.beam.widthX * self.beam.xResolution)
+
+
+if __name__ == '__main__':
+    unittest.main()
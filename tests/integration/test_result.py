@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the beam analysis results.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import pickle
+import tempfile
+import unittest
+
+import pkg_resources
+
+import beamprofiler
+
+
+class TestResult(unittest.TestCase):
+    """Tests for the results of type `BeamResult`."""
+
+    @classmethod
+    def setUpClass(cls):
+        """`setUpClass` sets up the test fixtures."""
+
+        cls.path = pkg_resources.resource_filename(__name__, "fixtures")
+        cls.fileName = 'lab_beam.xls'
+        cls.beam = beamprofiler.Beam(cls.path, cls.fileName, 0.8, 0.1, 1)
+        cls.result = cls.beam.result()
+
+    def test_values(self):
+        """`test_values` tests that the results match the beam analysis."""
+
+        for field in beamprofiler.BeamResult._fields:
+            if field != 'timings':
+                self.assertEqual(getattr(self.result, field),
+                                 getattr(self.beam, field))
+
+    def test_immutable(self):
+        """`test_immutable` tests that the results cannot be changed."""
+
+        with self.assertRaises(AttributeError):
+            self.result.widthX = 0
+        with self.assertRaises(AttributeError):
+            self.result.raw_data = None
+
+        # The timings are frozen as well, so the results can be hashed
+        result = beamprofiler.Beam(self.path, 'gaussian_beam.xls', 0.8, 0.1,
+                                   1, timer=True).result()
+        self.assertIsInstance(result.timings, tuple)
+        self.assertEqual(hash(pickle.loads(pickle.dumps(result))),
+                         hash(result))
+
+    def test_pickle(self):
+        """`test_pickle` tests that the pickled results are small and do not
+        carry the power density distribution."""
+
+        data = pickle.dumps(self.result)
+
+        self.assertLess(len(data), 2048)
+        self.assertEqual(pickle.loads(data), self.result)
+
+    def test_analyze(self):
+        """`test_analyze` tests the analysis engine."""
+
+        result = beamprofiler.analyze(self.path, self.fileName, 0.8, 0.1, 1)
+
+        self.assertIsInstance(result, beamprofiler.BeamResult)
+        self.assertAlmostEqual(result.widthX, self.beam.widthX)
+
+    def test_report(self):
+        """`test_report` tests the report generation from the results."""
+
+        with tempfile.TemporaryDirectory() as tmp:
+            beamprofiler.utils.report.write(tmp, self.fileName, self.result)
+            self.assertTrue(os.path.isfile(
+                os.path.join(tmp, 'Beam Analysis - lab_beam.xlsx')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the region of interest (ROI).
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import unittest
+
+import numpy as np
+import pkg_resources
+
+import beamprofiler
+from beamprofiler.niso import characterizing_parameters as niso_cp
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import synthetic
+
+
+class TestROI(unittest.TestCase):
+    """Tests for the region of interest (ROI)."""
+
+    def setUp(self):
+        z = synthetic.gaussian(512, 384, 40, 30, centerX=300, centerY=100)
+        z = synthetic.add_noise(synthetic.add_background(z, 100), 2, seed=0)
+        self.raw_data, self.raw_header = synthetic.frame(z, 0.05,
+                                                         nullPoint=100)
+
+    def analyze(self, **kwargs):
+        """`analyze` returns the beam analysis of the synthetic profile."""
+
+        return beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=self.raw_data,
+                                 raw_header=self.raw_header, **kwargs)
+
+    def test_beam_roi(self):
+        """`test_beam_roi` tests the detected ROI."""
+
+        i0, i1, j0, j1 = dp.beam_roi(
+            dp.remove_background(self.raw_data, self.raw_header))
+
+        self.assertTrue(i0 < 300 - 40 < 300 + 40 < i1)
+        self.assertTrue(j0 < 100 - 30 < 100 + 30 < j1)
+        self.assertLess((i1 - i0) * (j1 - j0), 0.1 * 512 * 384)
+
+        # No beam, no ROI
+        self.assertEqual(dp.beam_roi(self.raw_data * 0), (0, 512, 0, 384))
+
+    def test_noisy(self):
+        """`test_noisy` tests the ROI of a small beam on large frames with
+        strong noise, where single noisy columns or rows exceed the
+        threshold."""
+
+        for size in [512, 2048]:
+            z = synthetic.gaussian(size, size, 60, centerX=size // 3,
+                                   centerY=size // 2)
+            z = np.rint(synthetic.add_noise(synthetic.add_background(z, 100),
+                                            20, seed=1))
+            raw_data, raw_header = synthetic.frame(z, 0.01, nullPoint=100)
+
+            i0, i1, j0, j1 = dp.beam_roi(
+                dp.remove_background(raw_data, raw_header))
+            self.assertTrue(i0 < size // 3 - 30 < size // 3 + 30 < i1)
+            self.assertTrue(j0 < size // 2 - 30 < size // 2 + 30 < j1)
+            self.assertLess((i1 - i0) * (j1 - j0), 0.1 * size * size)
+
+            beam = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                     raw_data=raw_data,
+                                     raw_header=raw_header, roi=True)
+            self.assertEqual((beam.centerX, beam.centerY),
+                             (size // 3, size // 2))
+            self.assertAlmostEqual(beam.widthX, 60, delta=1)
+            self.assertAlmostEqual(beam.widthY, 60, delta=1)
+
+    def test_energy_curve(self):
+        """`test_energy_curve` tests that the energy curve is that of the
+        top-hat factor, i.e. inside the ROI."""
+
+        z = np.rint(synthetic.add_noise(synthetic.add_background(
+            synthetic.gaussian(512, 384, 40, 30, centerX=300, centerY=100),
+            100), 2, seed=0))
+        raw_data, raw_header = synthetic.frame(z, 0.05, nullPoint=100)
+
+        for kwargs in [{}, {'in_place': True}]:
+            beam = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                     raw_data=raw_data.copy(),
+                                     raw_header=raw_header, roi=True,
+                                     **kwargs)
+            i0, i1, j0, j1 = beam.roi
+
+            energy_curve = beam.energy_curve()
+            self.assertEqual(
+                energy_curve['Count'].sum(),
+                (raw_data.iloc[j0:j1, i0:i1] >=
+                 energy_curve.index.min()).sum().sum())
+            self.assertEqual(niso_cp.top_hat_factor(energy_curve),
+                             beam.topHatFactor)
+
+    def test_crop(self):
+        """`test_crop` tests the cropped frame and header."""
+
+        cropped, header = dp.crop(self.raw_data, self.raw_header,
+                                  (10, 50, 20, 40))
+
+        self.assertEqual(cropped.shape, (20, 40))
+        self.assertEqual(cropped.iloc[0, 0], self.raw_data.iloc[20, 10])
+        self.assertEqual(dp.get_xPixel(header), 40)
+        self.assertEqual(dp.get_yPixel(header), 20)
+        self.assertAlmostEqual(dp.get_xResolution(header), 0.05)
+        self.assertAlmostEqual(dp.get_yResolution(header), 0.05)
+        self.assertEqual(dp.get_nullPoint(header), 100)
+
+    def test_beam(self):
+        """`test_beam` tests that the beam analysis inside the ROI matches the
+        analysis of the full frame, in full-frame coordinates."""
+
+        full = self.analyze()
+        beam = self.analyze(roi=True, width_mode='iterative')
+
+        self.assertEqual((beam.centerX, beam.centerY), (300, 100))
+        self.assertAlmostEqual(beam.widthX, 40, delta=0.5)
+        self.assertAlmostEqual(beam.widthY, 30, delta=0.5)
+        self.assertAlmostEqual(beam.maxPowerDensity, full.maxPowerDensity)
+        self.assertEqual(beam.irradiationArea_eta, full.irradiationArea_eta)
+        self.assertAlmostEqual(beam.diameter86, full.diameter86, delta=0.05)
+        self.assertEqual(beam.raw_data.shape, (384, 512))
+
+        # Explicit ROI
+        beam = self.analyze(roi=(250, 350, 50, 150))
+        self.assertEqual(beam.roi, (250, 350, 50, 150))
+        self.assertEqual((beam.centerX, beam.centerY), (300, 100))
+
+    def test_fixture(self):
+        """`test_fixture` tests the ROI of the Gaussian fixture."""
+
+        path = pkg_resources.resource_filename(__name__, "fixtures")
+        fullPath = os.path.join(path, 'gaussian_beam.xls')
+
+        beam = beamprofiler.Beam(path, 'gaussian_beam.xls', 0.8, 0.1, 1,
+                                 roi=True, roi_margin=1)
+        full = beamprofiler.Beam(path, 'gaussian_beam.xls', 0.8, 0.1, 1,
+                                 raw_data=dp.raw_data(fullPath),
+                                 raw_header=dp.raw_header(fullPath))
+
+        self.assertEqual((beam.centerX, beam.centerY),
+                         (full.centerX, full.centerY))
+        self.assertTrue(np.isclose(beam.widthX, full.widthX, rtol=1e-2))
+        self.assertTrue(np.isclose(beam.totalPower, full.totalPower,
+                                   rtol=1e-2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the summed-area table.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import unittest
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.utils import synthetic
+from beamprofiler.utils.summed_area import SummedAreaTable
+
+
+class TestSummedAreaTable(unittest.TestCase):
+    """Tests for the summed-area table."""
+
+    def setUp(self):
+        rng = np.random.default_rng(36)
+        self.z = rng.uniform(0, 100, (40, 60))
+        self.z[3, 5] = np.nan
+        self.sat = SummedAreaTable(self.z, 0.1, 0.2)
+
+    def brute_force(self, x0, x1, y0, y1):
+        """`brute_force` returns the power and the pixel count inside the
+        rectangle by scanning every pixel."""
+
+        x = np.arange(self.z.shape[1]) * 0.1
+        y = np.arange(self.z.shape[0]) * 0.2
+        inside = (((x >= x0 - 1e-9) & (x <= x1 + 1e-9))[np.newaxis, :] &
+                  ((y >= y0 - 1e-9) & (y <= y1 + 1e-9))[:, np.newaxis])
+
+        return np.nansum(self.z[inside]), np.count_nonzero(inside)
+
+    def test_queries(self):
+        """`test_queries` tests random rectangles against a full scan."""
+
+        rng = np.random.default_rng(0)
+        x0 = rng.uniform(-1, 7, 200)
+        x1 = x0 + rng.uniform(0, 4, 200)
+        y0 = rng.uniform(-1, 9, 200)
+        y1 = y0 + rng.uniform(0, 4, 200)
+
+        power = self.sat.power(x0, x1, y0, y1)
+        count = self.sat.count(x0, x1, y0, y1)
+
+        for k in range(200):
+            expected = self.brute_force(x0[k], x1[k], y0[k], y1[k])
+            self.assertAlmostEqual(power[k], expected[0], places=6)
+            self.assertEqual(count[k], expected[1])
+
+    def test_edges(self):
+        """`test_edges` tests that the pixels on the edges are included and
+        that empty rectangles have no power."""
+
+        self.assertEqual(self.sat.count(0.1, 0.3, 0.2, 0.2), 3)
+        self.assertAlmostEqual(self.sat.power(0.1, 0.3, 0.2, 0.2),
+                               self.z[1, 1:4].sum())
+        self.assertEqual(self.sat.count(0.12, 0.18, 0, 1), 0)
+        self.assertEqual(self.sat.power(0.12, 0.18, 0, 1), 0)
+        self.assertTrue(np.isnan(
+            self.sat.average_power_density(0.12, 0.18, 0, 1)))
+        self.assertAlmostEqual(self.sat.power(-10, 10, -10, 10),
+                               np.nansum(self.z))
+
+    def test_beam(self):
+        """`test_beam` tests the reference rectangles of a beam and an
+        aperture sweep."""
+
+        z = synthetic.gaussian(64, 64, 24, centerX=32, centerY=32)
+        raw_data, raw_header = synthetic.frame(z, 0.1)
+        beam = beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=raw_data, raw_header=raw_header)
+
+        power, count, average = beam.rect((100, 100, 0, 0))
+        self.assertAlmostEqual(power, beam.totalPower)
+        self.assertEqual(count, 64 * 64)
+        self.assertIs(beam.summedAreaTable, beam.summedAreaTable)
+
+        # Square apertures of increasing size around the center
+        sizes = np.linspace(0, 6.4, 33)
+        power, count, average = beam.rect((sizes, sizes, 0, 0))
+        self.assertEqual(power.shape, sizes.shape)
+        self.assertTrue(np.all(np.diff(power) >= 0))
+        self.assertEqual(count[0], 1)
+        self.assertAlmostEqual(power[0], beam.maxPowerDensity)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the synthetic power density distributions.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import beamprofiler
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import synthetic
+
+
+class TestSynthetic(unittest.TestCase):
+    """Tests for the synthetic power density distributions."""
+
+    def analyze(self, z, nullPoint=0):
+        """`analyze` returns the beam analysis of a synthetic profile."""
+
+        raw_data, raw_header = synthetic.frame(z, 0.1, nullPoint=nullPoint)
+
+        return beamprofiler.Beam('', 'synthetic', 0.8, 0.1, 1,
+                                 raw_data=raw_data, raw_header=raw_header)
+
+    def test_gaussian(self):
+        """`test_gaussian` tests the center and the width of an elliptical
+        Gaussian profile."""
+
+        beam = self.analyze(synthetic.gaussian(256, 256, 60, 40,
+                                               centerX=120, centerY=90))
+
+        self.assertEqual((beam.centerX, beam.centerY), (120, 90))
+        self.assertAlmostEqual(beam.widthX, 60, places=3)
+        self.assertAlmostEqual(beam.widthY, 40, places=3)
+        self.assertAlmostEqual(beam.maxPowerDensity, 1000)
+
+    def test_multi_mode(self):
+        """`test_multi_mode` tests the width of a Hermite-Gaussian mode."""
+
+        beam = self.analyze(synthetic.multi_mode(256, 256, 40, [(1, 0, 1)]))
+
+        self.assertAlmostEqual(beam.widthX, 40 * np.sqrt(3), places=3)
+        self.assertAlmostEqual(beam.widthY, 40, places=3)
+
+    def test_top_hat(self):
+        """`test_top_hat` tests the clip-level beam width of a square
+        top-hat profile with background."""
+
+        z = synthetic.add_background(
+            synthetic.top_hat(256, 256, 101, square=True), 150)
+        beam = self.analyze(z, nullPoint=150)
+
+        self.assertAlmostEqual(beam.widthX_eta, 101)
+        self.assertAlmostEqual(beam.flatnessFactor_eta, 1)
+
+    def test_hot_pixels(self):
+        """`test_hot_pixels` tests the number and value of the hot pixels."""
+
+        z, positions = synthetic.add_hot_pixels(np.zeros((64, 64)), 5,
+                                                value=7, seed=0)
+
+        self.assertEqual(np.count_nonzero(z == 7), 5)
+        self.assertTrue((z[positions] == 7).all())
+
+    def test_save(self):
+        """`test_save` tests that a saved profile is read back unchanged."""
+
+        z = synthetic.add_noise(synthetic.gaussian(64, 32, 20), 5, seed=0)
+        raw_data, raw_header = synthetic.frame(z, 0.05, 0.1, nullPoint=12.5)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            fullPath = os.path.join(tmp, 'synthetic.xls')
+            synthetic.save(fullPath, raw_data, raw_header)
+
+            header = dp.raw_header(fullPath)
+            data = dp.raw_data(fullPath)
+
+        self.assertEqual(dp.get_xPixel(header), 64)
+        self.assertEqual(dp.get_yPixel(header), 32)
+        self.assertAlmostEqual(dp.get_xResolution(header), 0.05)
+        self.assertAlmostEqual(dp.get_yResolution(header), 0.1)
+        self.assertAlmostEqual(dp.get_nullPoint(header), 12.5)
+        np.testing.assert_allclose(data.to_numpy(), z, rtol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
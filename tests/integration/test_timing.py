@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the timing instrumentation.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import unittest
+
+import pkg_resources
+
+import beamprofiler
+from beamprofiler.utils import timing
+
+
+class TestTiming(unittest.TestCase):
+    """Tests for the timing instrumentation."""
+
+    def setUp(self):
+        """`setUp` sets up the test fixtures."""
+
+        self.path = pkg_resources.resource_filename(__name__, "fixtures")
+        self.fileName = 'square_beam.xls'
+
+    def test_disabled(self):
+        """`test_disabled` tests that no timing is recorded by default."""
+
+        beam = beamprofiler.Beam(self.path, self.fileName, 0.8, 0.1, 1)
+
+        self.assertEqual(beam.timings, {})
+
+    def test_timer(self):
+        """`test_timer` tests the timings of every stage."""
+
+        beam = beamprofiler.Beam(self.path, self.fileName, 0.8, 0.1, 1,
+                                 timer=True)
+
+        for stage in ['raw_data', 'beam_center', 'beam_width',
+                      'beam_uniformity', 'plateau_uniformity',
+                      'niso_plateau_uniformity', 'pre_top_hat']:
+            self.assertEqual(beam.timings[stage]['calls'], 1)
+            self.assertGreaterEqual(beam.timings[stage]['time'], 0)
+
+        self.assertEqual(
+            beam.result().timings,
+            tuple((name, t['time'], t['calls'])
+                  for name, t in beam.timings.items()))
+
+    def test_instrument(self):
+        """`test_instrument` tests the callback and the accumulated timings
+        of the `instrument` context."""
+
+        calls = []
+
+        with timing.instrument(lambda name, s: calls.append(name)) as timer:
+            for i in range(2):
+                beamprofiler.Beam(self.path, self.fileName, 0.8, 0.1, 1)
+
+        self.assertEqual(timer.as_dict()['beam_width']['calls'], 2)
+        self.assertEqual(calls.count('pre_top_hat'), 2)
+        self.assertIs(timing.active(), timing.NULL)
+
+
+if __name__ == '__main__':
+    unittest.main()
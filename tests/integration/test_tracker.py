@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Test file for the beam tracker.
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+import unittest
+from unittest import mock
+
+import beamprofiler
+from beamprofiler.utils import data_processing as dp
+from beamprofiler.utils import synthetic
+
+
+def frame(centerX, centerY):
+    """`frame` returns a noisy Gaussian frame centered on the given pixel."""
+
+    z = synthetic.gaussian(512, 512, 40, 30, centerX=centerX,
+                           centerY=centerY)
+    z = synthetic.add_noise(synthetic.add_background(z, 100), 2, seed=centerX)
+
+    return synthetic.frame(z, 0.05, nullPoint=100)
+
+
+class TestTracker(unittest.TestCase):
+    """Tests for the beam tracker."""
+
+    def test_drift(self):
+        """`test_drift` tests a slowly drifting beam, which is acquired once
+        and then tracked."""
+
+        positions = [(200 + 3 * k, 300 - 2 * k) for k in range(8)]
+        tracker = beamprofiler.Tracker(0.8, 0.1, 1, width_mode='iterative')
+
+        results = list(tracker.track(frame(x, y) for x, y in positions))
+
+        for result, position in zip(results, positions):
+            self.assertEqual((result.centerX, result.centerY), position)
+            self.assertAlmostEqual(result.widthX, 40, delta=0.5)
+            self.assertAlmostEqual(result.widthY, 30, delta=0.5)
+
+        self.assertEqual(tracker.frames, 8)
+        self.assertEqual(tracker.acquisitions, 1)
+
+    def test_jump(self):
+        """`test_jump` tests that the beam is re-acquired when it leaves the
+        ROI."""
+
+        tracker = beamprofiler.Tracker(0.8, 0.1, 1)
+
+        tracker.update(*frame(200, 300))
+        tracker.update(*frame(202, 301))
+        result = tracker.update(*frame(400, 100))
+
+        self.assertEqual((result.centerX, result.centerY), (400, 100))
+        self.assertEqual(tracker.acquisitions, 2)
+
+        # After a reset the beam is acquired again
+        tracker.reset()
+        tracker.update(*frame(400, 100))
+        self.assertEqual(tracker.acquisitions, 1)
+
+    def test_kwargs(self):
+        """`test_kwargs` tests the ROI of the full-frame passes given by the
+        user, and that tracking in place does not modify the frames."""
+
+        tracker = beamprofiler.Tracker(0.8, 0.1, 1, roi=(100, 300, 200, 400),
+                                       in_place=True)
+
+        first = frame(200, 300)
+        result = tracker.update(*first)
+        self.assertEqual((result.centerX, result.centerY), (200, 300))
+
+        second = frame(202, 301)
+        raw_data = second[0].copy()
+        result = tracker.update(*second)
+
+        self.assertEqual((result.centerX, result.centerY), (202, 301))
+        self.assertEqual(tracker.acquisitions, 1)
+        self.assertTrue(second[0].equals(raw_data))
+
+    def test_single_correction(self):
+        """`test_single_correction` tests that the background of a tracked
+        frame is corrected only once, in the analysis of the ROI."""
+
+        tracker = beamprofiler.Tracker(0.8, 0.1, 1)
+        tracker.update(*frame(200, 300))
+
+        with mock.patch.object(dp, 'remove_background',
+                               wraps=dp.remove_background) as correction:
+            tracker.update(*frame(202, 301))
+
+        self.assertEqual(correction.call_count, 1)
+        self.assertEqual(tracker.acquisitions, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()